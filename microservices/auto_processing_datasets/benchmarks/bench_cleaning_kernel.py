@@ -0,0 +1,69 @@
+"""Benchmark the vectorized text-cleaning kernel against per-row remove_emoji.
+
+Usage:
+    python benchmarks/bench_cleaning_kernel.py [--rows 1000000] [--repeat 3] [--workers 16]
+
+Cleans a synthetic full_text column with `Series.apply(remove_emoji)` and with
+`clean_text_column()` (serially, and in a process pool when --workers is
+above 1), checks that the outputs are identical and prints the timings.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.cleaning import remove_emoji, clean_text_column
+
+
+def make_texts(rows: int) -> pd.Series:
+    """Build `rows` synthetic tweets with mentions, emoji and punctuation."""
+    rng = np.random.default_rng(42)
+    words = np.array(['free', 'mobile', 'réseau', 'panne', 'merci', 'facture', 'service!!',
+                      'client', '@free', '@freebox', 'internet', 'fibre', '😡', '👍', '#fail', '...'])
+    return pd.Series([' '.join(rng.choice(words, size=rng.integers(5, 30))) for _ in range(rows)], dtype=object)
+
+
+def timed(fn, repeat: int):
+    """Return the best wall time of `repeat` runs of fn() and its last result."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows} rows...")
+    texts = make_texts(args.rows)
+
+    baseline, expected = timed(lambda: texts.apply(remove_emoji), args.repeat)
+    kernel, result = timed(lambda: clean_text_column(texts, workers=1), args.repeat)
+    identical = result.tolist() == expected.tolist()
+    if args.workers > 1:
+        parallel, result = timed(lambda: clean_text_column(texts, workers=args.workers), args.repeat)
+        identical = identical and result.tolist() == expected.tolist()
+
+    print(f"{'method':<20} {'seconds':>9} {'speedup':>8}")
+    print(f"{'apply(remove_emoji)':<20} {baseline:>9.3f} {1.0:>8.2f}")
+    print(f"{'clean_text_column':<20} {kernel:>9.3f} {baseline / kernel:>8.2f}")
+    if args.workers > 1:
+        label = f"{args.workers} workers"
+        print(f"{label:<20} {parallel:>9.3f} {baseline / parallel:>8.2f}")
+    print(f"Identical output: {identical}")
+
+
+if __name__ == '__main__':
+    main()
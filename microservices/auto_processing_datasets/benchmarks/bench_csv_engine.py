@@ -0,0 +1,77 @@
+"""Benchmark CSV ingestion engines on a synthetic tweet export.
+
+Usage:
+    python benchmarks/bench_csv_engine.py [--rows 1000000] [--repeat 3]
+
+Generates a CSV shaped like the Twitter exports processed by the pipeline and
+times pandas' C parser against PyArrow's multithreaded reader with an
+increasing number of threads.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.dataset_io import read_csv
+
+
+def make_dataset(path: str, rows: int) -> None:
+    """Write a synthetic tweet export with `rows` rows to `path`."""
+    rng = np.random.default_rng(42)
+    words = np.array(['free', 'mobile', 'réseau', 'panne', 'merci', 'facture', 'service',
+                      'client', '@free', '@freebox', 'internet', 'fibre', 'toujours', 'rien'])
+    texts = [' '.join(rng.choice(words, size=rng.integers(5, 30))) for _ in range(rows)]
+    pd.DataFrame({
+        'id': np.arange(rows, dtype=np.int64) + 10 ** 18,
+        'created_at': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 10 ** 7, rows), unit='s'),
+        'full_text': texts,
+        'user_id': rng.integers(10 ** 8, 10 ** 9, rows),
+        'retweet_count': rng.poisson(3, rows),
+        'favorite_count': rng.poisson(10, rows),
+        'reply_count': rng.poisson(1, rows),
+    }).to_csv(path, index=False)
+
+
+def timed(fn, repeat: int) -> float:
+    """Return the best wall time of `repeat` runs of fn()."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.csv')
+        print(f"Generating {args.rows} rows...")
+        make_dataset(path, args.rows)
+        print(f"File size: {os.path.getsize(path) / 1e6:.1f} MB\n")
+
+        baseline = timed(lambda: read_csv(path, 'c'), args.repeat)
+        print(f"{'engine':<10} {'threads':>7} {'seconds':>9} {'speedup':>8}")
+        print(f"{'c':<10} {1:>7} {baseline:>9.3f} {1.0:>8.2f}")
+
+        cores = os.cpu_count() or 1
+        threads = sorted({t for t in (1, 2, 4, 8, 16, cores) if t <= cores})
+        for count in threads:
+            pa.set_cpu_count(count)
+            seconds = timed(lambda: read_csv(path, 'pyarrow'), args.repeat)
+            print(f"{'pyarrow':<10} {count:>7} {seconds:>9.3f} {baseline / seconds:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
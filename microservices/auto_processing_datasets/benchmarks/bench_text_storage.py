@@ -0,0 +1,74 @@
+"""Benchmark Python object vs Arrow-backed storage for the full_text column.
+
+Usage:
+    python benchmarks/bench_text_storage.py [--rows 1000000] [--repeat 3]
+
+Builds a synthetic full_text column and compares its memory footprint and the
+time of the pipeline's text operations (emoji cleaning, duplicate detection
+and slicing LLM batches into Python strings) for both storages.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.cleaning import clean_text_column
+from src.utils.dataset_io import arrow_text_dtype
+
+LLM_BATCH_ROWS = 500
+
+
+def make_texts(rows: int) -> list:
+    """Build `rows` synthetic tweets."""
+    rng = np.random.default_rng(42)
+    words = np.array(['free', 'mobile', 'réseau', 'panne', 'merci', 'facture', 'service',
+                      'client', '@free', '@freebox', 'internet', 'fibre', '😡', '👍'])
+    return [' '.join(rng.choice(words, size=rng.integers(5, 30))) for _ in range(rows)]
+
+
+def timed(fn, repeat: int) -> float:
+    """Return the best wall time of `repeat` runs of fn()."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def llm_batches(texts: pd.Series) -> None:
+    """Convert the column to Python strings one LLM batch at a time."""
+    for i in range(0, len(texts), LLM_BATCH_ROWS):
+        texts.iloc[i:i + LLM_BATCH_ROWS].tolist()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows} rows...")
+    texts = make_texts(args.rows)
+    storages = {
+        'object': pd.Series(texts, dtype=object),
+        'arrow': pd.Series(texts, dtype=arrow_text_dtype()),
+    }
+    del texts
+
+    print(f"{'storage':<8} {'memory MB':>10} {'clean s':>8} {'dedupe s':>9} {'batches s':>10}")
+    for name, series in storages.items():
+        memory = series.memory_usage(deep=True) / 1e6
+        clean = timed(lambda: clean_text_column(series), args.repeat)
+        dedupe = timed(lambda: series.duplicated(), args.repeat)
+        batches = timed(lambda: llm_batches(series), args.repeat)
+        print(f"{name:<8} {memory:>10.1f} {clean:>8.3f} {dedupe:>9.3f} {batches:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
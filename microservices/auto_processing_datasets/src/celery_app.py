@@ -1,6 +1,6 @@
 """Celery application configuration."""
 from celery import Celery
-from celery.signals import setup_logging
+from celery.signals import setup_logging, worker_process_init, worker_process_shutdown
 import logging
 from src.configs.env import RABBITMQ_URL
 from src.utils.logger import setup_logger
@@ -48,6 +48,23 @@ celery_app.conf.task_routes = {
     'src.tasks.processor.retry_dataset_step': {'queue': 'celery_processing_queue'},
 }
 
+
+@worker_process_init.connect
+def compile_cleaning_rules(**kwargs):
+    """Compile the global cleaning rules once when a worker process starts."""
+    from src.utils.cleaning_rules import get_cleaning_rule_set
+    get_cleaning_rule_set()
+
+
+@worker_process_shutdown.connect
+def close_llm_connections(**kwargs):
+    """Close the pooled LLM connections and the LLM cache when a worker process exits."""
+    from src.utils.http_pool import close_sessions
+    from src.utils.llm_cache import close_llm_cache
+    close_sessions()
+    close_llm_cache()
+
+
 if __name__ == '__main__':
     celery_app.start()
 
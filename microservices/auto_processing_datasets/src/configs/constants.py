@@ -34,3 +34,28 @@ AI_MODE_LOCAL = 'local'
 AI_MODE_EXTERNAL = 'external'
 AI_MODE_AUTOMATIC = 'automatic'
 
+# Columns the processing pipeline always needs
+PIPELINE_REQUIRED_COLUMNS = ['id', 'user_id', 'full_text']
+
+# Compressed dataset extensions and their codecs
+COMPRESSION_EXTENSIONS = {
+    '.gz': 'gzip',
+    '.gzip': 'gzip',
+    '.bz2': 'bz2',
+    '.zst': 'zstd',
+    '.zstd': 'zstd',
+}
+
+# Execution modes
+EXECUTION_MODE_IN_MEMORY = 'in_memory'
+EXECUTION_MODE_STREAMING = 'streaming'
+
+# Outlier filtering modes
+# 'sequential' computes each column's IQR bounds on the rows kept by the previous
+# columns; 'single_pass' computes all bounds on the same rows and filters once.
+OUTLIER_MODE_SEQUENTIAL = 'sequential'
+OUTLIER_MODE_SINGLE_PASS = 'single_pass'
+
+# Version of the LLM prompt (_call_llm_api). Bump it when the prompt changes so
+# the LLM label cache stops serving labels produced by the previous prompt.
+LLM_PROMPT_VERSION = '1'
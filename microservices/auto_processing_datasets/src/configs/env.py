@@ -29,3 +29,118 @@ DEFAULT_RETRY_REQUESTS = int(os.getenv('DEFAULT_RETRY_REQUESTS', '3'))
 MAX_PAGINATE_ROWS_LIMIT = int(os.getenv('MAX_PAGINATE_ROWS_LIMIT', '1000'))
 MAX_RETRY_REQUESTS = int(os.getenv('MAX_RETRY_REQUESTS', '5'))
 
+# Concurrent LLM requests per model. A model can set its own limit with
+# maxInFlightRequests; 1 sends the batches one at a time.
+DEFAULT_IN_FLIGHT_REQUESTS = int(os.getenv('DEFAULT_IN_FLIGHT_REQUESTS', '1'))
+MAX_IN_FLIGHT_REQUESTS = int(os.getenv('MAX_IN_FLIGHT_REQUESTS', '16'))
+
+# Idle keep-alive connections kept per LLM endpoint (shared by all tasks of a worker process)
+LLM_HTTP_POOL_SIZE = int(os.getenv('LLM_HTTP_POOL_SIZE', str(MAX_IN_FLIGHT_REQUESTS)))
+
+# Persistent LLM label cache (SQLite), keyed by hash of (cleaned text, model name,
+# prompt version). Only texts missing from it are sent to the LLM; the least
+# recently used entries are evicted above LLM_CACHE_MAX_ENTRIES.
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', os.path.join(STORAGE_PATH, 'llm_cache.sqlite3'))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '1000000'))  # 0 = unbounded
+
+
+# Streaming (chunked) ingestion
+# When enabled, the pipeline reads, cleans, analyses and saves the dataset chunk
+# by chunk so that peak memory depends on the chunk size, not the dataset size.
+STREAMING_ENABLED = os.getenv('STREAMING_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+STREAMING_CHUNK_ROWS = int(os.getenv('STREAMING_CHUNK_ROWS', '50000'))
+STREAMING_CHUNK_BYTES = int(os.getenv('STREAMING_CHUNK_BYTES', '0'))  # 0 = use row budget only
+
+# CSV ingestion engine
+# 'c' is pandas' default parser; 'pyarrow' uses PyArrow's multithreaded CSV reader
+# and keeps columns in Arrow-backed dtypes.
+CSV_ENGINE = os.getenv('CSV_ENGINE', 'c').lower()
+CSV_READ_THREADS = int(os.getenv('CSV_READ_THREADS', '0'))  # 0 = all available cores
+# Memory-map uncompressed CSV inputs so pages live in the OS page cache (shared
+# between workers) instead of being copied into Python buffers
+CSV_MEMORY_MAP = os.getenv('CSV_MEMORY_MAP', 'false').lower() in ('1', 'true', 'yes')
+# Keep text columns (e.g. full_text) as Arrow-backed strings from reading to the
+# LLM request boundary instead of one Python object per row
+ARROW_STRINGS_ENABLED = os.getenv('ARROW_STRINGS_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+
+# Column projection
+# When enabled, only the columns the pipeline needs (identifiers, full_text,
+# numeric columns and PROJECTION_COLUMNS) are loaded for cleaning and LLM work.
+# The other columns are read once at save time and joined back by row position.
+PROJECTION_ENABLED = os.getenv('PROJECTION_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+PROJECTION_COLUMNS = [col.strip() for col in os.getenv('PROJECTION_COLUMNS', '').split(',') if col.strip()]
+PROJECTION_SAMPLE_ROWS = int(os.getenv('PROJECTION_SAMPLE_ROWS', '1000'))
+
+# Dataset profiling pre-pass
+# Profiling counts rows and samples full_text before processing so the pipeline
+# can choose its execution mode, chunk size and LLM batch size up front.
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+PROFILING_SAMPLE_ROWS = int(os.getenv('PROFILING_SAMPLE_ROWS', '1000'))
+STREAMING_MEMORY_BUDGET_BYTES = int(os.getenv('STREAMING_MEMORY_BUDGET_BYTES', '0'))  # 0 = never switch to streaming
+LLM_BATCH_TOKEN_BUDGET = int(os.getenv('LLM_BATCH_TOKEN_BUDGET', '0'))  # 0 = no global token budget
+# Context size (tokens) of models that do not declare contextTokens; 0 = unknown.
+# With a token budget, LLM batches are packed by estimated tokens instead of
+# paginateRowsLimit rows (up to maxBatchRows on the model, or MAX_PAGINATE_ROWS_LIMIT,
+# rows per request).
+DEFAULT_CONTEXT_TOKENS = int(os.getenv('DEFAULT_CONTEXT_TOKENS', '0'))
+LLM_SECONDS_PER_BATCH = float(os.getenv('LLM_SECONDS_PER_BATCH', '30'))  # Used for the ETA estimate
+
+# Content fingerprinting
+# Re-uploads of a dataset already analysed with the same AI configuration reuse
+# the existing analysed file instead of running the pipeline again. Opt-in: the
+# reuse key cannot see model weights or server behaviour behind an unchanged config.
+FINGERPRINT_ENABLED = os.getenv('FINGERPRINT_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+
+# Parallel text cleaning
+# full_text is split into blocks cleaned by a process pool; the blocks are shared
+# with the workers as Arrow buffers in shared memory instead of pickled lists.
+CLEANING_WORKERS = int(os.getenv('CLEANING_WORKERS', '1'))  # 1 = clean in the calling process, 0 = all available cores
+CLEANING_PARALLEL_MIN_ROWS = int(os.getenv('CLEANING_PARALLEL_MIN_ROWS', '200000'))  # Smaller columns are cleaned serially
+
+# Outlier filtering (IQR) mode: 'sequential' or 'single_pass'
+OUTLIER_MODE = os.getenv('OUTLIER_MODE', 'sequential').lower()
+
+# Deduplication
+# Rows are deduplicated on 64-bit hashes of these comma-separated columns
+# (e.g. 'full_text'); empty = whole rows
+DEDUPE_KEY_COLUMNS = [col.strip() for col in os.getenv('DEDUPE_KEY_COLUMNS', '').split(',') if col.strip()]
+
+# Clean each distinct full_text once and map the result back to repeated rows
+# (retweets, copy-pasted complaints)
+CLEANING_MEMOIZE = os.getenv('CLEANING_MEMOIZE', 'true').lower() in ('1', 'true', 'yes')
+
+# Near-duplicate collapsing before the LLM step
+# Texts whose MinHash-estimated Jaccard similarity (character shingles) reaches the
+# threshold are grouped; one representative per group is sent to the LLM and the
+# other rows inherit its labels (flagged in the label_inherited column).
+NEAR_DUPLICATES_ENABLED = os.getenv('NEAR_DUPLICATES_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.8'))
+NEAR_DUPLICATE_NUM_PERM = int(os.getenv('NEAR_DUPLICATE_NUM_PERM', '64'))
+NEAR_DUPLICATE_SHINGLE_SIZE = int(os.getenv('NEAR_DUPLICATE_SHINGLE_SIZE', '5'))
+
+# Send each distinct full_text once to the LLM and copy its labels to the rows
+# repeating it (used when near-duplicate collapsing is off)
+LLM_DEDUPE_TEXTS = os.getenv('LLM_DEDUPE_TEXTS', 'true').lower() in ('1', 'true', 'yes')
+
+# Cleaning rules (inline JSON object or path to a JSON file), layered over the
+# defaults and under the rules of a task (data.cleaning_rules on the task document)
+CLEANING_RULES = os.getenv('CLEANING_RULES', '')
+
+# Incremental cleaning of appended dataset versions
+# A row-hash index is written next to each cleaned file; a task whose document
+# names a previous version (data.previous_file_id) only cleans the rows that were
+# not in it and merges them with its cleaned file.
+CLEANING_INCREMENTAL = os.getenv('CLEANING_INCREMENTAL', 'false').lower() in ('1', 'true', 'yes')
+
+# Columnar checkpoints of intermediate datasets (cleaned/{file_id}.feather)
+# Resume branches reload the checkpoint (memory-mapped) instead of parsing the CSV.
+CHECKPOINT_FORMAT = os.getenv('CHECKPOINT_FORMAT', 'feather').lower()  # 'feather', 'parquet' or 'none'
+CHECKPOINT_COMPRESSION = os.getenv('CHECKPOINT_COMPRESSION', 'zstd').lower()  # 'uncompressed' = zero-copy Feather reloads
+# The cleaned CSV is only needed for downloads from the backend
+CLEANED_CSV_ENABLED = os.getenv('CLEANED_CSV_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+# Low-memory cleaning: free the raw text column once cleaned and take the kept rows
+# with a single copy. Enabled explicitly, or when the frame would exceed the budget.
+CLEANING_LOW_MEMORY = os.getenv('CLEANING_LOW_MEMORY', 'false').lower() in ('1', 'true', 'yes')
+CLEANING_MEMORY_BUDGET_BYTES = int(os.getenv('CLEANING_MEMORY_BUDGET_BYTES', '0'))  # 0 = no budget
@@ -4,6 +4,8 @@ from .calling_llm import calling_llm
 from .appending_columns import appending_columns
 from .saving import saving
 from .retry_step import retry_step
+from .profiling import profiling
+from .fingerprinting import fingerprinting
 
 __all__ = [
     'reading_file',
@@ -11,6 +13,8 @@ __all__ = [
     'calling_llm',
     'appending_columns',
     'saving',
-    'retry_step'
+    'retry_step',
+    'profiling',
+    'fingerprinting'
 ]
 
@@ -1,9 +1,12 @@
 """Callback function for calling LLM API."""
 import json
+import threading
 import time
-from typing import Dict, List, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional
 import sys
 import os
+import numpy as np
 import pandas as pd
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -20,8 +23,20 @@ from src.configs.constants import (
 )
 from src.configs.env import (
     DEFAULT_PAGINATE_ROWS_LIMIT, DEFAULT_RETRY_REQUESTS,
-    MAX_PAGINATE_ROWS_LIMIT, MAX_RETRY_REQUESTS
+    MAX_PAGINATE_ROWS_LIMIT, MAX_RETRY_REQUESTS,
+    DEFAULT_IN_FLIGHT_REQUESTS, MAX_IN_FLIGHT_REQUESTS,
+    NEAR_DUPLICATES_ENABLED, NEAR_DUPLICATE_THRESHOLD, NEAR_DUPLICATE_NUM_PERM,
+    NEAR_DUPLICATE_SHINGLE_SIZE, LLM_CACHE_ENABLED, LLM_DEDUPE_TEXTS
 )
+from src.utils.http_pool import connection_metrics, connection_metrics_delta, get_session
+from src.utils.llm_cache import get_llm_cache
+from src.utils.near_duplicates import near_duplicate_groups
+from src.utils.tokens import batch_row_cap, batch_token_budget, estimate_text_tokens, pack_batches
+
+# Columns written by the LLM step
+LLM_LABEL_COLUMNS = ['sentiment', 'priority', 'main_topic']
+# Flags rows whose labels were copied from a near-duplicate representative
+LABEL_INHERITED_COLUMN = 'label_inherited'
 
 
 def _is_external_model(model: dict, ai_config: dict) -> bool:
@@ -142,6 +157,8 @@ def _call_llm_api(model: dict, texts: List[str], ai_config: dict, retry_count: i
         The baseUrl should be configured by the user to point to an OpenAI-compatible endpoint.
         Example for Gemini: https://generativelanguage.googleapis.com/v1beta/openai
         The function will automatically append /chat/completions to the baseUrl.
+        Requests go through the worker's pooled session for the endpoint, so
+        keep-alive connections are reused across batches and tasks.
     """
     if requests is None:
         raise ImportError("requests library is not installed. Run: pip install requests")
@@ -203,7 +220,7 @@ def _call_llm_api(model: dict, texts: List[str], ai_config: dict, retry_count: i
     }
     
     try:
-        response = requests.post(
+        response = get_session(endpoint).post(
             endpoint,
             json=request_body,
             headers=headers,
@@ -264,23 +281,429 @@ def _call_llm_api(model: dict, texts: List[str], ai_config: dict, retry_count: i
             raise Exception(f"LLM API call failed after {max_retries} retries: {e}")
 
 
+def _representatives_emitter(event_emitter: callable, total_rows: int, llm_rows: int) -> callable:
+    """
+    Wrap an event emitter so that LLM events on representative rows report on all rows.
+    
+    Args:
+        event_emitter: Function to emit events (file_id, event)
+        total_rows: Number of rows in the dataset
+        llm_rows: Number of representative rows sent to the LLM
+    
+    Returns:
+        Event emitter rescaling progress row counts to the dataset
+    """
+    def emitter(fid: str, evt: str, payload: Optional[Dict] = None):
+        if payload is None:
+            event_emitter(fid, evt)
+            return
+        payload = dict(payload)
+        if evt == TASK_STATUS_SENDING_TO_LLM_PROGRESS:
+            for key in ('rows_processed', 'current_row_index', 'current_row_end'):
+                payload[key] = min(total_rows, -(-payload[key] * total_rows // llm_rows))
+            payload['total_rows'] = total_rows
+            payload['rows_remaining'] = max(0, total_rows - payload['rows_processed'])
+            payload['progress_percentage'] = int((payload['rows_processed'] / total_rows) * 100)
+        elif evt == TASK_STATUS_SENDING_TO_LLM_DONE:
+            payload['total_rows'] = total_rows
+            payload['llm_rows'] = llm_rows
+            payload['rows_saved'] = total_rows - llm_rows
+        event_emitter(fid, evt, payload)
+    
+    return emitter
+
+
+def _calling_llm_representatives(file_id: str, df: pd.DataFrame, representatives: np.ndarray,
+                                 ai_config: dict, event_emitter: callable,
+                                 tried_models: List[str] = None,
+                                 max_batch_rows: Optional[int] = None,
+                                 flag_inherited: bool = True) -> tuple[pd.DataFrame, str]:
+    """
+    Analyse one representative row per group and copy its labels to the group.
+    
+    Args:
+        file_id: File identifier
+        df: DataFrame with 'full_text' column
+        representatives: Position of each row's representative row
+        ai_config: AI configuration dictionary
+        event_emitter: Function to emit events (file_id, event)
+        tried_models: List of model UIDs that have already been tried
+        max_batch_rows: Upper bound on rows per LLM request
+        flag_inherited: Add the label_inherited column (False when the groups
+                        are exact duplicates, whose labels are not approximated)
+    
+    Returns:
+        Tuple of (DataFrame with new columns, model_uid used)
+    """
+    row_positions = np.arange(len(df))
+    llm_positions = np.flatnonzero(representatives == row_positions)
+    llm_df = df[['full_text']].iloc[llm_positions].copy()
+    
+    llm_df, model_uid = _analyse_rows(
+        file_id, llm_df, ai_config, _representatives_emitter(event_emitter, len(df), len(llm_df)),
+        tried_models, max_batch_rows
+    )
+    
+    label_rows = np.searchsorted(llm_positions, representatives)
+    for col in LLM_LABEL_COLUMNS:
+        df[col] = llm_df[col].to_numpy()[label_rows]
+    if flag_inherited:
+        df[LABEL_INHERITED_COLUMN] = representatives != row_positions
+    
+    return df, model_uid
+
+
 def calling_llm(file_id: str, df, ai_config: dict, event_emitter: callable, 
-                tried_models: List[str] = None) -> tuple[pd.DataFrame, str]:
+                tried_models: List[str] = None,
+                max_batch_rows: Optional[int] = None) -> tuple[pd.DataFrame, str]:
     """
     Process dataset with LLM to add sentiment, priority, and topics.
     
+    When NEAR_DUPLICATES_ENABLED is set, texts are first grouped with MinHash
+    and LSH; only the first text of each group is sent to the LLM, the other
+    rows inherit its labels and are flagged in the label_inherited column.
+    Otherwise, when LLM_DEDUPE_TEXTS is set, full_text is factorized and only
+    its distinct values are sent; their labels are taken back to every row.
+    Either way, the done event reports the rows not sent (rows_saved).
+    
     Args:
         file_id: File identifier
         df: DataFrame with 'full_text' column
         ai_config: AI configuration dictionary
         event_emitter: Function to emit events (file_id, event)
         tried_models: List of model UIDs that have already been tried
+        max_batch_rows: Upper bound on rows per LLM request (e.g. planned by profiling)
     
     Returns:
         Tuple of (DataFrame with new columns, model_uid used)
     """
-    import pandas as pd
+    if 'full_text' not in df.columns:
+        raise ValueError("Dataset must have 'full_text' column")
+    
+    if NEAR_DUPLICATES_ENABLED:
+        if len(df) > 1:
+            texts = df['full_text'].fillna('').astype(str).tolist()
+            representatives = near_duplicate_groups(
+                texts, NEAR_DUPLICATE_THRESHOLD, NEAR_DUPLICATE_NUM_PERM, NEAR_DUPLICATE_SHINGLE_SIZE
+            )
+            del texts
+            llm_rows = int((representatives == np.arange(len(df))).sum())
+            print(f"Near-duplicates: {len(df) - llm_rows} rows inherit labels from {llm_rows} representative rows")
+            return _calling_llm_representatives(
+                file_id, df, representatives, ai_config, event_emitter, tried_models, max_batch_rows
+            )
+        # Keep the label_inherited column on every frame (e.g. a one-row streaming chunk)
+        df, model_uid = _analyse_rows(file_id, df, ai_config, event_emitter, tried_models, max_batch_rows)
+        df[LABEL_INHERITED_COLUMN] = False
+        return df, model_uid
+    
+    if LLM_DEDUPE_TEXTS and len(df) > 1:
+        codes, uniques = pd.factorize(df['full_text'], use_na_sentinel=False)
+        if len(uniques) < len(df):
+            # Codes are numbered in order of first appearance, so the first
+            # positions are sorted like the representatives expect
+            _, first_positions = np.unique(codes, return_index=True)
+            representatives = first_positions[codes]
+            del codes, uniques
+            print(f"Duplicate texts: {len(df) - len(first_positions)} rows reuse the labels of "
+                  f"{len(first_positions)} distinct texts")
+            return _calling_llm_representatives(
+                file_id, df, representatives, ai_config, event_emitter, tried_models, max_batch_rows,
+                flag_inherited=False
+            )
+    
+    return _analyse_rows(file_id, df, ai_config, event_emitter, tried_models, max_batch_rows)
+
+
+def _in_flight_limit(model: dict) -> int:
+    """
+    Get the number of requests that may be in flight to a model at once.
+    
+    Args:
+        model: Model configuration dictionary (maxInFlightRequests is optional)
+    
+    Returns:
+        In-flight limit, between 1 and MAX_IN_FLIGHT_REQUESTS
+    """
+    limit = model.get('data', {}).get('maxInFlightRequests', DEFAULT_IN_FLIGHT_REQUESTS)
+    return max(1, min(int(limit), MAX_IN_FLIGHT_REQUESTS))
+
+
+def _parse_llm_result(result, batch_size: int) -> tuple[list, list, list, bool]:
+    """
+    Extract the labels of a batch from an LLM response.
+    
+    Priorities are normalized to 2/1/0 (high/normal/low) and missing labels
+    are padded with neutral/0/general up to the batch size.
     
+    Args:
+        result: Parsed LLM response
+        batch_size: Number of texts sent in the batch
+    
+    Returns:
+        Tuple of (sentiments, priorities, topics, aligned), each list of length
+        batch_size; aligned is False when the model did not return exactly one
+        label of each kind per text (some labels are padding, or shifted)
+    
+    Raises:
+        ValueError: If the response holds no labels
+    """
+    if isinstance(result, list):
+        print(f"Warning: LLM returned list instead of dict: {result[:3] if len(result) > 3 else result}")
+        batch_sentiments = []
+        batch_priorities = []
+        batch_topics = []
+    elif isinstance(result, dict):
+        data = result.get('data', result)
+        if isinstance(data, dict):
+            batch_sentiments = data.get('sentiment', data.get('analysis', []))
+            batch_priorities = data.get('priority', [])
+            batch_topics = data.get('topic', data.get('topics', []))
+            if not batch_sentiments and not batch_priorities and not batch_topics:
+                print(f"Warning: Empty results from LLM. Result keys: {result.keys()}, Data keys: {data.keys() if isinstance(data, dict) else 'N/A'}")
+        elif isinstance(data, list):
+            print(f"Info: LLM returned list in data field: {data[:2] if len(data) > 2 else data}")
+            aggregated_sentiments = []
+            aggregated_priorities = []
+            aggregated_topics = []
+
+            for item in data:
+                if isinstance(item, dict):
+                    sentiment_value = item.get('sentiment')
+                    priority_value = item.get('priority')
+                    topic_value = item.get('topic') or item.get('topics')
+
+                    if isinstance(sentiment_value, list):
+                        aggregated_sentiments.extend(sentiment_value)
+                    elif sentiment_value is not None:
+                        aggregated_sentiments.append(sentiment_value)
+
+                    if isinstance(priority_value, list):
+                        aggregated_priorities.extend(priority_value)
+                    elif priority_value is not None:
+                        aggregated_priorities.append(priority_value)
+
+                    if isinstance(topic_value, list):
+                        aggregated_topics.extend(topic_value)
+                    elif topic_value is not None:
+                        aggregated_topics.append(topic_value)
+                else:
+                    if item is not None:
+                        aggregated_sentiments.append(str(item))
+
+            batch_sentiments = aggregated_sentiments
+            batch_priorities = aggregated_priorities
+            batch_topics = aggregated_topics
+        else:
+            print(f"Warning: Unexpected data type in result: {type(data)}")
+            batch_sentiments = []
+            batch_priorities = []
+            batch_topics = []
+    else:
+        print(f"Warning: Unexpected result type: {type(result)}, value: {str(result)[:200]}")
+        batch_sentiments = []
+        batch_priorities = []
+        batch_topics = []
+    
+    if not isinstance(batch_sentiments, list):
+        print(f"Warning: batch_sentiments is not a list: {type(batch_sentiments)}")
+        batch_sentiments = []
+    if not isinstance(batch_priorities, list):
+        print(f"Warning: batch_priorities is not a list: {type(batch_priorities)}")
+        batch_priorities = []
+    if not isinstance(batch_topics, list):
+        print(f"Warning: batch_topics is not a list: {type(batch_topics)}")
+        batch_topics = []
+    
+    if not batch_sentiments and not batch_priorities and not batch_topics:
+        raise ValueError(f"Empty results from LLM. Expected arrays but got empty lists. Result structure: {type(result)}")
+    
+    # Normalize priority values: high/normal/low -> 2/1/0
+    normalized_priorities = []
+    for p in batch_priorities:
+        if isinstance(p, str):
+            if p.lower() in ['high', 'h']:
+                normalized_priorities.append(2)
+            elif p.lower() in ['normal', 'medium', 'm', 'n']:
+                normalized_priorities.append(1)
+            elif p.lower() in ['low', 'l']:
+                normalized_priorities.append(0)
+            else:
+                normalized_priorities.append(1)
+        else:
+            normalized_priorities.append(int(p) if isinstance(p, (int, float)) else 1)
+    
+    batch_priorities = normalized_priorities
+    
+    returned = max(len(batch_sentiments), len(batch_priorities), len(batch_topics))
+    aligned = len(batch_sentiments) == len(batch_priorities) == len(batch_topics) == batch_size
+    if not aligned:
+        print(f"Warning: LLM returned {returned} labels for {batch_size} texts (truncated or misaligned response)")
+    while len(batch_sentiments) < batch_size:
+        batch_sentiments.append('neutral')
+    while len(batch_priorities) < batch_size:
+        batch_priorities.append(0)
+    while len(batch_topics) < batch_size:
+        batch_topics.append('general')
+    return batch_sentiments[:batch_size], batch_priorities[:batch_size], batch_topics[:batch_size], aligned
+
+
+class _ModelFallback:
+    """
+    Model shared by the batches of a dataset, with fallback to the next model.
+    
+    Batches in flight all use the current model. When one fails, the model is
+    marked as tried and the next one becomes current, unless another batch
+    already moved past it. Requests to each model are bounded by its
+    in-flight limit.
+    """
+    
+    def __init__(self, ai_config: dict, tried_models: List[str], model: dict):
+        self.ai_config = ai_config
+        self.tried_models = tried_models
+        self.model = model
+        self._lock = threading.Lock()
+        self._slots = {}
+    
+    def slots(self, model: dict) -> threading.BoundedSemaphore:
+        """Get the semaphore bounding the requests in flight to a model."""
+        with self._lock:
+            uid = model.get('uid')
+            if uid not in self._slots:
+                self._slots[uid] = threading.BoundedSemaphore(_in_flight_limit(model))
+            return self._slots[uid]
+    
+    def fail(self, model: dict) -> Optional[dict]:
+        """
+        Record that a model failed and get the model to retry with.
+        
+        Args:
+            model: Model that failed
+        
+        Returns:
+            Current model, or None when every model has failed
+        """
+        with self._lock:
+            if self.model is not None and self.model.get('uid') == model.get('uid'):
+                self.tried_models.append(model.get('uid'))
+                next_model = _get_ai_model(self.ai_config, self.tried_models)
+                if next_model is not None and next_model.get('uid') in self.tried_models:
+                    next_model = None
+                if next_model is not None:
+                    print(f"Trying fallback model: {next_model.get('uid')}")
+                self.model = next_model
+            return self.model
+
+
+def _analyse_batch(texts: List[str], ai_config: dict, fallback: _ModelFallback,
+                   debug: bool = False) -> tuple[list, list, list, Optional[str], bool]:
+    """
+    Label one batch of texts, falling back to the next model on failure.
+    
+    Args:
+        texts: Texts of the batch
+        ai_config: AI configuration dictionary
+        fallback: Model shared by the batches of the dataset
+        debug: Print the structure of the LLM response
+    
+    Returns:
+        Tuple of (sentiments, priorities, topics, aligned, model, fallback_used),
+        where aligned is False when some labels are padding (see
+        _parse_llm_result) and model is the model that labelled the batch (the
+        last one tried when every model failed and default labels are returned
+        with fallback_used set).
+    """
+    model = fallback.model
+    last_model = None
+    while model is not None:
+        last_model = model
+        model_uid = model.get('uid')
+        try:
+            with fallback.slots(model):
+                result = _call_llm_api(model, texts, ai_config)
+            
+            if debug:
+                print(f"Debug: LLM result type: {type(result)}, keys: {result.keys() if isinstance(result, dict) else 'N/A'}")
+            
+            return (*_parse_llm_result(result, len(texts)), model, False)
+        except Exception as e:
+            print(f"Error processing batch with model {model_uid}: {e}")
+            model = fallback.fail(model)
+    
+    batch_size = len(texts)
+    return ['neutral'] * batch_size, [0] * batch_size, ['general'] * batch_size, False, last_model, True
+
+
+def _dispatch_batches(num_batches: int, analyse: callable, workers: int) -> Iterator[tuple[int, tuple]]:
+    """
+    Run the batches of a dataset, up to `workers` at a time.
+    
+    With one worker the batches run in order on the calling thread. Otherwise
+    at most `workers` batches are submitted at once, so only their texts are
+    held in memory.
+    
+    Args:
+        num_batches: Number of batches
+        analyse: Function labelling the batch at a position
+        workers: Number of batches run concurrently
+    
+    Yields:
+        (batch position, result of analyse) in completion order
+    """
+    if workers <= 1:
+        for position in range(num_batches):
+            yield position, analyse(position)
+        return
+    
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        next_position = 0
+        while pending or next_position < num_batches:
+            while next_position < num_batches and len(pending) < workers:
+                future = executor.submit(analyse, next_position)
+                pending[future] = next_position
+                next_position += 1
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+
+
+def _analyse_rows(file_id: str, df, ai_config: dict, event_emitter: callable,
+                  tried_models: List[str] = None,
+                  max_batch_rows: Optional[int] = None) -> tuple[pd.DataFrame, str]:
+    """
+    Send every row to the LLM in paginated batches and add the label columns.
+    
+    Batches are sent concurrently up to the in-flight limit of the models
+    (maxInFlightRequests, DEFAULT_IN_FLIGHT_REQUESTS by default) and their
+    labels are reassembled in row order. Progress events are emitted as
+    batches complete: batch counts completed batches and rows_processed the
+    rows labelled so far, while current_row_index/current_row_end give the
+    rows of the batch that completed.
+    
+    When LLM_CACHE_ENABLED is set, rows whose cleaned text was already
+    labelled by the model (with the current prompt version) take their
+    labels from the persistent cache and only the misses are sent. Progress
+    counts cache hits as processed rows and reports cache_hits/cache_misses.
+    
+    When a token budget is known for the model (LLM_BATCH_TOKEN_BUDGET, or
+    its context size: contextTokens or DEFAULT_CONTEXT_TOKENS), batches are
+    packed with as many consecutive rows as fit the budget by estimated
+    tokens, up to maxBatchRows on the model (or MAX_PAGINATE_ROWS_LIMIT)
+    rows; paginateRowsLimit and max_batch_rows (itself planned from an
+    average text) only apply to fixed-size batches.
+    
+    Args:
+        file_id: File identifier
+        df: DataFrame with 'full_text' column
+        ai_config: AI configuration dictionary
+        event_emitter: Function to emit events (file_id, event)
+        tried_models: List of model UIDs that have already been tried
+        max_batch_rows: Upper bound on rows per LLM request (without a token budget)
+    
+    Returns:
+        Tuple of (DataFrame with new columns, model_uid used)
+    """
     if tried_models is None:
         tried_models = []
     
@@ -298,205 +721,216 @@ def calling_llm(file_id: str, df, ai_config: dict, event_emitter: callable,
         model['data'].get('paginateRowsLimit', DEFAULT_PAGINATE_ROWS_LIMIT),
         MAX_PAGINATE_ROWS_LIMIT
     )
-    
-    sentiments = []
-    priorities = []
-    topics = []
+    if max_batch_rows:
+        paginate_limit = max(1, min(paginate_limit, int(max_batch_rows)))
     
     total_rows = len(df)
-    num_batches = (total_rows + paginate_limit - 1) // paginate_limit
-    
-    print(f"Processing {total_rows} rows in {num_batches} batches of {paginate_limit}")
+    sentiments = [None] * total_rows
+    priorities = [None] * total_rows
+    topics = [None] * total_rows
+    
+    # Rows to send to the LLM, and the cache keys of their texts
+    send_positions = np.arange(total_rows)
+    cache = get_llm_cache() if LLM_CACHE_ENABLED else None
+    cache_keys = None
+    cache_hits = 0
+    if cache is not None:
+        model_name = model['data'].get('model', '')
+        cache_keys = [cache.key(str(text), model_name) for text in df['full_text'].tolist()]
+        cached = cache.get_many(cache_keys)
+        for position, key in enumerate(cache_keys):
+            labels = cached.get(key)
+            if labels is not None:
+                sentiments[position], priorities[position], topics[position] = labels
+        send_positions = np.array([position for position, key in enumerate(cache_keys) if key not in cached],
+                                  dtype=np.int64)
+        cache_hits = total_rows - len(send_positions)
+        del cached
+        print(f"LLM cache: {cache_hits} hits, {len(send_positions)} misses")
+    
+    token_budget = batch_token_budget(model)
+    if token_budget:
+        row_tokens = estimate_text_tokens(df['full_text'].iloc[send_positions])
+        batch_bounds = pack_batches(row_tokens, token_budget, batch_row_cap(model))
+        del row_tokens
+    else:
+        batch_bounds = [(start, min(start + paginate_limit, len(send_positions)))
+                        for start in range(0, len(send_positions), paginate_limit)]
+    num_batches = len(batch_bounds)
+    
+    # Enough workers for the model with the highest limit; each model's own
+    # semaphore keeps its requests within its limit
+    models = [model] + ai_config.get('local', []) + ai_config.get('external', [])
+    workers = min(max(_in_flight_limit(m) for m in models), num_batches) if num_batches else 1
+    
+    if token_budget:
+        print(f"Processing {len(send_positions)} rows in {num_batches} batches of up to {token_budget} tokens"
+              + (f" ({workers} in flight)" if workers > 1 else ""))
+    else:
+        print(f"Processing {len(send_positions)} rows in {num_batches} batches of {paginate_limit}"
+              + (f" ({workers} in flight)" if workers > 1 else ""))
+    
+    fallback = _ModelFallback(ai_config, tried_models, model)
+    connections_before = connection_metrics()
+    
+    def analyse(position: int) -> tuple:
+        start, end = batch_bounds[position]
+        # Python strings are only materialized here, one batch at a time
+        texts = df['full_text'].iloc[send_positions[start:end]].tolist()
+        print(f"Processing batch {position + 1}/{num_batches} ({len(texts)} rows)")
+        return _analyse_batch(texts, ai_config, fallback, debug=position == 0)
+    
+    rows_processed = cache_hits
     last_success_model = None
-
-    for i in range(0, total_rows, paginate_limit):
-        batch = df.iloc[i:i + paginate_limit]
-        texts = batch['full_text'].tolist()
-        
-        print(f"Processing batch {i // paginate_limit + 1}/{num_batches} ({len(texts)} rows)")
-        
-        try:
-            result = _call_llm_api(model, texts, ai_config)
-            
-            if i == 0:
-                print(f"Debug: LLM result type: {type(result)}, keys: {result.keys() if isinstance(result, dict) else 'N/A'}")
-            
-            if isinstance(result, list):
-                print(f"Warning: LLM returned list instead of dict: {result[:3] if len(result) > 3 else result}")
-                batch_sentiments = []
-                batch_priorities = []
-                batch_topics = []
-            elif isinstance(result, dict):
-                data = result.get('data', result)
-                if isinstance(data, dict):
-                    batch_sentiments = data.get('sentiment', data.get('analysis', []))
-                    batch_priorities = data.get('priority', [])
-                    batch_topics = data.get('topic', data.get('topics', []))
-                    if not batch_sentiments and not batch_priorities and not batch_topics:
-                        print(f"Warning: Empty results from LLM. Result keys: {result.keys()}, Data keys: {data.keys() if isinstance(data, dict) else 'N/A'}")
-                elif isinstance(data, list):
-                    print(f"Info: LLM returned list in data field: {data[:2] if len(data) > 2 else data}")
-                    aggregated_sentiments = []
-                    aggregated_priorities = []
-                    aggregated_topics = []
-
-                    for item in data:
-                        if isinstance(item, dict):
-                            sentiment_value = item.get('sentiment')
-                            priority_value = item.get('priority')
-                            topic_value = item.get('topic') or item.get('topics')
-
-                            if isinstance(sentiment_value, list):
-                                aggregated_sentiments.extend(sentiment_value)
-                            elif sentiment_value is not None:
-                                aggregated_sentiments.append(sentiment_value)
-
-                            if isinstance(priority_value, list):
-                                aggregated_priorities.extend(priority_value)
-                            elif priority_value is not None:
-                                aggregated_priorities.append(priority_value)
-
-                            if isinstance(topic_value, list):
-                                aggregated_topics.extend(topic_value)
-                            elif topic_value is not None:
-                                aggregated_topics.append(topic_value)
-                        else:
-                            if item is not None:
-                                aggregated_sentiments.append(str(item))
-
-                    batch_sentiments = aggregated_sentiments
-                    batch_priorities = aggregated_priorities
-                    batch_topics = aggregated_topics
-                else:
-                    print(f"Warning: Unexpected data type in result: {type(data)}")
-                    batch_sentiments = []
-                    batch_priorities = []
-                    batch_topics = []
-            else:
-                print(f"Warning: Unexpected result type: {type(result)}, value: {str(result)[:200]}")
-                batch_sentiments = []
-                batch_priorities = []
-                batch_topics = []
-            
-            if not isinstance(batch_sentiments, list):
-                print(f"Warning: batch_sentiments is not a list: {type(batch_sentiments)}")
-                batch_sentiments = []
-            if not isinstance(batch_priorities, list):
-                print(f"Warning: batch_priorities is not a list: {type(batch_priorities)}")
-                batch_priorities = []
-            if not isinstance(batch_topics, list):
-                print(f"Warning: batch_topics is not a list: {type(batch_topics)}")
-                batch_topics = []
-            
-            if not batch_sentiments and not batch_priorities and not batch_topics:
-                raise ValueError(f"Empty results from LLM. Expected arrays but got empty lists. Result structure: {type(result)}")
-            
-            # Normalize priority values: high/normal/low -> 2/1/0
-            normalized_priorities = []
-            for p in batch_priorities:
-                if isinstance(p, str):
-                    if p.lower() in ['high', 'h']:
-                        normalized_priorities.append(2)
-                    elif p.lower() in ['normal', 'medium', 'm', 'n']:
-                        normalized_priorities.append(1)
-                    elif p.lower() in ['low', 'l']:
-                        normalized_priorities.append(0)
-                    else:
-                        normalized_priorities.append(1)
-                else:
-                    normalized_priorities.append(int(p) if isinstance(p, (int, float)) else 1)
-            
-            batch_priorities = normalized_priorities
-            
-            batch_size = len(texts)
-            while len(batch_sentiments) < batch_size:
-                batch_sentiments.append('neutral')
-            while len(batch_priorities) < batch_size:
-                batch_priorities.append(0)
-            while len(batch_topics) < batch_size:
-                batch_topics.append('general')
-            
-            sentiments.extend(batch_sentiments[:batch_size])
-            priorities.extend(batch_priorities[:batch_size])
-            topics.extend(batch_topics[:batch_size])
-            last_success_model = model_uid
-
-            current_batch = (i // paginate_limit) + 1
-            rows_processed = min(i + batch_size, total_rows)
-            progress_percentage = int((rows_processed / total_rows) * 100) if total_rows > 0 else 0
-            
-            event_emitter(
-                file_id,
-                TASK_STATUS_SENDING_TO_LLM_PROGRESS,
-                {
-                    'batch': current_batch,
-                    'total_batches': num_batches,
-                    'batch_size': batch_size,
-                    'total_rows': total_rows,
-                    'rows_processed': rows_processed,
-                    'rows_remaining': max(0, total_rows - rows_processed),
-                    'progress_percentage': progress_percentage,
-                    'current_row_index': i + 1,
-                    'current_row_end': rows_processed,
-                    'model_uid': model_uid,
-                }
+    
+    for completed, (position, result) in enumerate(_dispatch_batches(num_batches, analyse, workers), start=1):
+        batch_sentiments, batch_priorities, batch_topics, aligned, batch_model, fallback_used = result
+        start, end = batch_bounds[position]
+        batch_positions = send_positions[start:end]
+        for offset, row in enumerate(batch_positions.tolist()):
+            sentiments[row] = batch_sentiments[offset]
+            priorities[row] = batch_priorities[offset]
+            topics[row] = batch_topics[offset]
+        # Padded or shifted labels (and fallback defaults) are never cached
+        if cache is not None and aligned:
+            batch_model_name = batch_model['data'].get('model', '')
+            cache.put_many(
+                [cache.key(str(text), batch_model_name)
+                 for text in df['full_text'].iloc[batch_positions].tolist()],
+                batch_sentiments, batch_priorities, batch_topics
             )
         
-        except Exception as e:
-            print(f"Error processing batch with model {model_uid}: {e}")
-            tried_models.append(model_uid)
-            next_model = _get_ai_model(ai_config, tried_models)
-            
-            if next_model:
-                print(f"Trying fallback model: {next_model.get('uid')}")
-                model = next_model
-                model_uid = model.get('uid')
-                i -= paginate_limit  # Retry current batch with fallback model
-                continue
-            else:
-                batch_size = len(texts)
-                sentiments.extend(['neutral'] * batch_size)
-                priorities.extend([0] * batch_size)
-                topics.extend(['general'] * batch_size)
-                fallback_model = model_uid or 'default'
-                last_success_model = fallback_model
-                
-                current_batch = (i // paginate_limit) + 1
-                rows_processed = min(i + batch_size, total_rows)
-                progress_percentage = int((rows_processed / total_rows) * 100) if total_rows > 0 else 0
-                
-                event_emitter(
-                    file_id,
-                    TASK_STATUS_SENDING_TO_LLM_PROGRESS,
-                    {
-                        'batch': current_batch,
-                        'total_batches': num_batches,
-                        'batch_size': batch_size,
-                        'total_rows': total_rows,
-                        'rows_processed': rows_processed,
-                        'rows_remaining': max(0, total_rows - rows_processed),
-                        'progress_percentage': progress_percentage,
-                        'current_row_index': i + 1,
-                        'current_row_end': rows_processed,
-                        'model_uid': fallback_model,
-                        'fallback_used': True,
-                    }
-                )
-    
-    df['sentiment'] = sentiments[:total_rows]
-    df['priority'] = priorities[:total_rows]
-    df['main_topic'] = topics[:total_rows]
+        batch_size = len(batch_positions)
+        rows_processed += batch_size
+        progress_percentage = int((rows_processed / total_rows) * 100) if total_rows > 0 else 0
+        batch_model_uid = batch_model.get('uid') if batch_model is not None else None
+        if fallback_used:
+            batch_model_uid = batch_model_uid or 'default'
+        last_success_model = batch_model_uid
+        
+        payload = {
+            'batch': completed,
+            'total_batches': num_batches,
+            'batch_size': batch_size,
+            'total_rows': total_rows,
+            'rows_processed': rows_processed,
+            'rows_remaining': max(0, total_rows - rows_processed),
+            'progress_percentage': progress_percentage,
+            'current_row_index': int(batch_positions[0]) + 1,
+            'current_row_end': int(batch_positions[-1]) + 1,
+            'model_uid': batch_model_uid,
+        }
+        if fallback_used:
+            payload['fallback_used'] = True
+        if cache is not None:
+            payload['cache_hits'] = cache_hits
+            payload['cache_misses'] = len(send_positions)
+        event_emitter(file_id, TASK_STATUS_SENDING_TO_LLM_PROGRESS, payload)
+    
+    if fallback.model is not None:
+        model_uid = fallback.model.get('uid')
+    
+    df['sentiment'] = sentiments
+    df['priority'] = priorities
+    df['main_topic'] = topics
     
     print(f"Added columns: sentiment, priority, main_topic")
     
+    http_connections = connection_metrics_delta(connections_before)
+    print(f"LLM HTTP connections: {http_connections}")
+    
+    done_payload = {
+        'total_rows': total_rows,
+        'total_batches': num_batches,
+        'model_uid': last_success_model or model_uid,
+        'http_connections': http_connections,
+        'rows_saved': 0,
+    }
+    if cache is not None:
+        done_payload['cache_hits'] = cache_hits
+        done_payload['cache_misses'] = len(send_positions)
+    event_emitter(file_id, TASK_STATUS_SENDING_TO_LLM_DONE, done_payload)
+    
+    return df, model_uid
+
+
+def calling_llm_chunks(file_id: str, chunks: Iterable[pd.DataFrame], ai_config: dict,
+                       event_emitter: callable, total_rows: Optional[int] = None,
+                       tried_models: List[str] = None,
+                       max_batch_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Process a dataset streamed as DataFrame chunks with the LLM.
+    
+    Each chunk goes through calling_llm() and is yielded with its new columns
+    as soon as it is analysed. Start/done events are emitted once for the
+    whole stream, and progress events are rebased on the full dataset.
+    Models that failed on a chunk are not retried on the next ones.
+    
+    Args:
+        file_id: File identifier
+        chunks: Iterable of DataFrame chunks with a 'full_text' column
+        ai_config: AI configuration dictionary
+        event_emitter: Function to emit events (file_id, event)
+        total_rows: Total number of rows in the stream, if known
+        tried_models: List of model UIDs that have already been tried
+        max_batch_rows: Upper bound on rows per LLM request
+    
+    Yields:
+        DataFrame chunks with sentiment, priority and main_topic columns
+    """
+    if tried_models is None:
+        tried_models = []
+    
+    event_emitter(file_id, TASK_STATUS_SENDING_TO_LLM)
+    
+    rows_done = 0
+    batches_done = 0
+    rows_saved = 0
+    model_uid = None
+    
+    for chunk_index, chunk in enumerate(chunks, start=1):
+        chunk_rows = len(chunk)
+        stream_total = max(total_rows or 0, rows_done + chunk_rows)
+        chunk_batches = [0]
+        
+        def chunk_emitter(fid: str, evt: str, payload: Optional[Dict] = None):
+            nonlocal rows_saved
+            if evt == TASK_STATUS_SENDING_TO_LLM_DONE and payload is not None:
+                rows_saved += payload.get('rows_saved', 0)
+            if evt != TASK_STATUS_SENDING_TO_LLM_PROGRESS or payload is None:
+                return
+            payload = dict(payload)
+            chunk_batches[0] = max(chunk_batches[0], payload['batch'])
+            rows_per_batch = max(1, -(-chunk_rows // max(1, payload['total_batches'])))
+            rows_after_chunk = max(0, stream_total - rows_done - chunk_rows)
+            rows_processed = rows_done + payload['rows_processed']
+            payload.update({
+                'batch': batches_done + payload['batch'],
+                'total_batches': batches_done + payload['total_batches'] + -(-rows_after_chunk // rows_per_batch),
+                'total_rows': stream_total,
+                'rows_processed': rows_processed,
+                'rows_remaining': max(0, stream_total - rows_processed),
+                'progress_percentage': int((rows_processed / stream_total) * 100) if stream_total > 0 else 0,
+                'current_row_index': rows_done + payload['current_row_index'],
+                'current_row_end': rows_processed,
+                'chunk': chunk_index,
+            })
+            event_emitter(fid, evt, payload)
+        
+        chunk, model_uid = calling_llm(file_id, chunk, ai_config, chunk_emitter, tried_models, max_batch_rows)
+        
+        rows_done += chunk_rows
+        batches_done += chunk_batches[0]
+        yield chunk
+    
     event_emitter(
         file_id,
         TASK_STATUS_SENDING_TO_LLM_DONE,
         {
-            'total_rows': total_rows,
-            'total_batches': num_batches,
-            'model_uid': last_success_model or model_uid,
+            'total_rows': rows_done,
+            'total_batches': batches_done,
+            'model_uid': model_uid,
+            'rows_saved': rows_saved,
+            'streaming': True,
         }
     )
-    
-    return df, model_uid
@@ -4,16 +4,40 @@ import numpy as np
 import os
 import sys
 import re
+import pyarrow as pa
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Iterable, Iterator, Optional
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from src.configs.env import STORAGE_CLEANED
+from src.configs.env import (
+    STORAGE_CLEANED, STREAMING_CHUNK_ROWS, CLEANING_WORKERS, CLEANING_PARALLEL_MIN_ROWS, OUTLIER_MODE,
+    DEDUPE_KEY_COLUMNS, CLEANING_MEMOIZE, CLEANING_INCREMENTAL, CLEANED_CSV_ENABLED,
+    CLEANING_LOW_MEMORY, CLEANING_MEMORY_BUDGET_BYTES
+)
 from src.configs.constants import (
     TASK_STATUS_PROCESS_CLEANING,
     TASK_STATUS_PROCESS_CLEANING_DONE,
+    OUTLIER_MODE_SEQUENTIAL,
+    OUTLIER_MODE_SINGLE_PASS,
 )
 from src.utils.helpers import ensure_directory_exists
+from src.utils.dedupe import HashSeenSet, row_hashes
+from src.utils.cleaning_index import CleaningIndex, cleaning_index_path
+from src.utils.fingerprint import config_fingerprint
+from src.utils.memory import StagePeakRss
+from src.utils.cleaning_rules import (
+    ROW_SEPARATOR, MAX_CODE_POINT, CHAR_WORD, CHAR_SPACE, CHAR_KEPT, CHAR_EMOJI, CHAR_PREFIX,
+    CleaningRuleSet, get_cleaning_rule_set, get_task_cleaning_rule_set
+)
+from src.utils.dataset_io import (
+    iter_csv_chunks, write_csv, build_dtype_manifest, merge_dtype_manifests,
+    write_dtype_manifest, remove_csv, SOURCE_ROW_COLUMN, checkpoint_path, write_checkpoint,
+    intermediate_path, read_intermediate
+)
 
 
 def remove_emoji(text: str) -> str:
@@ -50,45 +74,525 @@ def remove_emoji(text: str) -> str:
     return text
 
 
-def cleaning(file_id: str, df: pd.DataFrame, event_emitter: callable, db_adapter=None) -> pd.DataFrame:
+# Vectorized cleaning kernel.
+# The pattern rules of the rule set are applied to each row with one fused regex;
+# rows are then joined with ROW_SEPARATOR and decoded to a numpy array of code
+# points, and each character rule becomes a lookup in the rule set's
+# per-code-point table (a translate table) followed by a single boolean mask
+# over the whole block.
+_MENTION_PLACEHOLDER = '__MENTION_'
+
+# Number of rows cleaned per kernel pass (bounds the size of the joined block)
+CLEANING_KERNEL_BLOCK_ROWS = 50000
+
+# Copies of the frame alive at once when cleaning outside low-memory mode
+# (input, deduplicated and outlier-filtered frames)
+CLEANING_FULL_COPIES = 3
+
+
+def _clean_code_points(code_points: np.ndarray, rule_set: CleaningRuleSet, separator: int) -> np.ndarray:
+    """Apply the character rules of a rule set to the code points of joined rows."""
+    rule_set.classify(code_points)
+    
+    # Remove emoji
+    classes = rule_set.classes[code_points]
+    keep = (classes & CHAR_EMOJI) == 0
+    code_points = code_points[keep]
+    classes = classes[keep]
+    
+    # Remove special characters, keeping prefix symbols followed by a word character (@mentions)
+    keep = (classes & CHAR_KEPT) != 0
+    prefixes = np.flatnonzero(classes & CHAR_PREFIX)
+    if len(prefixes):
+        following = np.minimum(prefixes + 1, len(code_points) - 1)
+        keep[prefixes] = ((prefixes + 1 < len(code_points))
+                          & ((classes[following] & CHAR_WORD) != 0)
+                          & (code_points[following] != separator))
+    code_points = code_points[keep]
+    if not rule_set.collapse_whitespace:
+        return code_points
+    is_space = (classes[keep] & CHAR_SPACE) != 0
+    
+    # Collapse whitespace runs into a single space
+    keep = ~is_space
+    keep[0:1] |= is_space[0:1]
+    keep[1:] |= is_space[1:] & ~is_space[:-1]
+    code_points = code_points[keep]
+    is_space = is_space[keep]
+    code_points[is_space] = ord(' ')
+    
+    # Strip each row
+    is_separator = code_points == separator
+    after_separator = np.ones(len(code_points), dtype=bool)
+    after_separator[1:] = is_separator[:-1]
+    before_separator = np.ones(len(code_points), dtype=bool)
+    before_separator[:-1] = is_separator[1:]
+    return code_points[~(is_space & (after_separator | before_separator))]
+
+
+def _decode(code_points: np.ndarray) -> str:
+    """Decode an array of code points back to a string."""
+    return code_points.astype('<u4').tobytes().decode('utf-32-le', 'surrogatepass')
+
+
+def _clean_text_block(texts: list, rule_set: Optional[CleaningRuleSet] = None) -> list:
+    """Clean a list of strings with a rule set (remove_emoji() by default), with vectorized passes over all rows."""
+    if not texts:
+        return []
+    rule_set = rule_set or get_cleaning_rule_set()
+    
+    if rule_set.pattern is not None:
+        # Pattern rules run per row, so anchors and word boundaries see row edges
+        texts = [rule_set.pattern.sub('', text) for text in texts]
+    return _clean_joined_rows(texts, rule_set)
+
+
+def _is_special_text(text: str, rule_set: CleaningRuleSet) -> bool:
+    """
+    Check whether a text must be cleaned on its own rather than in a joined block.
+    
+    Texts containing the row separator cannot be joined. With the default
+    rules, remove_emoji() can also rewrite a text in its own way: it swaps
+    mentions for placeholders one at a time, so texts containing a
+    placeholder, or with several @ and an underscore (e.g. '@@bob hi @_',
+    where '@_' matches the '@' left before the first placeholder), are
+    cleaned with it.
+    """
+    if ROW_SEPARATOR in text:
+        return True
+    if not rule_set.is_default:
+        return False
+    return _MENTION_PLACEHOLDER in text or ('_' in text and text.count('@') > 1)
+
+
+def _clean_joined_rows(texts: list, rule_set: CleaningRuleSet) -> list:
+    """Apply the character rules of a rule set to rows joined into one block."""
+    if not texts:
+        return []
+    
+    joined = ROW_SEPARATOR.join(texts)
+    may_rewrite = rule_set.is_default and (_MENTION_PLACEHOLDER in joined
+                                           or ('_' in joined and joined.count('@') > 1))
+    if joined.count(ROW_SEPARATOR) != len(texts) - 1 or may_rewrite:
+        special = {i for i, text in enumerate(texts) if _is_special_text(text, rule_set)}
+        if not special:
+            return _clean_block_kernel(joined, rule_set)
+        regular = iter(_clean_joined_rows([text for i, text in enumerate(texts) if i not in special], rule_set))
+        return [(_clean_characters(text, rule_set) if i in special else next(regular))
+                for i, text in enumerate(texts)]
+    return _clean_block_kernel(joined, rule_set)
+
+
+def _clean_block_kernel(joined: str, rule_set: CleaningRuleSet) -> list:
+    """Apply the character rules of a rule set to rows joined with ROW_SEPARATOR."""
+    code_points = np.frombuffer(joined.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    del joined
+    code_points = _clean_code_points(code_points, rule_set, ord(ROW_SEPARATOR))
+    return _decode(code_points).split(ROW_SEPARATOR)
+
+
+def _clean_characters(text: str, rule_set: CleaningRuleSet) -> str:
+    """Apply the character rules of a rule set to one text."""
+    if rule_set.is_default:
+        return remove_emoji(text)
+    code_points = np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+    return _decode(_clean_code_points(code_points, rule_set, MAX_CODE_POINT))
+
+
+def _clean_single_text(text: str, rule_set: CleaningRuleSet) -> str:
+    """Clean one text without joining it to other rows."""
+    if rule_set.pattern is not None:
+        text = rule_set.pattern.sub('', text)
+    return _clean_characters(text, rule_set)
+
+
+def _clean_shared_block(shm_name: str, index: int, rules: dict) -> pa.Array:
+    """Process pool task: clean one record batch of the Arrow IPC file held in shared memory."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        reader = pa.ipc.open_file(pa.py_buffer(shm.buf))
+        texts = reader.get_batch(index).column(0).to_pylist()
+        del reader
+    finally:
+        shm.close()
+    return pa.array(_clean_text_block(texts, get_cleaning_rule_set(rules)), type=pa.large_string())
+
+
+def _clean_values_parallel(values: list, workers: int, rule_set: CleaningRuleSet) -> list:
+    """
+    Clean a list of strings in a process pool.
+    
+    The values are written once to shared memory as an Arrow IPC file with
+    one record batch per kernel block. Workers read their block from it
+    without copying and send back the cleaned block as an Arrow array, so no
+    Python list of texts is pickled in either direction. Blocks are
+    reassembled in order.
+    
+    Args:
+        values: Texts to clean
+        workers: Number of worker processes
+        rule_set: Compiled cleaning rules (workers compile their own copy from its rules)
+    
+    Returns:
+        Cleaned texts, in the same order
+    """
+    batch = pa.record_batch([pa.array(values, type=pa.large_string())], names=['full_text'])
+    blocks = [batch.slice(start, CLEANING_KERNEL_BLOCK_ROWS)
+              for start in range(0, len(values), CLEANING_KERNEL_BLOCK_ROWS)]
+    
+    def write_blocks(sink):
+        with pa.ipc.new_file(sink, batch.schema) as writer:
+            for block in blocks:
+                writer.write_batch(block)
+    
+    size = pa.MockOutputStream()
+    write_blocks(size)
+    shm = shared_memory.SharedMemory(create=True, size=size.size())
+    try:
+        write_blocks(pa.FixedSizeBufferWriter(pa.py_buffer(shm.buf)))
+        del batch, blocks
+    
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            num_blocks = (len(values) + CLEANING_KERNEL_BLOCK_ROWS - 1) // CLEANING_KERNEL_BLOCK_ROWS
+            cleaned = list(pool.map(_clean_shared_block, [shm.name] * num_blocks, range(num_blocks),
+                                    [rule_set.rules] * num_blocks))
+    finally:
+        shm.close()
+        shm.unlink()
+    
+    return pa.chunked_array(cleaned, type=pa.large_string()).to_pylist()
+
+
+def clean_text_column(texts: pd.Series, workers: Optional[int] = None, stats: Optional[dict] = None,
+                      rule_set: Optional[CleaningRuleSet] = None) -> pd.Series:
+    """
+    Clean a text column with a rule set.
+    
+    With the default rules, the output is the same as applying remove_emoji()
+    to each row.
+    
+    Blocks of rows are cleaned with vectorized numpy passes over their code
+    points instead of running several regexes per row. When CLEANING_MEMOIZE
+    is set, the column is factorized first so each distinct text is cleaned
+    once and mapped back to its rows by code. Columns of at least
+    CLEANING_PARALLEL_MIN_ROWS texts are cleaned in a process pool when more
+    than one worker is configured. Missing values are kept.
+    
+    Args:
+        texts: Text column
+        workers: Number of worker processes (defaults to CLEANING_WORKERS, 0 = all cores)
+        stats: Optional dictionary updated with the number of 'texts' and of
+               'cleaned_texts' (distinct texts actually cleaned)
+        rule_set: Compiled cleaning rules (defaults to the global rules)
+    
+    Returns:
+        Cleaned column (with the input dtype for string and Arrow-backed columns)
+    """
+    rule_set = rule_set or get_cleaning_rule_set()
+    mask = texts.notna().to_numpy()
+    codes = None
+    if CLEANING_MEMOIZE:
+        codes, uniques = pd.factorize(texts[mask])
+        raw_values = uniques.tolist()
+    else:
+        raw_values = texts[mask].tolist()
+    values = [text if isinstance(text, str) else str(text) for text in raw_values]
+    del raw_values
+    if stats is not None:
+        stats['texts'] = stats.get('texts', 0) + int(mask.sum())
+        stats['cleaned_texts'] = stats.get('cleaned_texts', 0) + len(values)
+    
+    workers = CLEANING_WORKERS if workers is None else workers
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, (len(values) + CLEANING_KERNEL_BLOCK_ROWS - 1) // CLEANING_KERNEL_BLOCK_ROWS)
+    
+    cleaned_values = None
+    if workers > 1 and len(values) >= CLEANING_PARALLEL_MIN_ROWS:
+        try:
+            cleaned_values = _clean_values_parallel(values, workers, rule_set)
+            print(f"Cleaned {len(values)} texts with {workers} worker processes")
+        except (AssertionError, OSError, BrokenProcessPool) as exc:
+            # e.g. daemonic Celery pool processes cannot start children
+            print(f"Warning: parallel cleaning unavailable ({exc}), cleaning in this process")
+    
+    if cleaned_values is None:
+        cleaned_values = []
+        for start in range(0, len(values), CLEANING_KERNEL_BLOCK_ROWS):
+            cleaned_values.extend(_clean_text_block(values[start:start + CLEANING_KERNEL_BLOCK_ROWS], rule_set))
+    
+    cleaned_values = np.array(cleaned_values, dtype=object)
+    if codes is not None:
+        cleaned_values = cleaned_values[codes]
+    
+    # Only missing values are taken from the input, so the raw texts are never
+    # materialized as Python objects
+    out = np.empty(len(texts), dtype=object)
+    out[mask] = cleaned_values
+    del cleaned_values
+    if not mask.all():
+        out[~mask] = texts[~mask].to_numpy(dtype=object)
+    cleaned = pd.Series(out, index=texts.index, name=texts.name)
+    
+    if isinstance(texts.dtype, (pd.ArrowDtype, pd.StringDtype)):
+        return cleaned.astype(texts.dtype)
+    return cleaned.infer_objects()
+
+
+def _text_cache_hit_ratio(text_stats: dict) -> float:
+    """Share of texts whose cleaned value was reused from an identical text."""
+    if not text_stats.get('texts'):
+        return 0.0
+    return round(1 - text_stats['cleaned_texts'] / text_stats['texts'], 4)
+
+
+def _update_task_cleaned_path(file_id: str, db_adapter=None) -> None:
+    """
+    Record the relative path of the cleaned dataset on the task document.
+    
+    Args:
+        file_id: File identifier
+        db_adapter: Database adapter (skipped when None)
+    """
+    if db_adapter is None:
+        return
+    
+    try:
+        relative_path = os.path.join('cleaned', f"{file_id}.csv")
+        
+        db_adapter.update_one(
+            'tasks',
+            {'data.file_id': file_id},
+            {
+                'data.file_cleaned.path': relative_path,
+                'data.file_cleaned.type': 'text/csv',
+                'updatedAt': datetime.utcnow(),
+                'updatedBy': 'system',
+            }
+        )
+        print(f"Updated task with cleaned file path (relative): {relative_path}")
+    except Exception as exc:
+        print(f"Warning: failed to update task with cleaned file path: {exc}")
+
+
+def _save_cleaned(df: pd.DataFrame, cleaned_path: str) -> str:
+    """
+    Save the cleaned dataset as a columnar checkpoint and/or CSV.
+    
+    The checkpoint (CHECKPOINT_FORMAT) is what resumed tasks reload; the CSV
+    is only written for backend downloads (CLEANED_CSV_ENABLED). A stale file
+    of the other kind is removed so resumes never read an older version.
+    
+    Args:
+        df: Cleaned DataFrame
+        cleaned_path: Path of the cleaned CSV file
+    
+    Returns:
+        Path of the CSV file, or of the checkpoint when no CSV is written
+    """
+    checkpoint = checkpoint_path(cleaned_path)
+    if checkpoint is not None:
+        write_checkpoint(df, checkpoint)
+        print(f"Saved cleaned checkpoint to: {checkpoint}")
+    if CLEANED_CSV_ENABLED or checkpoint is None:
+        write_csv(df, cleaned_path)
+        print(f"Saved cleaned dataset to: {cleaned_path}")
+        return cleaned_path
+    if os.path.exists(cleaned_path):
+        remove_csv(cleaned_path)
+    return checkpoint
+
+
+def _use_low_memory(df: pd.DataFrame) -> bool:
+    """Whether to clean a frame in low-memory mode."""
+    if CLEANING_LOW_MEMORY:
+        return True
+    if not CLEANING_MEMORY_BUDGET_BYTES:
+        return False
+    estimated_bytes = int(df.memory_usage(deep=True).sum()) * CLEANING_FULL_COPIES
+    return estimated_bytes > CLEANING_MEMORY_BUDGET_BYTES
+
+
+def _cleaning_index_key(rule_set: CleaningRuleSet, columns: list) -> str:
+    """Fingerprint of the settings a cleaning index is only valid under."""
+    return config_fingerprint({
+        'rules': rule_set.fingerprint,
+        'dedupe_key_columns': DEDUPE_KEY_COLUMNS,
+        'columns': [str(col) for col in columns],
+    })
+
+
+def _load_previous_cleaning(file_id: str, db_adapter, previous_cleaned_path: Optional[str],
+                            previous_index_path: Optional[str], key: str,
+                            numeric_cols: list) -> Optional[tuple[pd.DataFrame, CleaningIndex]]:
+    """
+    Load the cleaned file and index of the previous version of a dataset.
+    
+    Without an explicit path, the previous version is the task named by
+    data.previous_file_id on the task document.
+    
+    Args:
+        file_id: File identifier
+        db_adapter: Database adapter
+        previous_cleaned_path: Cleaned file of the previous version (optional)
+        previous_index_path: Its cleaning index (defaults to the path next to the file)
+        key: Index key of the current settings and columns
+        numeric_cols: Columns checked for outliers in the new version
+    
+    Returns:
+        Tuple of (previous cleaned DataFrame, index), or None when the dataset
+        must be cleaned from scratch
+    """
+    if previous_cleaned_path is None and db_adapter is not None:
+        try:
+            task = db_adapter.find_one('tasks', {'data.file_id': file_id})
+            previous_id = task.get('data', {}).get('previous_file_id') if isinstance(task, dict) else None
+            if previous_id:
+                previous_cleaned_path = os.path.abspath(os.path.join(STORAGE_CLEANED, f"{previous_id}.csv"))
+        except Exception as exc:
+            print(f"Warning: failed to read previous version of task, cleaning from scratch: {exc}")
+    if previous_cleaned_path is None or intermediate_path(previous_cleaned_path) is None:
+        return None
+    
+    index = CleaningIndex.load(previous_index_path or cleaning_index_path(previous_cleaned_path))
+    if index is None or index.key != key or index.numeric_columns != list(numeric_cols):
+        print(f"Cleaning index of {previous_cleaned_path} is missing or stale, cleaning from scratch")
+        return None
+    
+    previous_df = read_intermediate(previous_cleaned_path)
+    if len(previous_df) != int(index.kept.sum()):
+        print(f"Cleaning index of {previous_cleaned_path} does not match the file, cleaning from scratch")
+        return None
+    return previous_df, index
+
+
+def cleaning(file_id: str, df: pd.DataFrame, event_emitter: callable, db_adapter=None,
+             previous_cleaned_path: Optional[str] = None,
+             previous_index_path: Optional[str] = None) -> pd.DataFrame:
     """
     Clean dataset: remove emojis, special characters, duplicates and outliers.
     
+    Text and outlier rules come from the task's cleaning rules layered over
+    the global CLEANING_RULES (see src/utils/cleaning_rules.py).
+    
+    With CLEANING_INCREMENTAL, a cleaning index is written next to the
+    cleaned file. When the cleaned file and index of a previous version of
+    the dataset are available, only the input rows not seen in it are
+    cleaned: they are deduplicated against the stored row hashes, the IQR
+    bounds are recomputed from the stored numeric values, and the new rows
+    are appended to the previous cleaned rows that are still within bounds.
+    Rows the previous version dropped as outliers stay dropped. Projected
+    frames (indexed by SOURCE_ROW_COLUMN) are always cleaned from scratch:
+    reused rows would keep the source row positions of the previous input
+    file, so saving would join the skipped columns of the wrong rows.
+    
+    In low-memory mode (CLEANING_LOW_MEMORY, or when the frame would exceed
+    CLEANING_MEMORY_BUDGET_BYTES), the raw text column is freed as soon as
+    it is cleaned, and the dedupe and outlier masks are composed so the
+    kept rows are taken in a single copy. The peak RSS of each stage is
+    reported in the done event.
+    
     Args:
         file_id: File identifier
         df: DataFrame to clean
         event_emitter: Function to emit events (file_id, event)
+        db_adapter: Database adapter
+        previous_cleaned_path: Cleaned file of the previous version (optional,
+                               defaults to the task's data.previous_file_id)
+        previous_index_path: Cleaning index of the previous version (optional)
     
     Returns:
         Cleaned DataFrame
     """
     event_emitter(file_id, TASK_STATUS_PROCESS_CLEANING)
     
+    stage_rss = StagePeakRss()
+    rule_set = get_task_cleaning_rule_set(file_id, db_adapter)
     initial_rows = len(df)
+    text_stats = {}
+    low_memory = _use_low_memory(df)
+    if low_memory:
+        print(f"Low-memory cleaning: composing row masks and taking the kept rows once")
+    
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    numeric_cols = [col for col in numeric_cols if col not in rule_set.outlier_excluded_columns]
+    
+    previous = None
+    source_hashes = HashSeenSet()
+    seen_hashes = HashSeenSet()
+    incremental = CLEANING_INCREMENTAL or previous_cleaned_path is not None
+    if incremental and df.index.name == SOURCE_ROW_COLUMN:
+        print("Incremental cleaning skipped: projected rows are cleaned from scratch")
+        incremental = False
+    if incremental:
+        index_key = _cleaning_index_key(rule_set, df.columns)
+        previous = _load_previous_cleaning(file_id, db_adapter, previous_cleaned_path,
+                                           previous_index_path, index_key, numeric_cols)
+        if previous is not None:
+            source_hashes = HashSeenSet.from_array(previous[1].source_hashes)
+            seen_hashes = HashSeenSet.from_array(previous[1].row_hashes)
+        
+        # Only rows not seen in the previous version are cleaned
+        new_rows = source_hashes.add(row_hashes(df))
+        if previous is not None and not new_rows.all():
+            df = df[new_rows]
+            print(f"Incremental cleaning: {len(df)} of {initial_rows} rows are new")
     
     if 'full_text' in df.columns:
         print(f"Cleaning 'full_text' column: removing emojis and special characters...")
-        df['full_text'] = df['full_text'].apply(remove_emoji)
+        if low_memory:
+            # Free the raw column as soon as its cleaned version exists
+            position = df.columns.get_loc('full_text')
+            raw_text = df.pop('full_text')
+            cleaned_text = clean_text_column(raw_text, stats=text_stats, rule_set=rule_set)
+            del raw_text
+            df.insert(position, 'full_text', cleaned_text)
+            del cleaned_text
+        else:
+            df['full_text'] = clean_text_column(df['full_text'], stats=text_stats, rule_set=rule_set)
         print(f"Cleaned {len(df)} rows of text data")
+    stage_rss.record('text')
     
-    df = df.drop_duplicates()
-    duplicates_removed = initial_rows - len(df)
+    # Remove duplicates on 64-bit row hashes (of DEDUPE_KEY_COLUMNS when set)
+    keep = seen_hashes.add(row_hashes(df, DEDUPE_KEY_COLUMNS))
+    if not low_memory and not keep.all():
+        df = df[keep]
+        keep = np.ones(len(df), dtype=bool)
+    previous_rows = len(previous[1].kept) if previous is not None else 0
+    deduplicated_rows = previous_rows + int(keep.sum())
+    duplicates_removed = max(initial_rows - deduplicated_rows, 0)
+    stage_rss.record('dedupe')
     
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    numeric_cols = [col for col in numeric_cols if col not in ['id', 'user_id']]
+    # Remove outliers using IQR method (Interquartile Range), applying a single mask
+    numeric_df = df[numeric_cols] if keep.all() else df.loc[keep, numeric_cols]
+    numeric_values = None
+    if incremental:
+        numeric_values = numeric_df.to_numpy(dtype=np.float64, na_value=np.nan)
+    if previous is not None:
+        previous_df, index = previous
+        numeric_values = np.concatenate([index.numeric_values, numeric_values])
+        if numeric_cols and len(numeric_values) > 0:
+            keep_mask = _iqr_keep_mask(pd.DataFrame(numeric_values, columns=numeric_cols))
+        else:
+            keep_mask = np.ones(len(numeric_values), dtype=bool)
+        keep_mask[:previous_rows] &= index.kept
+        previous_df = previous_df[keep_mask[:previous_rows][index.kept]]
+        new_keep_mask = keep_mask[previous_rows:]
+    elif numeric_cols and len(numeric_df) > 0:
+        keep_mask = new_keep_mask = _iqr_keep_mask(numeric_df)
+    else:
+        keep_mask = new_keep_mask = np.ones(len(numeric_df), dtype=bool)
+    del numeric_df
     
-    # Remove outliers using IQR method (Interquartile Range)
-    outliers_removed = 0
-    for col in numeric_cols:
-        initial_col_len = len(df)
-        Q1 = df[col].quantile(0.25)
-        Q3 = df[col].quantile(0.75)
-        IQR = Q3 - Q1
-        if IQR > 0:
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
-            df = df[(df[col] >= lower_bound) & (df[col] <= upper_bound)]
-            outliers_removed += initial_col_len - len(df)
+    # Compose the outlier mask with the dedupe mask and take the kept rows once
+    rows = keep.copy()
+    rows[keep] = new_keep_mask
+    if not rows.all():
+        df = df.take(np.flatnonzero(rows))
+    if previous is not None:
+        df = pd.concat([previous_df, df], ignore_index=(df.index.name != SOURCE_ROW_COLUMN))
+        del previous_df
+    outliers_removed = deduplicated_rows - len(df)
+    stage_rss.record('outliers')
     
     print(f"Cleaned dataset: removed {duplicates_removed} duplicates, {outliers_removed} outliers")
     print(f"Final dataset: {len(df)} rows")
@@ -96,26 +600,21 @@ def cleaning(file_id: str, df: pd.DataFrame, event_emitter: callable, db_adapter
     ensure_directory_exists(STORAGE_CLEANED)
     cleaned_path = os.path.join(STORAGE_CLEANED, f"{file_id}.csv")
     cleaned_path = os.path.abspath(cleaned_path)
-    df.to_csv(cleaned_path, index=False)
-    print(f"Saved cleaned dataset to: {cleaned_path}")
+    saved_path = _save_cleaned(df, cleaned_path)
+    stage_rss.record('save')
+    
+    if numeric_values is not None:
+        CleaningIndex(
+            key=index_key,
+            source_hashes=source_hashes.to_array(),
+            row_hashes=seen_hashes.to_array(),
+            numeric_columns=numeric_cols,
+            numeric_values=numeric_values,
+            kept=keep_mask,
+        ).save(cleaning_index_path(cleaned_path))
 
-    if db_adapter is not None:
-        try:
-            relative_path = os.path.join('cleaned', f"{file_id}.csv")
-            
-            db_adapter.update_one(
-                'tasks',
-                {'data.file_id': file_id},
-                {
-                    'data.file_cleaned.path': relative_path,
-                    'data.file_cleaned.type': 'text/csv',
-                    'updatedAt': datetime.utcnow(),
-                    'updatedBy': 'system',
-                }
-            )
-            print(f"Updated task with cleaned file path (relative): {relative_path}")
-        except Exception as exc:
-            print(f"Warning: failed to update task with cleaned file path: {exc}")
+    if CLEANED_CSV_ENABLED:
+        _update_task_cleaned_path(file_id, db_adapter)
     
     event_emitter(
         file_id,
@@ -125,8 +624,177 @@ def cleaning(file_id: str, df: pd.DataFrame, event_emitter: callable, db_adapter
             'final_rows': len(df),
             'duplicates_removed': duplicates_removed,
             'outliers_removed': outliers_removed,
-            'cleaned_path': cleaned_path,
+            'reused_rows': previous_rows,
+            'cleaned_path': saved_path,
+            'text_cache_hit_ratio': _text_cache_hit_ratio(text_stats),
+            'low_memory': low_memory,
+            'peak_rss_bytes': stage_rss.peaks,
         }
     )
     
     return df
+
+
+def _iqr_keep_mask(numeric_df: pd.DataFrame, mode: Optional[str] = None) -> np.ndarray:
+    """
+    Build the IQR outlier mask for a frame of numeric columns.
+    
+    In sequential mode, columns are processed in order and each column's
+    quartiles are computed on the rows kept by the previous columns (the
+    historical behaviour of cleaning()). In single-pass mode, the quartiles
+    of all columns are computed on all rows with one quantile() call and
+    the bounds are checked with one vectorized comparison.
+    
+    Args:
+        numeric_df: DataFrame holding only the columns to check
+        mode: OUTLIER_MODE_SEQUENTIAL or OUTLIER_MODE_SINGLE_PASS (defaults to OUTLIER_MODE)
+    
+    Returns:
+        Boolean array, True for rows to keep
+    """
+    mode = mode or OUTLIER_MODE
+    if mode == OUTLIER_MODE_SINGLE_PASS:
+        quartiles = numeric_df.quantile([0.25, 0.75]).to_numpy(dtype=np.float64, na_value=np.nan)
+        IQR = quartiles[1] - quartiles[0]
+        checked = IQR > 0
+        if not checked.any():
+            return np.ones(len(numeric_df), dtype=bool)
+        lower_bound = quartiles[0][checked] - 1.5 * IQR[checked]
+        upper_bound = quartiles[1][checked] + 1.5 * IQR[checked]
+        values = numeric_df.loc[:, checked].to_numpy(dtype=np.float64, na_value=np.nan)
+        return ((values >= lower_bound) & (values <= upper_bound)).all(axis=1)
+    if mode != OUTLIER_MODE_SEQUENTIAL:
+        raise ValueError(f"Unknown outlier mode: {mode}")
+    
+    keep = np.ones(len(numeric_df), dtype=bool)
+    for col in numeric_df.columns:
+        values = numeric_df[col]
+        Q1 = values[keep].quantile(0.25)
+        Q3 = values[keep].quantile(0.75)
+        IQR = Q3 - Q1
+        if IQR > 0:
+            lower_bound = Q1 - 1.5 * IQR
+            upper_bound = Q3 + 1.5 * IQR
+            keep &= ((values >= lower_bound) & (values <= upper_bound)).to_numpy()
+    return keep
+
+
+def cleaning_chunks(file_id: str, chunks: Iterable[pd.DataFrame], event_emitter: callable,
+                    db_adapter=None, chunk_rows: Optional[int] = None) -> tuple[Iterator[pd.DataFrame], int]:
+    """
+    Clean a dataset streamed as DataFrame chunks.
+    
+    Applies the same rules as cleaning() with bounded memory: text is cleaned
+    and duplicates are dropped chunk by chunk (keeping only the 64-bit
+    hashes of the rows seen so far) while rows are spilled to disk. Only
+    the numeric columns checked for outliers are kept in memory to compute
+    the IQR bounds, then the spill file is filtered into the cleaned CSV.
+    
+    Args:
+        file_id: File identifier
+        chunks: Iterable of DataFrame chunks to clean
+        event_emitter: Function to emit events (file_id, event)
+        db_adapter: Database adapter
+        chunk_rows: Rows per chunk when reading the cleaned file back
+                    (defaults to the size of the largest input chunk)
+    
+    Returns:
+        Tuple of (iterator over cleaned DataFrame chunks, number of cleaned rows)
+    """
+    event_emitter(file_id, TASK_STATUS_PROCESS_CLEANING)
+    
+    rule_set = get_task_cleaning_rule_set(file_id, db_adapter)
+    ensure_directory_exists(STORAGE_CLEANED)
+    cleaned_path = os.path.abspath(os.path.join(STORAGE_CLEANED, f"{file_id}.csv"))
+    spill_path = f"{cleaned_path}.part"
+    
+    initial_rows = 0
+    kept_rows = 0
+    largest_chunk = 0
+    seen_hashes = HashSeenSet()
+    numeric_cols = None
+    numeric_parts = []
+    manifest = None
+    text_stats = {}
+    
+    with open(spill_path, 'w', newline='', encoding='utf-8') as spill:
+        for chunk in chunks:
+            initial_rows += len(chunk)
+            largest_chunk = max(largest_chunk, len(chunk))
+            
+            if 'full_text' in chunk.columns:
+                chunk['full_text'] = clean_text_column(chunk['full_text'], stats=text_stats, rule_set=rule_set)
+            
+            chunk = chunk[seen_hashes.add(row_hashes(chunk, DEDUPE_KEY_COLUMNS))]
+            
+            chunk_numeric = [col for col in chunk.select_dtypes(include=[np.number]).columns
+                             if col not in rule_set.outlier_excluded_columns]
+            if numeric_cols is None:
+                numeric_cols = chunk_numeric
+            else:
+                numeric_cols = [col for col in numeric_cols if col in chunk_numeric]
+            numeric_parts.append(chunk[numeric_cols].reset_index(drop=True))
+            
+            chunk.to_csv(spill, index=(chunk.index.name == SOURCE_ROW_COLUMN), header=(spill.tell() == 0))
+            manifest = merge_dtype_manifests(manifest, build_dtype_manifest(chunk))
+            kept_rows += len(chunk)
+            print(f"Cleaned chunk: {len(chunk)} rows kept ({kept_rows} total)")
+    
+    duplicates_removed = initial_rows - kept_rows
+    print(f"Deduplicated {initial_rows} rows with {seen_hashes.nbytes} bytes of row hashes")
+    del seen_hashes
+    
+    # Remove outliers using IQR method (Interquartile Range)
+    numeric_cols = numeric_cols or []
+    if numeric_cols and kept_rows > 0:
+        numeric_df = pd.concat([part[numeric_cols] for part in numeric_parts], ignore_index=True)
+        keep_mask = _iqr_keep_mask(numeric_df)
+        del numeric_df
+    else:
+        keep_mask = np.ones(kept_rows, dtype=bool)
+    del numeric_parts
+    outliers_removed = int(kept_rows - keep_mask.sum())
+    
+    chunk_rows = chunk_rows or largest_chunk or STREAMING_CHUNK_ROWS
+    if outliers_removed == 0:
+        os.replace(spill_path, cleaned_path)
+    else:
+        if manifest is not None:
+            write_dtype_manifest(spill_path, manifest)
+        with open(cleaned_path, 'w', newline='', encoding='utf-8') as out:
+            offset = 0
+            for chunk in iter_csv_chunks(spill_path, chunk_rows):
+                chunk_mask = keep_mask[offset:offset + len(chunk)]
+                offset += len(chunk)
+                chunk[chunk_mask].to_csv(out, index=(chunk.index.name == SOURCE_ROW_COLUMN),
+                                         header=(out.tell() == 0))
+        remove_csv(spill_path)
+    if manifest is not None:
+        write_dtype_manifest(cleaned_path, manifest)
+    # Streamed datasets have no columnar checkpoint; drop one left by an earlier run
+    checkpoint = checkpoint_path(cleaned_path)
+    if checkpoint is not None and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    
+    final_rows = kept_rows - outliers_removed
+    print(f"Cleaned dataset: removed {duplicates_removed} duplicates, {outliers_removed} outliers")
+    print(f"Final dataset: {final_rows} rows")
+    print(f"Saved cleaned dataset to: {cleaned_path}")
+    
+    _update_task_cleaned_path(file_id, db_adapter)
+    
+    event_emitter(
+        file_id,
+        TASK_STATUS_PROCESS_CLEANING_DONE,
+        {
+            'initial_rows': initial_rows,
+            'final_rows': final_rows,
+            'duplicates_removed': duplicates_removed,
+            'outliers_removed': outliers_removed,
+            'cleaned_path': cleaned_path,
+            'text_cache_hit_ratio': _text_cache_hit_ratio(text_stats),
+            'streaming': True,
+        }
+    )
+    
+    return iter_csv_chunks(cleaned_path, chunk_rows), final_rows
@@ -0,0 +1,126 @@
+"""Callback function for reusing the analysis of identical datasets."""
+import os
+import sys
+from datetime import datetime
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.configs.env import (
+    STORAGE_ANALYSED, OUTLIER_MODE, DEDUPE_KEY_COLUMNS,
+    NEAR_DUPLICATES_ENABLED, NEAR_DUPLICATE_THRESHOLD, NEAR_DUPLICATE_NUM_PERM,
+    NEAR_DUPLICATE_SHINGLE_SIZE, LLM_DEDUPE_TEXTS,
+    PROJECTION_ENABLED, PROJECTION_COLUMNS, PROJECTION_SAMPLE_ROWS,
+)
+from src.configs.constants import TASK_STATUS_DONE, LLM_PROMPT_VERSION
+from src.utils.dataset_io import dtype_manifest_path
+from src.utils.fingerprint import file_fingerprint, config_fingerprint
+from src.utils.cleaning_rules import get_task_cleaning_rule_set
+from src.utils.helpers import copy_file, ensure_directory_exists
+
+
+def pipeline_fingerprint() -> str:
+    """
+    Fingerprint the worker settings that change the analysed output.
+
+    Returns:
+        Fingerprint of the LLM prompt version and the cleaning, deduplication,
+        near-duplicate and projection settings
+    """
+    return config_fingerprint({
+        'llm_prompt_version': LLM_PROMPT_VERSION,
+        'outlier_mode': OUTLIER_MODE,
+        'dedupe_key_columns': DEDUPE_KEY_COLUMNS,
+        'near_duplicates_enabled': NEAR_DUPLICATES_ENABLED,
+        'near_duplicate_threshold': NEAR_DUPLICATE_THRESHOLD,
+        'near_duplicate_num_perm': NEAR_DUPLICATE_NUM_PERM,
+        'near_duplicate_shingle_size': NEAR_DUPLICATE_SHINGLE_SIZE,
+        'llm_dedupe_texts': LLM_DEDUPE_TEXTS,
+        'projection_enabled': PROJECTION_ENABLED,
+        'projection_columns': PROJECTION_COLUMNS,
+        'projection_sample_rows': PROJECTION_SAMPLE_ROWS,
+    })
+
+
+def fingerprinting(file_id: str, file_path: str, ai_config: dict, event_emitter: callable,
+                   db_adapter) -> Optional[str]:
+    """
+    Fingerprint a dataset and reuse the analysis of an identical one.
+
+    The content, AI configuration, cleaning rules and pipeline settings
+    fingerprints are stored on the task. When a completed task has the same
+    fingerprints and its analysed file
+    still exists, that file is copied as the analysed file of this task,
+    which is marked done without running the pipeline. It is a copy rather
+    than a hard link so that a re-run of either task, which rewrites its
+    artifacts in place, cannot change the other's.
+
+    Args:
+        file_id: File identifier
+        file_path: Path to the dataset file
+        ai_config: AI configuration dictionary
+        event_emitter: Function to emit events (file_id, event)
+        db_adapter: Database adapter
+
+    Returns:
+        Path to the reused analysed file, or None when the pipeline must run
+    """
+    fingerprint = file_fingerprint(file_path)
+    ai_fingerprint = config_fingerprint(ai_config)
+    cleaning_fingerprint = get_task_cleaning_rule_set(file_id, db_adapter).fingerprint
+    settings_fingerprint = pipeline_fingerprint()
+    print(f"Dataset fingerprint: {fingerprint}")
+
+    db_adapter.update_one(
+        'tasks',
+        {'data.file_id': file_id},
+        {
+            'data.fingerprint': fingerprint,
+            'data.ai_fingerprint': ai_fingerprint,
+            'data.cleaning_fingerprint': cleaning_fingerprint,
+            'data.pipeline_fingerprint': settings_fingerprint,
+            'updatedAt': datetime.utcnow(),
+            'updatedBy': 'system',
+        }
+    )
+
+    previous = db_adapter.find_one('tasks', {
+        'data.fingerprint': fingerprint,
+        'data.ai_fingerprint': ai_fingerprint,
+        'data.cleaning_fingerprint': cleaning_fingerprint,
+        'data.pipeline_fingerprint': settings_fingerprint,
+        'data.status': TASK_STATUS_DONE,
+        'data.file_id': {'$ne': file_id},
+    })
+    if not previous:
+        return None
+
+    previous_id = previous.get('data', {}).get('file_id')
+    source_path = os.path.abspath(os.path.join(STORAGE_ANALYSED, f"{previous_id}.csv"))
+    if not previous_id or not os.path.exists(source_path):
+        print(f"Analysed file of identical dataset {previous_id} is missing, processing again")
+        return None
+
+    ensure_directory_exists(STORAGE_ANALYSED)
+    analysed_path = os.path.abspath(os.path.join(STORAGE_ANALYSED, f"{file_id}.csv"))
+    copy_file(source_path, analysed_path)
+    if os.path.exists(dtype_manifest_path(source_path)):
+        copy_file(dtype_manifest_path(source_path), dtype_manifest_path(analysed_path))
+    print(f"Reused analysed dataset of {previous_id} for {file_id}: {analysed_path}")
+
+    db_adapter.update_one(
+        'tasks',
+        {'data.file_id': file_id},
+        {
+            'data.file_analysed.path': os.path.join('analysed', f"{file_id}.csv"),
+            'data.file_analysed.type': 'text/csv',
+            'data.reused_from': previous_id,
+            'data.status': TASK_STATUS_DONE,
+            'updatedAt': datetime.utcnow(),
+            'updatedBy': 'system',
+        }
+    )
+
+    event_emitter(file_id, TASK_STATUS_DONE)
+
+    return analysed_path
@@ -0,0 +1,135 @@
+"""Callback function for profiling dataset before processing."""
+import math
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.configs.env import (
+    DEFAULT_PAGINATE_ROWS_LIMIT, MAX_PAGINATE_ROWS_LIMIT,
+    PROFILING_SAMPLE_ROWS, STREAMING_ENABLED, STREAMING_CHUNK_ROWS, STREAMING_CHUNK_BYTES,
+    STREAMING_MEMORY_BUDGET_BYTES, LLM_SECONDS_PER_BATCH,
+)
+from src.configs.constants import EXECUTION_MODE_IN_MEMORY, EXECUTION_MODE_STREAMING
+from src.utils.dataset_io import (
+    FORMAT_CSV, detect_format, detect_compression,
+    count_csv_rows, dataset_num_rows, read_dataset_sample,
+)
+from src.utils.helpers import get_file_id_from_path
+from src.utils.tokens import TOKENS_PER_ROW_OVERHEAD, batch_row_cap, batch_token_budget, estimate_tokens
+
+
+def _first_model(ai_config: dict):
+    """Get the model the LLM step will use first."""
+    from src.services.calling_llm import _get_ai_model
+
+    return _get_ai_model(ai_config or {}) if ai_config else None
+
+
+def _model_paginate_limit(ai_config: dict) -> int:
+    """Get the batch size configured on the model the LLM step will use first."""
+    model = _first_model(ai_config)
+    paginate_limit = DEFAULT_PAGINATE_ROWS_LIMIT
+    if model:
+        paginate_limit = model.get('data', {}).get('paginateRowsLimit', DEFAULT_PAGINATE_ROWS_LIMIT)
+    return min(paginate_limit, MAX_PAGINATE_ROWS_LIMIT)
+
+
+def profiling(file_path: str, event_emitter: callable, ai_config: dict = None, db_adapter=None) -> dict:
+    """
+    Profile a dataset with a cheap pre-pass and plan the pipeline.
+
+    Rows are counted with a newline scan (or from the metadata of columnar
+    files), and text length and memory footprint are estimated on a sample.
+    The resulting plan (execution mode, chunk size, LLM batch size and ETA)
+    is stored on the task document under data.profile. No task event is
+    emitted, so the task status is left unchanged.
+
+    Args:
+        file_path: Path to the dataset file
+        event_emitter: Function to emit events (file_id, event) (unused)
+        ai_config: AI configuration dictionary (used for the LLM batch size)
+        db_adapter: Database adapter
+
+    Returns:
+        Profile dictionary
+    """
+    file_id = get_file_id_from_path(file_path)
+
+    fmt = detect_format(file_path)
+    if fmt == FORMAT_CSV:
+        estimated_rows = count_csv_rows(file_path)
+    else:
+        estimated_rows = dataset_num_rows(file_path)
+
+    sample = read_dataset_sample(file_path, PROFILING_SAMPLE_ROWS)
+    sample_rows = len(sample)
+
+    avg_text_chars = 0.0
+    if sample_rows and 'full_text' in sample.columns:
+        avg_text_chars = float(sample['full_text'].dropna().astype(str).str.len().mean() or 0.0)
+    avg_text_tokens = estimate_tokens(avg_text_chars)
+
+    avg_row_bytes = int(sample.memory_usage(deep=True, index=False).sum() / sample_rows) if sample_rows else 0
+    estimated_memory_bytes = avg_row_bytes * estimated_rows
+
+    # Execution mode and chunk size
+    if STREAMING_ENABLED or (STREAMING_MEMORY_BUDGET_BYTES and estimated_memory_bytes > STREAMING_MEMORY_BUDGET_BYTES):
+        execution_mode = EXECUTION_MODE_STREAMING
+    else:
+        execution_mode = EXECUTION_MODE_IN_MEMORY
+
+    if STREAMING_CHUNK_BYTES and avg_row_bytes:
+        chunk_rows = max(1, STREAMING_CHUNK_BYTES // avg_row_bytes)
+    else:
+        chunk_rows = STREAMING_CHUNK_ROWS
+
+    # LLM batch size: rows of an average text fitting the token budget per request
+    # (an estimate only: batches are packed by tokens up to the model's hard row
+    # cap), or the model's row limit without a budget
+    model = _first_model(ai_config)
+    token_budget = batch_token_budget(model)
+    if token_budget:
+        llm_batch_rows = max(1, min(batch_row_cap(model), token_budget // (avg_text_tokens + TOKENS_PER_ROW_OVERHEAD)))
+    else:
+        llm_batch_rows = _model_paginate_limit(ai_config)
+    estimated_batches = int(math.ceil(estimated_rows / llm_batch_rows)) if llm_batch_rows else 0
+
+    profile = {
+        'format': fmt,
+        'compression': detect_compression(file_path),
+        'file_bytes': os.path.getsize(file_path),
+        'estimated_rows': estimated_rows,
+        'columns': len(sample.columns),
+        'sample_rows': sample_rows,
+        'avg_text_chars': round(avg_text_chars, 1),
+        'avg_text_tokens': avg_text_tokens,
+        'estimated_text_tokens': avg_text_tokens * estimated_rows,
+        'avg_row_bytes': avg_row_bytes,
+        'estimated_memory_bytes': estimated_memory_bytes,
+        'execution_mode': execution_mode,
+        'chunk_rows': chunk_rows,
+        'llm_batch_rows': llm_batch_rows,
+        'llm_token_budget': token_budget,
+        'estimated_batches': estimated_batches,
+        'estimated_seconds': int(estimated_batches * LLM_SECONDS_PER_BATCH),
+    }
+    print(f"Profiled dataset: ~{estimated_rows} rows, ~{avg_text_tokens} tokens/text, "
+          f"mode={execution_mode}, llm_batch_rows={llm_batch_rows}")
+
+    if db_adapter is not None:
+        try:
+            db_adapter.update_one(
+                'tasks',
+                {'data.file_id': file_id},
+                {
+                    'data.profile': profile,
+                    'updatedAt': datetime.utcnow(),
+                    'updatedBy': 'system',
+                }
+            )
+        except Exception as exc:
+            print(f"Warning: failed to update task with dataset profile: {exc}")
+
+    return profile
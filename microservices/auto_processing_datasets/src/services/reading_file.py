@@ -2,23 +2,73 @@
 import pandas as pd
 import sys
 import os
+from typing import Iterator, List, Optional
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from src.utils.helpers import get_file_id_from_path
+from src.utils.dataset_io import (
+    FORMAT_CSV, SOURCE_ROW_COLUMN, detect_format, dataset_columns, dataset_num_rows,
+    read_dataset, iter_dataset_chunks, infer_projection, open_dataset_stream, to_arrow_strings
+)
+from src.configs.env import (
+    STREAMING_CHUNK_ROWS, STREAMING_CHUNK_BYTES, ARROW_STRINGS_ENABLED,
+    PROJECTION_ENABLED, PROJECTION_COLUMNS, PROJECTION_SAMPLE_ROWS
+)
 from src.configs.constants import (
     TASK_STATUS_READING_DATASET,
     TASK_STATUS_READING_DATASET_DONE,
+    PIPELINE_REQUIRED_COLUMNS,
 )
 
+# Number of bytes sampled from the head of the file to estimate the row size
+BYTE_BUDGET_SAMPLE_SIZE = 1024 * 1024
+
+
+def pipeline_columns(file_path: str) -> List[str]:
+    """
+    Get the columns of a dataset that the pipeline needs to load.
+    
+    Args:
+        file_path: Path to the dataset file
+    
+    Returns:
+        Identifiers, full_text, numeric columns and PROJECTION_COLUMNS, in file order
+    """
+    return infer_projection(
+        file_path,
+        PIPELINE_REQUIRED_COLUMNS + PROJECTION_COLUMNS,
+        PROJECTION_SAMPLE_ROWS
+    )
+
 
-def reading_file(file_path: str, event_emitter: callable) -> tuple[str, pd.DataFrame]:
+def reading_file(file_path: str, event_emitter: callable,
+                 engine: Optional[str] = None,
+                 columns: Optional[List[str]] = None,
+                 memory_map: Optional[bool] = None) -> tuple[str, pd.DataFrame]:
     """
-    Read CSV dataset from file path.
+    Read dataset from file path.
+    
+    CSV, Parquet, Feather and Arrow IPC files are supported; the format is
+    detected from the file content and extension.
+    
+    When a projection is used (explicit columns or PROJECTION_ENABLED), only
+    those columns are parsed and the index holds the source row positions
+    so that saving() can join the other columns back.
+    
+    In memory-mapped mode (memory_map or CSV_MEMORY_MAP) uncompressed CSV
+    files are parsed straight from the OS page cache, so files larger than
+    RAM are not copied into Python buffers.
+    
+    With ARROW_STRINGS_ENABLED, text columns are returned as Arrow-backed
+    strings.
     
     Args:
-        file_path: Path to the CSV file
+        file_path: Path to the dataset file
         event_emitter: Function to emit events (file_id, event)
+        engine: CSV engine ('c' or 'pyarrow'), defaults to CSV_ENGINE
+        columns: Columns to load (defaults to pipeline_columns() when PROJECTION_ENABLED)
+        memory_map: Memory-map uncompressed CSV files, defaults to CSV_MEMORY_MAP
     
     Returns:
         Tuple of (file_id, dataframe)
@@ -27,14 +77,146 @@ def reading_file(file_path: str, event_emitter: callable) -> tuple[str, pd.DataF
     
     event_emitter(file_id, TASK_STATUS_READING_DATASET)
     
-    df = pd.read_csv(file_path)
+    if columns is None and PROJECTION_ENABLED and os.path.exists(file_path):
+        columns = pipeline_columns(file_path)
+    
+    df = read_dataset(file_path, engine, usecols=columns, memory_map=memory_map)
+    if ARROW_STRINGS_ENABLED:
+        df = to_arrow_strings(df)
     print(f"Read dataset: {len(df)} rows, {len(df.columns)} columns")
+    
+    metadata = {'rows': len(df), 'columns': len(df.columns)}
+    if columns is not None:
+        df.index.name = SOURCE_ROW_COLUMN
+        metadata['source_columns'] = len(dataset_columns(file_path))
+        print(f"Projected {len(df.columns)} of {metadata['source_columns']} columns")
 
     event_emitter(
         file_id,
         TASK_STATUS_READING_DATASET_DONE,
-        {'rows': len(df), 'columns': len(df.columns)}
+        metadata
     )
     
     return file_id, df
 
+
+def rows_for_byte_budget(file_path: str, chunk_bytes: int) -> int:
+    """
+    Estimate how many rows fit in a byte budget.
+
+    The average row size is measured on the (decompressed) head of CSV
+    files, or taken from the row count in the metadata of columnar files,
+    so the estimate never requires reading the whole dataset.
+
+    Args:
+        file_path: Path to the dataset file
+        chunk_bytes: Byte budget per chunk
+
+    Returns:
+        Number of rows per chunk (at least 1)
+    """
+    if detect_format(file_path) != FORMAT_CSV:
+        num_rows = dataset_num_rows(file_path)
+        if num_rows == 0:
+            return max(1, STREAMING_CHUNK_ROWS)
+        bytes_per_row = max(1, os.path.getsize(file_path) // num_rows)
+        return max(1, chunk_bytes // bytes_per_row)
+
+    with open_dataset_stream(file_path) as f:
+        sample = f.read(BYTE_BUDGET_SAMPLE_SIZE)
+    sample = sample[sample.find(b'\n') + 1:]  # Skip header
+
+    lines = sample.count(b'\n')
+    if lines == 0:
+        return max(1, STREAMING_CHUNK_ROWS)
+
+    bytes_per_row = max(1, len(sample) // lines)
+    return max(1, chunk_bytes // bytes_per_row)
+
+
+def resolve_chunk_rows(file_path: str, chunk_rows: Optional[int] = None,
+                       chunk_bytes: Optional[int] = None) -> int:
+    """
+    Resolve the number of rows per chunk from a row or byte budget.
+
+    An explicit byte budget wins over a row budget; when neither is given
+    the STREAMING_CHUNK_BYTES / STREAMING_CHUNK_ROWS settings are used.
+
+    Args:
+        file_path: Path to the dataset file
+        chunk_rows: Row budget per chunk
+        chunk_bytes: Byte budget per chunk
+
+    Returns:
+        Number of rows per chunk
+    """
+    if chunk_bytes is None and chunk_rows is None:
+        chunk_bytes = STREAMING_CHUNK_BYTES or None
+        chunk_rows = STREAMING_CHUNK_ROWS
+
+    if chunk_bytes:
+        return rows_for_byte_budget(file_path, chunk_bytes)
+    return max(1, int(chunk_rows))
+
+
+def _with_source_rows(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Name the index of a projected chunk so its source row positions are kept."""
+    chunk.index.name = SOURCE_ROW_COLUMN
+    return chunk
+
+
+def reading_file_chunks(file_path: str, event_emitter: callable,
+                        chunk_rows: Optional[int] = None,
+                        chunk_bytes: Optional[int] = None,
+                        engine: Optional[str] = None,
+                        memory_map: Optional[bool] = None,
+                        columns: Optional[List[str]] = None) -> tuple[str, Iterator[pd.DataFrame]]:
+    """
+    Read dataset from file path as a stream of fixed-size chunks.
+
+    Only one chunk is held in memory at a time. The done event is emitted
+    once the reader is opened, since the row count is only known after the
+    stream has been consumed.
+
+    When a projection is used (explicit columns or PROJECTION_ENABLED), only
+    those columns are parsed and the index of each chunk holds the source
+    row positions, as with reading_file().
+
+    Args:
+        file_path: Path to the dataset file
+        event_emitter: Function to emit events (file_id, event)
+        chunk_rows: Maximum number of rows per chunk
+        chunk_bytes: Approximate maximum number of bytes per chunk
+        engine: CSV engine ('c' or 'pyarrow'), defaults to CSV_ENGINE
+        memory_map: Memory-map uncompressed CSV files, defaults to CSV_MEMORY_MAP
+        columns: Columns to load (defaults to pipeline_columns() when PROJECTION_ENABLED)
+
+    Returns:
+        Tuple of (file_id, iterator of dataframes)
+    """
+    file_id = get_file_id_from_path(file_path)
+
+    event_emitter(file_id, TASK_STATUS_READING_DATASET)
+
+    if columns is None and PROJECTION_ENABLED and os.path.exists(file_path):
+        columns = pipeline_columns(file_path)
+
+    rows_per_chunk = resolve_chunk_rows(file_path, chunk_rows, chunk_bytes)
+    reader = iter_dataset_chunks(file_path, rows_per_chunk, engine, memory_map, usecols=columns)
+    if ARROW_STRINGS_ENABLED:
+        reader = map(to_arrow_strings, reader)
+    print(f"Streaming dataset in chunks of {rows_per_chunk} rows")
+
+    metadata = {'streaming': True, 'chunk_rows': rows_per_chunk}
+    if columns is not None:
+        reader = map(_with_source_rows, reader)
+        metadata['source_columns'] = len(dataset_columns(file_path))
+        print(f"Projected {len(columns)} of {metadata['source_columns']} columns")
+
+    event_emitter(
+        file_id,
+        TASK_STATUS_READING_DATASET_DONE,
+        metadata
+    )
+
+    return file_id, reader
@@ -74,5 +74,5 @@ def retry_step(file_id: str, last_event_step: str, file_path: str, ai_config: di
                 file_id, df = reading_file(file_path, event_emitter)
                 df = cleaning(file_id, df, event_emitter, db_adapter)
                 df, _ = calling_llm(file_id, df, ai_config, event_emitter)
-            saving(file_id, df, event_emitter, db_adapter)
+            saving(file_id, df, event_emitter, db_adapter, source_path=file_path)
 
@@ -1,6 +1,7 @@
 """Callback function for saving analysed dataset."""
 import os
 import sys
+import pandas as pd
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
@@ -13,16 +14,23 @@ from src.configs.constants import (
 from datetime import datetime
 
 from src.utils.helpers import ensure_directory_exists
+from src.utils.dataset_io import (
+    SOURCE_ROW_COLUMN, merge_passthrough_columns, merge_passthrough_chunks, write_csv_chunks,
+    build_dtype_manifest, write_dtype_manifest
+)
 
 
-def saving(file_id: str, df, event_emitter: callable, db_adapter=None) -> str:
+def saving(file_id: str, df, event_emitter: callable, db_adapter=None, source_path: str = None) -> str:
     """
     Save the analysed dataset.
     
     Args:
         file_id: File identifier
-        df: DataFrame to save
+        df: DataFrame to save, or an iterable of DataFrame chunks
         event_emitter: Function to emit events (file_id, event)
+        db_adapter: Database adapter
+        source_path: Source dataset of a projected DataFrame (or chunks), used
+                     to join back the columns that were not loaded
     
     Returns:
         Path to saved file
@@ -37,7 +45,16 @@ def saving(file_id: str, df, event_emitter: callable, db_adapter=None) -> str:
     analysed_path = os.path.join(STORAGE_ANALYSED, f"{file_id}.csv")
     # Ensure we use absolute path for file operations
     analysed_path = os.path.abspath(analysed_path)
-    df.to_csv(analysed_path, index=False)
+    if isinstance(df, pd.DataFrame):
+        if source_path and df.index.name == SOURCE_ROW_COLUMN:
+            df = merge_passthrough_columns(df, source_path)
+        df.to_csv(analysed_path, index=False)
+        write_dtype_manifest(analysed_path, build_dtype_manifest(df.reset_index(drop=True)))
+    else:
+        # Streaming mode: append chunks as they are produced
+        if source_path:
+            df = merge_passthrough_chunks(df, source_path)
+        write_csv_chunks(analysed_path, df)
     
     print(f"Saved analysed dataset to: {analysed_path}")
 
@@ -18,15 +18,27 @@ from src.configs.constants import (
     TASK_STATUS_SENDING_TO_LLM_DONE,
     TASK_STATUS_APPENDING_COLUMNS, TASK_STATUS_APPENDING_COLUMNS_DONE,
     TASK_STATUS_SAVING_FILE, TASK_STATUS_SAVING_FILE_DONE,
-    TASK_STATUS_DONE, TASK_STATUS_ON_ERROR
+    TASK_STATUS_DONE, TASK_STATUS_ON_ERROR,
+    EXECUTION_MODE_STREAMING
 )
 from src.services import (
     reading_file, cleaning, calling_llm,
     appending_columns, saving
 )
+from src.services.reading_file import reading_file_chunks
+from src.services.cleaning import cleaning_chunks
+from src.services.calling_llm import calling_llm_chunks
+from src.services.profiling import profiling
+from src.services.fingerprinting import fingerprinting
 from src.lib.database.service import DatabaseService
 from src.configs.env import (
-    DB_TYPE, DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD
+    DB_TYPE, DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD,
+    STREAMING_ENABLED, STREAMING_CHUNK_ROWS, PROFILING_ENABLED, FINGERPRINT_ENABLED
+)
+from src.utils.helpers import ensure_directory_exists
+from src.utils.dataset_io import (
+    read_csv, iter_csv_chunks, iter_dataset_chunks, write_csv_chunks, remove_csv,
+    intermediate_path, read_intermediate
 )
 from src.utils.logger import setup_logger
 
@@ -138,6 +150,63 @@ def update_task_status(file_id: str, status: str, db_adapter=None):
         task_logger.error(f"Error updating task status: {e}", exc_info=True)
 
 
+def run_streaming_pipeline(file_id: str, file_path: str, ai_config: dict, event_emitter: callable,
+                           db_adapter=None, cleaned_path: Optional[str] = None,
+                           chunk_rows: Optional[int] = None,
+                           max_batch_rows: Optional[int] = None) -> str:
+    """
+    Run the pipeline chunk by chunk so peak memory depends on the chunk size.
+    
+    LLM results are staged next to the analysed file while the LLM step runs,
+    so that events keep their usual order (sending_to_llm_done before
+    appending_collumns and saving_file).
+    
+    With PROJECTION_ENABLED, chunks only carry the pipeline columns and
+    their source row positions; the other columns are joined back while
+    saving.
+    
+    Args:
+        file_id: File identifier
+        file_path: Path to the dataset file
+        ai_config: AI configuration dictionary
+        event_emitter: Function to emit events (file_id, event)
+        db_adapter: Database adapter
+        cleaned_path: Existing cleaned dataset (checkpoint or CSV) to resume from (skips reading and cleaning)
+        chunk_rows: Rows per chunk (defaults to the STREAMING_CHUNK_ROWS / STREAMING_CHUNK_BYTES settings)
+        max_batch_rows: Upper bound on rows per LLM request
+    
+    Returns:
+        Path to the analysed file
+    """
+    from src.configs.env import STORAGE_ANALYSED
+    
+    if cleaned_path is None:
+        file_id, chunks = reading_file_chunks(file_path, event_emitter, chunk_rows=chunk_rows)
+        update_task_status(file_id, TASK_STATUS_READING_DATASET_DONE, db_adapter)
+        
+        chunks, total_rows = cleaning_chunks(file_id, chunks, event_emitter, db_adapter, chunk_rows)
+        update_task_status(file_id, TASK_STATUS_PROCESS_CLEANING_DONE, db_adapter)
+    else:
+        chunks, total_rows = iter_dataset_chunks(cleaned_path, chunk_rows or STREAMING_CHUNK_ROWS), None
+    
+    ensure_directory_exists(STORAGE_ANALYSED)
+    staged_path = os.path.abspath(os.path.join(STORAGE_ANALYSED, f"{file_id}.csv.part"))
+    write_csv_chunks(staged_path, calling_llm_chunks(
+        file_id, chunks, ai_config, event_emitter, total_rows, max_batch_rows=max_batch_rows
+    ))
+    update_task_status(file_id, TASK_STATUS_SENDING_TO_LLM_DONE, db_adapter)
+    
+    appending_columns(file_id, event_emitter)
+    update_task_status(file_id, TASK_STATUS_APPENDING_COLUMNS_DONE, db_adapter)
+    
+    analysed_path = saving(file_id, iter_csv_chunks(staged_path, chunk_rows or STREAMING_CHUNK_ROWS),
+                           event_emitter, db_adapter, source_path=file_path)
+    remove_csv(staged_path)
+    update_task_status(file_id, TASK_STATUS_DONE, db_adapter)
+    
+    return analysed_path
+
+
 @celery_app.task(bind=True, name='src.tasks.processor.process_dataset')
 def process_dataset(self, file_id: str, file_path: str, ai_config: dict, last_step: str = None):
     """
@@ -176,6 +245,17 @@ def process_dataset(self, file_id: str, file_path: str, ai_config: dict, last_st
         if last_step in step_aliases:
             last_step = step_aliases[last_step]
 
+        # Skip the pipeline when an identical dataset was already analysed with the
+        # same settings (hashing the file happens here, not in the event listener)
+        if FINGERPRINT_ENABLED and last_step == TASK_STATUS_IN_QUEUE:
+            try:
+                analysed_path = fingerprinting(file_id, file_path, ai_config, event_emitter, db_adapter)
+                if analysed_path:
+                    task_logger.info(f"Task {file_id}: Reused analysed dataset {analysed_path}")
+                    return {'success': True, 'file_id': file_id, 'reused': True}
+            except Exception as e:
+                task_logger.warning(f"Task {file_id}: Fingerprinting failed, processing dataset: {e}")
+
         # Emit event and update status for the starting step
         # Services will emit their own events (reading_dataset, reading_dataset_done, etc.)
         # We only emit the initial step event here
@@ -183,8 +263,40 @@ def process_dataset(self, file_id: str, file_path: str, ai_config: dict, last_st
         update_task_status(file_id, last_step, db_adapter)
         task_logger.info(f"Task {file_id} starting from step: {last_step}")
         
+        # Profile the dataset to pick the execution mode, chunk size and LLM batch size
+        profile = {}
+        if PROFILING_ENABLED and last_step in (
+            TASK_STATUS_IN_QUEUE, TASK_STATUS_READING_DATASET,
+            TASK_STATUS_PROCESS_CLEANING, TASK_STATUS_SENDING_TO_LLM
+        ):
+            try:
+                profile = profiling(file_path, event_emitter, ai_config, db_adapter)
+            except Exception as e:
+                task_logger.warning(f"Task {file_id}: Profiling failed, using default settings: {e}")
+        streaming = STREAMING_ENABLED or profile.get('execution_mode') == EXECUTION_MODE_STREAMING
+        chunk_rows = profile.get('chunk_rows')
+        llm_batch_rows = profile.get('llm_batch_rows')
+        
         # Process pipeline based on last_step
-        if last_step == TASK_STATUS_IN_QUEUE:
+        if streaming and last_step in (TASK_STATUS_IN_QUEUE, TASK_STATUS_READING_DATASET):
+            # Streaming mode: services consume and produce DataFrame chunks
+            task_logger.info(f"Task {file_id}: Streaming pipeline (chunks of {chunk_rows or STREAMING_CHUNK_ROWS} rows)")
+            run_streaming_pipeline(
+                file_id, file_path, ai_config, event_emitter, db_adapter,
+                chunk_rows=chunk_rows, max_batch_rows=llm_batch_rows
+            )
+            
+        elif streaming and last_step in (TASK_STATUS_PROCESS_CLEANING, TASK_STATUS_SENDING_TO_LLM):
+            # Streaming resume from LLM: reuse the cleaned file if it exists
+            from src.configs.env import STORAGE_CLEANED
+            cleaned_path = intermediate_path(os.path.join(STORAGE_CLEANED, f"{file_id}.csv"))
+            run_streaming_pipeline(
+                file_id, file_path, ai_config, event_emitter, db_adapter,
+                cleaned_path=cleaned_path,
+                chunk_rows=chunk_rows, max_batch_rows=llm_batch_rows
+            )
+            
+        elif last_step == TASK_STATUS_IN_QUEUE:
             # Start from beginning
             # Services emit their own events (reading_dataset -> reading_dataset_done, etc.)
             # We only update database status to reflect current state
@@ -201,7 +313,7 @@ def process_dataset(self, file_id: str, file_path: str, ai_config: dict, last_st
             update_task_status(file_id, TASK_STATUS_PROCESS_CLEANING_DONE, db_adapter)
             
             task_logger.info(f"Task {file_id}: Step 3 - Calling LLM")
-            df, _ = calling_llm(file_id, df, ai_config, event_emitter)
+            df, _ = calling_llm(file_id, df, ai_config, event_emitter, max_batch_rows=llm_batch_rows)
             # calling_llm emits sending_to_llm, sending_to_llm_progression, and sending_to_llm_done events
             # Update DB to reflect completion of LLM step
             update_task_status(file_id, TASK_STATUS_SENDING_TO_LLM_DONE, db_adapter)
@@ -213,7 +325,7 @@ def process_dataset(self, file_id: str, file_path: str, ai_config: dict, last_st
             update_task_status(file_id, TASK_STATUS_APPENDING_COLUMNS_DONE, db_adapter)
             
             task_logger.info(f"Task {file_id}: Step 5 - Saving file")
-            saving(file_id, df, event_emitter, db_adapter)
+            saving(file_id, df, event_emitter, db_adapter, source_path=file_path)
             # saving emits saving_file, saving_file_done, and done events
             # Update DB to reflect completion (done event is already emitted by saving service)
             update_task_status(file_id, TASK_STATUS_DONE, db_adapter)
@@ -226,13 +338,13 @@ def process_dataset(self, file_id: str, file_path: str, ai_config: dict, last_st
             df = cleaning(file_id, df, event_emitter, db_adapter)
             update_task_status(file_id, TASK_STATUS_PROCESS_CLEANING_DONE, db_adapter)
             
-            df, _ = calling_llm(file_id, df, ai_config, event_emitter)
+            df, _ = calling_llm(file_id, df, ai_config, event_emitter, max_batch_rows=llm_batch_rows)
             update_task_status(file_id, TASK_STATUS_SENDING_TO_LLM_DONE, db_adapter)
             
             appending_columns(file_id, event_emitter)
             update_task_status(file_id, TASK_STATUS_APPENDING_COLUMNS_DONE, db_adapter)
             
-            saving(file_id, df, event_emitter, db_adapter)
+            saving(file_id, df, event_emitter, db_adapter, source_path=file_path)
             update_task_status(file_id, TASK_STATUS_DONE, db_adapter)
             
         elif last_step == TASK_STATUS_PROCESS_CLEANING:
@@ -241,11 +353,10 @@ def process_dataset(self, file_id: str, file_path: str, ai_config: dict, last_st
             # Services emit their own events, we just update DB status
             from src.configs.env import STORAGE_CLEANED
             cleaned_path = os.path.join(STORAGE_CLEANED, f"{file_id}.csv")
-            if os.path.exists(cleaned_path):
-                # Cleaning already done, continue from LLM
-                # calling_llm will emit sending_to_llm event, so we don't need to emit it here
-                df = pd.read_csv(cleaned_path)
-            else:
+            # Cleaning already done: reload its columnar checkpoint (else its CSV) and continue from LLM
+            # calling_llm will emit sending_to_llm event, so we don't need to emit it here
+            df = read_intermediate(cleaned_path)
+            if df is None:
                 # Need to redo cleaning
                 file_id, df = reading_file(file_path, event_emitter)
                 update_task_status(file_id, TASK_STATUS_READING_DATASET_DONE, db_adapter)
@@ -253,7 +364,7 @@ def process_dataset(self, file_id: str, file_path: str, ai_config: dict, last_st
                 update_task_status(file_id, TASK_STATUS_PROCESS_CLEANING_DONE, db_adapter)
             
             # calling_llm emits sending_to_llm, sending_to_llm_progression, and sending_to_llm_done events
-            df, _ = calling_llm(file_id, df, ai_config, event_emitter)
+            df, _ = calling_llm(file_id, df, ai_config, event_emitter, max_batch_rows=llm_batch_rows)
             update_task_status(file_id, TASK_STATUS_SENDING_TO_LLM_DONE, db_adapter)
             
             # appending_columns emits appending_collumns and appending_collumns_done events
@@ -261,7 +372,7 @@ def process_dataset(self, file_id: str, file_path: str, ai_config: dict, last_st
             update_task_status(file_id, TASK_STATUS_APPENDING_COLUMNS_DONE, db_adapter)
             
             # saving emits saving_file, saving_file_done, and done events
-            saving(file_id, df, event_emitter, db_adapter)
+            saving(file_id, df, event_emitter, db_adapter, source_path=file_path)
             update_task_status(file_id, TASK_STATUS_DONE, db_adapter)
             
         elif last_step == TASK_STATUS_SENDING_TO_LLM:
@@ -269,11 +380,10 @@ def process_dataset(self, file_id: str, file_path: str, ai_config: dict, last_st
             # Services emit their own events, we just update DB status
             from src.configs.env import STORAGE_CLEANED
             cleaned_path = os.path.join(STORAGE_CLEANED, f"{file_id}.csv")
-            if os.path.exists(cleaned_path):
-                # Cleaning already done, continue from LLM
-                # calling_llm will emit sending_to_llm event, so we don't need to emit it here
-                df = pd.read_csv(cleaned_path)
-            else:
+            # Cleaning already done: reload its columnar checkpoint (else its CSV) and continue from LLM
+            # calling_llm will emit sending_to_llm event, so we don't need to emit it here
+            df = read_intermediate(cleaned_path)
+            if df is None:
                 # Need to redo cleaning
                 file_id, df = reading_file(file_path, event_emitter)
                 update_task_status(file_id, TASK_STATUS_READING_DATASET_DONE, db_adapter)
@@ -281,7 +391,7 @@ def process_dataset(self, file_id: str, file_path: str, ai_config: dict, last_st
                 update_task_status(file_id, TASK_STATUS_PROCESS_CLEANING_DONE, db_adapter)
             
             # calling_llm emits sending_to_llm, sending_to_llm_progression, and sending_to_llm_done events
-            df, _ = calling_llm(file_id, df, ai_config, event_emitter)
+            df, _ = calling_llm(file_id, df, ai_config, event_emitter, max_batch_rows=llm_batch_rows)
             update_task_status(file_id, TASK_STATUS_SENDING_TO_LLM_DONE, db_adapter)
             
             # appending_columns emits appending_collumns and appending_collumns_done events
@@ -289,7 +399,7 @@ def process_dataset(self, file_id: str, file_path: str, ai_config: dict, last_st
             update_task_status(file_id, TASK_STATUS_APPENDING_COLUMNS_DONE, db_adapter)
             
             # saving emits saving_file, saving_file_done, and done events
-            saving(file_id, df, event_emitter, db_adapter)
+            saving(file_id, df, event_emitter, db_adapter, source_path=file_path)
             update_task_status(file_id, TASK_STATUS_DONE, db_adapter)
             
         elif last_step == TASK_STATUS_APPENDING_COLUMNS:
@@ -300,14 +410,14 @@ def process_dataset(self, file_id: str, file_path: str, ai_config: dict, last_st
             if os.path.exists(analysed_path):
                 # LLM processing already done, continue from appending columns
                 # appending_columns will emit appending_collumns event, so we don't need to emit it here
-                df = pd.read_csv(analysed_path)
+                df = read_csv(analysed_path)
             else:
                 # Need to redo previous steps
                 file_id, df = reading_file(file_path, event_emitter)
                 update_task_status(file_id, TASK_STATUS_READING_DATASET_DONE, db_adapter)
                 df = cleaning(file_id, df, event_emitter, db_adapter)
                 update_task_status(file_id, TASK_STATUS_PROCESS_CLEANING_DONE, db_adapter)
-                df, _ = calling_llm(file_id, df, ai_config, event_emitter)
+                df, _ = calling_llm(file_id, df, ai_config, event_emitter, max_batch_rows=llm_batch_rows)
                 update_task_status(file_id, TASK_STATUS_SENDING_TO_LLM_DONE, db_adapter)
             
             # appending_columns emits appending_collumns and appending_collumns_done events
@@ -315,7 +425,7 @@ def process_dataset(self, file_id: str, file_path: str, ai_config: dict, last_st
             update_task_status(file_id, TASK_STATUS_APPENDING_COLUMNS_DONE, db_adapter)
             
             # saving emits saving_file, saving_file_done, and done events
-            saving(file_id, df, event_emitter, db_adapter)
+            saving(file_id, df, event_emitter, db_adapter, source_path=file_path)
             update_task_status(file_id, TASK_STATUS_DONE, db_adapter)
             
         elif last_step == TASK_STATUS_SAVING_FILE:
@@ -326,20 +436,20 @@ def process_dataset(self, file_id: str, file_path: str, ai_config: dict, last_st
             if os.path.exists(analysed_path):
                 # Previous steps already done, continue from saving
                 # saving will emit saving_file event, so we don't need to emit it here
-                df = pd.read_csv(analysed_path)
+                df = read_csv(analysed_path)
             else:
                 # Need to redo previous steps
                 file_id, df = reading_file(file_path, event_emitter)
                 update_task_status(file_id, TASK_STATUS_READING_DATASET_DONE, db_adapter)
                 df = cleaning(file_id, df, event_emitter, db_adapter)
                 update_task_status(file_id, TASK_STATUS_PROCESS_CLEANING_DONE, db_adapter)
-                df, _ = calling_llm(file_id, df, ai_config, event_emitter)
+                df, _ = calling_llm(file_id, df, ai_config, event_emitter, max_batch_rows=llm_batch_rows)
                 update_task_status(file_id, TASK_STATUS_SENDING_TO_LLM_DONE, db_adapter)
                 appending_columns(file_id, event_emitter)
                 update_task_status(file_id, TASK_STATUS_APPENDING_COLUMNS_DONE, db_adapter)
             
             # saving emits saving_file, saving_file_done, and done events
-            saving(file_id, df, event_emitter, db_adapter)
+            saving(file_id, df, event_emitter, db_adapter, source_path=file_path)
             update_task_status(file_id, TASK_STATUS_DONE, db_adapter)
         
         task_logger.info(f"Task {file_id} completed successfully")
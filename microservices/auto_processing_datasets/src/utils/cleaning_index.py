@@ -0,0 +1,89 @@
+"""Row-hash index of a cleaned dataset, used to clean appended versions incrementally."""
+import os
+from typing import List, Optional
+
+import numpy as np
+
+# The index is stored next to the cleaned CSV, like its dtype manifest
+CLEANING_INDEX_SUFFIX = '.index.npz'
+
+
+def cleaning_index_path(cleaned_path: str) -> str:
+    """
+    Get the path of the cleaning index of a cleaned CSV file.
+
+    Args:
+        cleaned_path: Path to the cleaned CSV file
+
+    Returns:
+        Path to the index
+    """
+    return f"{cleaned_path}{CLEANING_INDEX_SUFFIX}"
+
+
+class CleaningIndex:
+    """
+    What incremental cleaning needs to know about an already cleaned dataset.
+
+    - key: fingerprint of the settings the rows were cleaned with (rules,
+      dedupe key columns, column names); an index is only reused under the
+      same key
+    - source_hashes: sorted hashes of the raw input rows already cleaned
+    - row_hashes: sorted dedupe hashes of the cleaned rows
+    - numeric_columns / numeric_values: values of the columns checked for
+      outliers, for every deduplicated row, so IQR bounds can be recomputed
+      without reading the cleaned file
+    - kept: which of those rows passed the outlier filter (the rows of the
+      cleaned file, in order)
+    """
+
+    def __init__(self, key: str, source_hashes: np.ndarray, row_hashes: np.ndarray,
+                 numeric_columns: List[str], numeric_values: np.ndarray, kept: np.ndarray):
+        self.key = key
+        self.source_hashes = np.asarray(source_hashes, dtype=np.uint64)
+        self.row_hashes = np.asarray(row_hashes, dtype=np.uint64)
+        self.numeric_columns = list(numeric_columns)
+        self.numeric_values = np.asarray(numeric_values, dtype=np.float64)
+        self.kept = np.asarray(kept, dtype=bool)
+
+    def save(self, file_path: str) -> None:
+        """
+        Write the index to a .npz file.
+
+        Args:
+            file_path: Path to the index file
+        """
+        # np.savez appends .npz to other names, so write through a file object
+        with open(file_path, 'wb') as f:
+            np.savez(
+                f,
+                key=np.array(self.key),
+                source_hashes=self.source_hashes,
+                row_hashes=self.row_hashes,
+                numeric_columns=np.array(self.numeric_columns, dtype=str),
+                numeric_values=self.numeric_values,
+                kept=self.kept,
+            )
+
+    @classmethod
+    def load(cls, file_path: str) -> Optional['CleaningIndex']:
+        """
+        Read an index written by save().
+
+        Args:
+            file_path: Path to the index file
+
+        Returns:
+            CleaningIndex, or None when the file does not exist
+        """
+        if not os.path.exists(file_path):
+            return None
+        with np.load(file_path, allow_pickle=False) as data:
+            return cls(
+                key=str(data['key']),
+                source_hashes=data['source_hashes'],
+                row_hashes=data['row_hashes'],
+                numeric_columns=data['numeric_columns'].tolist(),
+                numeric_values=data['numeric_values'],
+                kept=data['kept'],
+            )
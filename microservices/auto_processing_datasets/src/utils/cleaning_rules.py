@@ -0,0 +1,208 @@
+"""Declarative text-cleaning rules compiled into a code point table and one fused regex."""
+import json
+import os
+import re
+from typing import Optional
+
+import numpy as np
+
+from src.configs.env import CLEANING_RULES
+from src.utils.fingerprint import config_fingerprint
+
+# Separator used by the cleaning kernel to join rows. It is a word character
+# outside the default emoji ranges, so no default rule removes it.
+ROW_SEPARATOR = '\u2180'
+MAX_CODE_POINT = 0x110000
+
+HASHTAGS_STRIP_SYMBOL = 'strip_symbol'  # '#' is removed like other symbols, the word is kept
+HASHTAGS_KEEP = 'keep'                  # '#word' is kept, like @mentions
+HASHTAGS_REMOVE = 'remove'              # '#word' is removed
+
+# Default rules: the behaviour of remove_emoji()
+DEFAULT_CLEANING_RULES = {
+    'emoji_ranges': [
+        [0x1F600, 0x1F64F],
+        [0x1F300, 0x1F5FF],
+        [0x1F680, 0x1F6FF],
+        [0x1F1E0, 0x1F1FF],
+        [0x02702, 0x027B0],
+        [0x024C2, 0x1F251],
+    ],
+    'allowed_punctuation': '.,!?;:()-',
+    'preserve_mentions': True,
+    'collapse_whitespace': True,
+    'strip_urls': False,
+    'hashtags': HASHTAGS_STRIP_SYMBOL,
+    'remove_patterns': [],
+    'outlier_excluded_columns': ['id', 'user_id'],
+}
+
+_URL_PATTERN = r'(?:https?://|www\.)\S+'
+_HASHTAG_PATTERN = r'#\w+'
+
+# Code point class flags
+CHAR_WORD = 1
+CHAR_SPACE = 2
+CHAR_KEPT = 4  # Word, whitespace or allowed punctuation
+CHAR_EMOJI = 8
+CHAR_PREFIX = 16  # Kept only when followed by a word character (@mentions, #hashtags)
+CHAR_CLASSIFIED = 128
+
+# Global rules (loaded once) and compiled rule sets, by fingerprint of their rules
+_GLOBAL_RULES = None
+_RULE_SET_CACHE = {}
+
+
+class CleaningRuleSet:
+    """
+    Cleaning rules compiled for the vectorized cleaning kernel.
+
+    Character rules (emoji ranges, allowed punctuation, mention and hashtag
+    symbols) become flags in a per-code-point table, filled lazily with the
+    word and whitespace classes of the re module. Pattern rules (URLs,
+    hashtag removal, custom patterns) are fused into a single regex applied
+    once per block of rows before the table lookups.
+    """
+
+    def __init__(self, rules: dict):
+        self.rules = rules
+        self.fingerprint = config_fingerprint(rules)
+        self.allowed_punctuation = rules['allowed_punctuation']
+        self.collapse_whitespace = rules['collapse_whitespace']
+        self.outlier_excluded_columns = list(rules['outlier_excluded_columns'])
+        # remove_emoji() itself is the reference implementation of the default rules
+        self.is_default = rules == DEFAULT_CLEANING_RULES
+
+        self.prefixes = ''
+        if rules['preserve_mentions']:
+            self.prefixes += '@'
+        if rules['hashtags'] == HASHTAGS_KEEP:
+            self.prefixes += '#'
+
+        patterns = []
+        if rules['strip_urls']:
+            patterns.append(_URL_PATTERN)
+        if rules['hashtags'] == HASHTAGS_REMOVE:
+            patterns.append(_HASHTAG_PATTERN)
+        patterns.extend(rules['remove_patterns'])
+        self.pattern = re.compile('|'.join(f'(?:{pattern})' for pattern in patterns)) if patterns else None
+
+        self.classes = np.zeros(MAX_CODE_POINT, dtype=np.uint8)
+        for low, high in rules['emoji_ranges']:
+            self.classes[low:high + 1] |= CHAR_EMOJI
+        for char in self.prefixes:
+            self.classes[ord(char)] |= CHAR_PREFIX
+
+    def classify(self, code_points: np.ndarray) -> None:
+        """Fill the class table for code points not seen before."""
+        seen = np.zeros(MAX_CODE_POINT, dtype=bool)
+        seen[code_points] = True
+        for code_point in np.flatnonzero(seen & (self.classes & CHAR_CLASSIFIED == 0)).tolist():
+            char = chr(code_point)
+            flags = CHAR_CLASSIFIED
+            if char.isalnum() or char == '_':
+                flags |= CHAR_WORD | CHAR_KEPT
+            if char.isspace():
+                flags |= CHAR_SPACE | CHAR_KEPT
+            if char in self.allowed_punctuation:
+                flags |= CHAR_KEPT
+            self.classes[code_point] |= flags
+
+
+def normalize_cleaning_rules(rules: Optional[dict] = None) -> dict:
+    """
+    Merge rules over the defaults and validate them.
+
+    Args:
+        rules: Partial rules (missing keys take their default value)
+
+    Returns:
+        Complete rules dictionary
+
+    Raises:
+        ValueError: If a rule is unknown or has an invalid value
+    """
+    rules = rules or {}
+    unknown = set(rules) - set(DEFAULT_CLEANING_RULES)
+    if unknown:
+        raise ValueError(f"Unknown cleaning rules: {sorted(unknown)}")
+
+    merged = {**DEFAULT_CLEANING_RULES, **rules}
+    merged['emoji_ranges'] = [[int(low), int(high)] for low, high in merged['emoji_ranges']]
+    merged['remove_patterns'] = list(merged['remove_patterns'])
+    merged['outlier_excluded_columns'] = list(merged['outlier_excluded_columns'])
+    if merged['hashtags'] not in (HASHTAGS_STRIP_SYMBOL, HASHTAGS_KEEP, HASHTAGS_REMOVE):
+        raise ValueError(f"Invalid hashtags rule: {merged['hashtags']}")
+    for pattern in merged['remove_patterns']:
+        re.compile(pattern)
+    return merged
+
+
+def load_cleaning_rules(value: str = CLEANING_RULES) -> dict:
+    """
+    Load the global cleaning rules from the CLEANING_RULES setting.
+
+    Args:
+        value: Inline JSON object, or path to a JSON file (empty = defaults)
+
+    Returns:
+        Partial rules dictionary
+    """
+    value = (value or '').strip()
+    if not value:
+        return {}
+    if value.startswith('{'):
+        return json.loads(value)
+    with open(os.path.expanduser(value), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def get_cleaning_rule_set(rules: Optional[dict] = None) -> CleaningRuleSet:
+    """
+    Get the compiled rule set for task rules layered over the global rules.
+
+    Compiled rule sets are cached by the fingerprint of their rules, so each
+    distinct rule set is compiled once per process.
+
+    Args:
+        rules: Task-specific rules (optional)
+
+    Returns:
+        Compiled rule set
+    """
+    global _GLOBAL_RULES
+    if _GLOBAL_RULES is None:
+        _GLOBAL_RULES = load_cleaning_rules()
+
+    merged = normalize_cleaning_rules({**_GLOBAL_RULES, **(rules or {})})
+    fingerprint = config_fingerprint(merged)
+    rule_set = _RULE_SET_CACHE.get(fingerprint)
+    if rule_set is None:
+        rule_set = CleaningRuleSet(merged)
+        _RULE_SET_CACHE[fingerprint] = rule_set
+    return rule_set
+
+
+def get_task_cleaning_rule_set(file_id: str, db_adapter=None) -> CleaningRuleSet:
+    """
+    Get the compiled cleaning rules of a task.
+
+    The task's own rules (data.cleaning_rules on the task document) are
+    layered over the global CLEANING_RULES.
+
+    Args:
+        file_id: File identifier
+        db_adapter: Database adapter (global rules only when None)
+
+    Returns:
+        Compiled rule set
+    """
+    rules = None
+    if db_adapter is not None:
+        try:
+            task = db_adapter.find_one('tasks', {'data.file_id': file_id})
+            if isinstance(task, dict) and isinstance(task.get('data', {}).get('cleaning_rules'), dict):
+                rules = task['data']['cleaning_rules']
+        except Exception as exc:
+            print(f"Warning: failed to read task cleaning rules, using global rules: {exc}")
+    return get_cleaning_rule_set(rules)
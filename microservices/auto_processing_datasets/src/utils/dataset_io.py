@@ -0,0 +1,1022 @@
+"""Dataset reading and writing helpers shared by the pipeline."""
+import bz2
+import gzip
+import json
+import os
+import sys
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.feather as pa_feather
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pa_csv = None
+    pa_feather = None
+    pq = None
+
+from src.configs.env import (
+    CSV_ENGINE, CSV_READ_THREADS, CSV_MEMORY_MAP, CHECKPOINT_FORMAT, CHECKPOINT_COMPRESSION
+)
+from src.configs.constants import COMPRESSION_EXTENSIONS
+
+CSV_ENGINE_C = 'c'
+CSV_ENGINE_PYARROW = 'pyarrow'
+CSV_ENGINES = (CSV_ENGINE_C, CSV_ENGINE_PYARROW)
+
+# Dataset file formats
+FORMAT_CSV = 'csv'
+FORMAT_PARQUET = 'parquet'
+FORMAT_FEATHER = 'feather'  # Feather v2 is the Arrow IPC file format
+FORMAT_ARROW_STREAM = 'arrow_stream'
+
+DATASET_EXTENSIONS = {
+    '.csv': FORMAT_CSV,
+    '.parquet': FORMAT_PARQUET,
+    '.pq': FORMAT_PARQUET,
+    '.feather': FORMAT_FEATHER,
+    '.arrow': FORMAT_FEATHER,
+    '.ipc': FORMAT_FEATHER,
+    '.arrows': FORMAT_ARROW_STREAM,
+}
+
+PARQUET_MAGIC = b'PAR1'
+ARROW_FILE_MAGIC = b'ARROW1'
+ARROW_STREAM_CONTINUATION = b'\xff\xff\xff\xff'
+
+COMPRESSION_MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+    (b'BZh', 'bz2'),
+)
+
+# Column holding the source row position of projected datasets in intermediate files
+SOURCE_ROW_COLUMN = '_source_row'
+
+# Block size used by the PyArrow streaming reader (column types are inferred on the first block)
+ARROW_CSV_BLOCK_SIZE = 16 * 1024 * 1024
+
+# Suffix of the dtype manifest written next to intermediate CSV artifacts
+DTYPE_MANIFEST_SUFFIX = '.dtypes.json'
+
+# Columnar checkpoint formats and the extension replacing .csv
+CHECKPOINT_NONE = 'none'
+CHECKPOINT_EXTENSIONS = {
+    FORMAT_FEATHER: '.feather',
+    FORMAT_PARQUET: '.parquet',
+}
+
+
+def detect_compression(file_path: str) -> Optional[str]:
+    """
+    Detect the compression codec of a dataset file.
+
+    Files with a .csv extension are never treated as compressed; otherwise
+    the magic bytes are checked first and the extension is used as a fallback.
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        'gzip', 'bz2', 'zstd' or None for uncompressed files
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.csv':
+        return None
+
+    if os.path.isfile(file_path):
+        with open(file_path, 'rb') as f:
+            head = f.read(4)
+        for magic, codec in COMPRESSION_MAGIC:
+            if head.startswith(magic):
+                return codec
+
+    return COMPRESSION_EXTENSIONS.get(extension)
+
+
+def open_dataset_stream(file_path: str):
+    """
+    Open a dataset file for binary reads, decompressing on the fly.
+
+    Decompression is streamed, so the whole file is never held in memory.
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        Binary file-like object
+    """
+    codec = detect_compression(file_path)
+    if codec is None:
+        return open(file_path, 'rb')
+    if pa is not None:
+        return pa.input_stream(file_path, compression=codec)
+    if codec == 'gzip':
+        return gzip.open(file_path, 'rb')
+    if codec == 'bz2':
+        return bz2.open(file_path, 'rb')
+    raise ImportError(f"pyarrow library is required to read {codec}-compressed datasets. Run: pip install pyarrow")
+
+
+@contextmanager
+def _csv_source(file_path: str):
+    """Yield the path of an uncompressed CSV file, or a decompressing stream."""
+    if detect_compression(file_path) is None:
+        yield file_path
+    else:
+        with open_dataset_stream(file_path) as stream:
+            yield stream
+
+
+def use_memory_map(file_path: str, memory_map: Optional[bool] = None) -> bool:
+    """
+    Check if a CSV file should be memory-mapped instead of read into buffers.
+
+    Compressed files are always streamed through the decompressor.
+
+    Args:
+        file_path: Path to the CSV file
+        memory_map: Requested mode, defaults to CSV_MEMORY_MAP
+
+    Returns:
+        True when the file is memory-mapped
+    """
+    if memory_map is None:
+        memory_map = CSV_MEMORY_MAP
+    return bool(memory_map) and detect_compression(file_path) is None
+
+
+def _arrow_csv_input(file_path: str, memory_map: bool = False):
+    """Open a CSV file for the PyArrow reader, memory-mapped or through the decompressor."""
+    if memory_map and detect_compression(file_path) is None:
+        return pa.memory_map(file_path)
+    return pa.input_stream(file_path, compression=detect_compression(file_path))
+
+
+def resolve_csv_engine(engine: Optional[str] = None) -> str:
+    """
+    Resolve the CSV engine to use, defaulting to the CSV_ENGINE setting.
+
+    Args:
+        engine: Requested engine ('c' or 'pyarrow')
+
+    Returns:
+        Engine name
+    """
+    engine = (engine or CSV_ENGINE).lower()
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"Unknown CSV engine '{engine}'. Expected one of: {', '.join(CSV_ENGINES)}")
+    if engine == CSV_ENGINE_PYARROW and pa is None:
+        raise ImportError("pyarrow library is not installed. Run: pip install pyarrow")
+    return engine
+
+
+def _configure_arrow_threads() -> None:
+    """Apply the CSV_READ_THREADS setting to PyArrow's CPU thread pool."""
+    if CSV_READ_THREADS > 0 and pa.cpu_count() != CSV_READ_THREADS:
+        pa.set_cpu_count(CSV_READ_THREADS)
+
+
+def read_csv(file_path: str, engine: Optional[str] = None,
+             usecols: Optional[List[str]] = None,
+             memory_map: Optional[bool] = None) -> pd.DataFrame:
+    """
+    Read a whole CSV file with the configured engine.
+
+    When a dtype manifest was written next to the file, its column types are
+    used instead of type inference. A SOURCE_ROW_COLUMN column written by
+    write_csv() is restored as the index.
+
+    In memory-mapped mode the parser reads straight from the OS page cache,
+    so the file is not copied into Python buffers and workers reading the
+    same file share one cached copy.
+
+    Args:
+        file_path: Path to the CSV file
+        engine: CSV engine ('c' or 'pyarrow'), defaults to CSV_ENGINE
+        usecols: Only parse these columns (all columns when None)
+        memory_map: Memory-map uncompressed files, defaults to CSV_MEMORY_MAP
+
+    Returns:
+        DataFrame (with Arrow-backed dtypes for the pyarrow engine)
+    """
+    engine = resolve_csv_engine(engine)
+    memory_map = use_memory_map(file_path, memory_map)
+    if engine == CSV_ENGINE_PYARROW and _manifest_dtypes(file_path, usecols):
+        df = _read_arrow_csv_with_manifest(file_path, usecols, memory_map)
+    elif engine == CSV_ENGINE_PYARROW:
+        _configure_arrow_threads()
+        with (pa.memory_map(file_path) if memory_map else _csv_source(file_path)) as source:
+            df = pd.read_csv(source, engine='pyarrow', dtype_backend='pyarrow', usecols=usecols)
+    else:
+        manifest_kwargs = _manifest_read_kwargs(file_path, usecols)
+        with _csv_source(file_path) as source:
+            df = pd.read_csv(source, usecols=usecols, memory_map=memory_map, **manifest_kwargs)
+
+    if SOURCE_ROW_COLUMN in df.columns:
+        df = df.set_index(SOURCE_ROW_COLUMN)
+    return df
+
+
+def read_csv_header(file_path: str) -> List[str]:
+    """
+    Read the column names of a CSV file without parsing any rows.
+
+    Args:
+        file_path: Path to the CSV file
+
+    Returns:
+        List of column names
+    """
+    with _csv_source(file_path) as source:
+        return list(pd.read_csv(source, nrows=0).columns)
+
+
+def write_csv(df: pd.DataFrame, file_path: str) -> None:
+    """
+    Write a DataFrame to CSV, keeping the source row positions of projected datasets.
+
+    A dtype manifest is written next to the file so that read_csv() and
+    iter_csv_chunks() restore the same column types.
+
+    Args:
+        df: DataFrame to write
+        file_path: Path to the CSV file
+    """
+    df.to_csv(file_path, index=(df.index.name == SOURCE_ROW_COLUMN))
+    write_dtype_manifest(file_path, build_dtype_manifest(df))
+
+
+def dtype_manifest_path(file_path: str) -> str:
+    """
+    Get the path of the dtype manifest of a CSV file.
+
+    Args:
+        file_path: Path to the CSV file
+
+    Returns:
+        Path to the manifest
+    """
+    return f"{file_path}{DTYPE_MANIFEST_SUFFIX}"
+
+
+def build_dtype_manifest(df: pd.DataFrame) -> dict:
+    """
+    Build the dtype manifest of a DataFrame as written by write_csv().
+
+    Args:
+        df: DataFrame to describe
+
+    Returns:
+        Dictionary of column name to dtype name, in column order
+    """
+    if df.index.name == SOURCE_ROW_COLUMN:
+        df = df.reset_index()
+    return {str(col): str(dtype) for col, dtype in df.dtypes.items()}
+
+
+def _is_numeric_dtype_name(name: str) -> bool:
+    """Check if a dtype name is a (non-boolean) numeric dtype."""
+    try:
+        dtype = pd.api.types.pandas_dtype(name)
+    except TypeError:
+        return False
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+def merge_dtype_manifests(manifest: Optional[dict], other: dict) -> dict:
+    """
+    Merge the dtype manifests of two chunks of the same file.
+
+    Columns whose numeric dtypes differ (e.g. int64 in a chunk and float64
+    in a chunk with missing values) are widened to float64. Other conflicts
+    are dropped from the manifest so those columns fall back to inference.
+
+    Args:
+        manifest: Manifest of the previous chunks (None for the first chunk)
+        other: Manifest of the next chunk
+
+    Returns:
+        Merged manifest
+    """
+    if manifest is None:
+        return dict(other)
+
+    merged = {}
+    for col, name in manifest.items():
+        other_name = other.get(col, name)
+        if other_name == name:
+            merged[col] = name
+        elif _is_numeric_dtype_name(name) and _is_numeric_dtype_name(other_name):
+            merged[col] = 'float64'
+    return merged
+
+
+def write_dtype_manifest(file_path: str, manifest: dict) -> None:
+    """
+    Write the dtype manifest of a CSV file.
+
+    Args:
+        file_path: Path to the CSV file
+        manifest: Dictionary of column name to dtype name
+    """
+    with open(dtype_manifest_path(file_path), 'w', encoding='utf-8') as f:
+        json.dump({'columns': manifest}, f)
+
+
+def read_dtype_manifest(file_path: str) -> Optional[dict]:
+    """
+    Read the dtype manifest of a CSV file.
+
+    Args:
+        file_path: Path to the CSV file
+
+    Returns:
+        Dictionary of column name to dtype name, or None when there is no valid manifest
+    """
+    path = dtype_manifest_path(file_path)
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)['columns']
+    except (ValueError, KeyError, TypeError) as e:
+        print(f"Warning: ignoring invalid dtype manifest {path}: {e}")
+        return None
+
+
+def remove_csv(file_path: str) -> None:
+    """
+    Remove a CSV file together with its dtype manifest.
+
+    Args:
+        file_path: Path to the CSV file
+    """
+    os.remove(file_path)
+    if os.path.exists(dtype_manifest_path(file_path)):
+        os.remove(dtype_manifest_path(file_path))
+
+
+def _manifest_dtypes(file_path: str, usecols: Optional[List[str]] = None) -> dict:
+    """Get the manifest dtypes of a CSV file, or {} when the manifest is missing or stale."""
+    manifest = read_dtype_manifest(file_path)
+    if not manifest:
+        return {}
+    if list(manifest) != read_csv_header(file_path):
+        print(f"Warning: dtype manifest of {file_path} does not match its header, inferring types")
+        return {}
+    return {col: name for col, name in manifest.items() if usecols is None or col in usecols}
+
+
+def _manifest_read_kwargs(file_path: str, usecols: Optional[List[str]] = None) -> dict:
+    """Build the pandas.read_csv() dtype arguments from the dtype manifest of a CSV file."""
+    dtypes = _manifest_dtypes(file_path, usecols)
+    if not dtypes:
+        return {}
+
+    kwargs = {'dtype': {col: name for col, name in dtypes.items() if not name.startswith('datetime64')}}
+    parse_dates = [col for col, name in dtypes.items() if name.startswith('datetime64')]
+    if parse_dates:
+        kwargs['parse_dates'] = parse_dates
+    return kwargs
+
+
+def _read_arrow_csv_with_manifest(file_path: str, usecols: Optional[List[str]] = None,
+                                  memory_map: bool = False) -> pd.DataFrame:
+    """Read a CSV file with PyArrow, converting columns straight to their manifest types."""
+    _configure_arrow_threads()
+    dtypes = _manifest_dtypes(file_path, usecols)
+    table = pa_csv.read_csv(
+        _arrow_csv_input(file_path, memory_map),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=_arrow_column_types(dtypes),
+            include_columns=list(dtypes) if usecols is not None else None,
+            strings_can_be_null=True
+        )
+    )
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def _arrow_column_types(dtypes: dict) -> dict:
+    """Convert manifest dtypes to Arrow types for the PyArrow CSV reader (unknown types are inferred)."""
+    column_types = {}
+    for col, name in dtypes.items():
+        try:
+            dtype = pd.api.types.pandas_dtype(name)
+            if isinstance(dtype, pd.ArrowDtype):
+                column_types[col] = dtype.pyarrow_dtype
+            elif isinstance(dtype, pd.StringDtype) or dtype == object:
+                column_types[col] = pa.string()
+            else:
+                column_types[col] = pa.from_numpy_dtype(getattr(dtype, 'numpy_dtype', dtype))
+        except (TypeError, ValueError, NotImplementedError):
+            continue
+    return column_types
+
+
+def infer_projection(file_path: str, required: List[str], sample_rows: int) -> List[str]:
+    """
+    Select the columns a pipeline needs from a dataset file.
+
+    Numeric columns are detected on a sample of rows (or from the schema of
+    columnar files) so that outlier filtering keeps working on the projected
+    dataset.
+
+    Args:
+        file_path: Path to the dataset file
+        required: Columns that must be loaded when present
+        sample_rows: Number of rows sampled to detect numeric columns
+
+    Returns:
+        Column names in file order
+    """
+    fmt = detect_format(file_path)
+    if fmt == FORMAT_CSV:
+        with _csv_source(file_path) as source:
+            sample = pd.read_csv(source, nrows=sample_rows)
+        numeric = set(sample.select_dtypes(include=[np.number]).columns)
+        columns = list(sample.columns)
+    else:
+        schema = _arrow_schema(file_path, fmt)
+        numeric = {field.name for field in schema
+                   if pa.types.is_integer(field.type) or pa.types.is_floating(field.type)}
+        columns = schema.names
+    return [col for col in columns if col in required or col in numeric]
+
+
+def merge_passthrough_columns(df: pd.DataFrame, source_path: str,
+                              engine: Optional[str] = None) -> pd.DataFrame:
+    """
+    Join back the source columns that were not loaded by a projected read.
+
+    The rows are matched on the source row positions held in the index,
+    and the original column order is restored (new columns come last).
+
+    Args:
+        df: Projected DataFrame indexed by SOURCE_ROW_COLUMN
+        source_path: Path to the source dataset file
+        engine: CSV engine ('c' or 'pyarrow'), defaults to CSV_ENGINE
+
+    Returns:
+        DataFrame with all source columns and a default index
+    """
+    source_columns = dataset_columns(source_path)
+    passthrough = [col for col in source_columns if col not in df.columns]
+    if passthrough:
+        rest = read_dataset(source_path, engine, usecols=passthrough)
+        rest = rest.iloc[df.index.to_numpy(dtype=np.int64)]
+        rest.index = df.index
+        df = pd.concat([df, rest], axis=1)
+
+    ordered = [col for col in source_columns if col in df.columns]
+    ordered += [col for col in df.columns if col not in source_columns]
+    return df[ordered].reset_index(drop=True)
+
+
+def merge_passthrough_chunks(chunks: Iterable[pd.DataFrame], source_path: str,
+                             engine: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Join back the source columns that were not loaded by a projected stream.
+
+    Streaming counterpart of merge_passthrough_columns(): the skipped
+    columns are read from the source in chunks alongside the projected
+    chunks, so only the source rows spanned by the current chunk are held
+    in memory. Source row positions must increase from chunk to chunk, as
+    they do when rows are only dropped.
+
+    Args:
+        chunks: Projected DataFrame chunks indexed by SOURCE_ROW_COLUMN
+        source_path: Path to the source dataset file
+        engine: CSV engine ('c' or 'pyarrow'), defaults to CSV_ENGINE
+
+    Yields:
+        DataFrame chunks with all source columns and a default index
+        (chunks that are not projected are yielded unchanged)
+    """
+    source_columns = None
+    rest_chunks = None
+    pending = None
+    for chunk in chunks:
+        if chunk.index.name != SOURCE_ROW_COLUMN:
+            yield chunk
+            continue
+        if source_columns is None:
+            source_columns = dataset_columns(source_path)
+            passthrough = [col for col in source_columns if col not in chunk.columns]
+            if passthrough:
+                rest_chunks = iter_dataset_chunks(source_path, max(1, len(chunk)), engine, usecols=passthrough)
+
+        if rest_chunks is not None and len(chunk):
+            positions = chunk.index.to_numpy(dtype=np.int64)
+            parts = [pending] if pending is not None else []
+            covered = pending.index[-1] if pending is not None and len(pending) else -1
+            while covered < positions[-1]:
+                part = next(rest_chunks)
+                parts.append(part)
+                covered = part.index[-1]
+            pending = pd.concat(parts) if len(parts) > 1 else parts[0]
+            rest = pending.loc[positions]
+            rest.index = chunk.index
+            chunk = pd.concat([chunk, rest], axis=1)
+            pending = pending.loc[pending.index > positions[-1]]
+
+        ordered = [col for col in source_columns if col in chunk.columns]
+        ordered += [col for col in chunk.columns if col not in source_columns]
+        yield chunk[ordered].reset_index(drop=True)
+
+
+def _iter_arrow_csv_chunks(file_path: str, chunk_rows: int, memory_map: bool = False,
+                           usecols: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Stream a CSV file with PyArrow, re-slicing record batches to chunk_rows rows."""
+    _configure_arrow_threads()
+    if usecols is not None:
+        header = read_csv_header(file_path)
+        usecols = [col for col in header if col in usecols]
+    reader = pa_csv.open_csv(
+        _arrow_csv_input(file_path, memory_map),
+        read_options=pa_csv.ReadOptions(block_size=ARROW_CSV_BLOCK_SIZE),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=_arrow_column_types(_manifest_dtypes(file_path, usecols)),
+            include_columns=usecols,
+            strings_can_be_null=True
+        )
+    )
+
+    pending = []
+    pending_rows = 0
+    start = 0
+
+    def to_frame(table):
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
+        df.index = pd.RangeIndex(start, start + len(df))
+        if SOURCE_ROW_COLUMN in df.columns:
+            df = df.set_index(SOURCE_ROW_COLUMN)
+        return df
+
+    for batch in reader:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        while pending_rows >= chunk_rows:
+            table = pa.Table.from_batches(pending, schema=reader.schema)
+            yield to_frame(table.slice(0, chunk_rows))
+            start += chunk_rows
+            rest = table.slice(chunk_rows)
+            pending = rest.to_batches()
+            pending_rows = rest.num_rows
+
+    if pending_rows:
+        yield to_frame(pa.Table.from_batches(pending, schema=reader.schema))
+
+
+def _iter_pandas_csv_chunks(file_path: str, chunk_rows: int, memory_map: bool = False,
+                            usecols: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """Stream a CSV file with pandas' C parser, decompressing compressed inputs on the fly."""
+    manifest_kwargs = _manifest_read_kwargs(file_path, usecols)
+    with _csv_source(file_path) as source:
+        try:
+            reader = pd.read_csv(source, chunksize=chunk_rows, memory_map=memory_map,
+                                 usecols=usecols, **manifest_kwargs)
+        except pd.errors.EmptyDataError:
+            return
+        with reader:
+            for chunk in reader:
+                if SOURCE_ROW_COLUMN in chunk.columns:
+                    chunk = chunk.set_index(SOURCE_ROW_COLUMN)
+                yield chunk
+
+
+def iter_csv_chunks(file_path: str, chunk_rows: int, engine: Optional[str] = None,
+                    memory_map: Optional[bool] = None,
+                    usecols: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Iterate over a CSV file in DataFrame chunks.
+
+    Column types come from the dtype manifest of the file when there is one.
+    A SOURCE_ROW_COLUMN column written by write_csv_chunks() is restored as
+    the index.
+
+    Args:
+        file_path: Path to the CSV file
+        chunk_rows: Number of rows per chunk
+        engine: CSV engine ('c' or 'pyarrow'), defaults to CSV_ENGINE
+        memory_map: Memory-map uncompressed files, defaults to CSV_MEMORY_MAP
+        usecols: Only parse these columns (all columns when None)
+
+    Returns:
+        Iterator of DataFrames (empty for an empty file)
+    """
+    engine = resolve_csv_engine(engine)
+    if os.path.getsize(file_path) == 0:
+        return iter(())
+    memory_map = use_memory_map(file_path, memory_map)
+    if engine == CSV_ENGINE_PYARROW:
+        return _iter_arrow_csv_chunks(file_path, chunk_rows, memory_map, usecols)
+    return _iter_pandas_csv_chunks(file_path, chunk_rows, memory_map, usecols)
+
+
+def write_csv_chunks(file_path: str, chunks: Iterable[pd.DataFrame]) -> int:
+    """
+    Write DataFrame chunks to a single CSV file, one chunk at a time.
+
+    The dtype manifest of the file is merged from the dtypes of all chunks.
+    Source row positions of projected chunks (a SOURCE_ROW_COLUMN index) are
+    kept as a column, like write_csv() does.
+
+    The columns of every chunk are aligned on the header written from the
+    first chunk (missing columns are left empty, extra ones are dropped).
+
+    Args:
+        file_path: Path to the CSV file
+        chunks: Iterable of DataFrames with the same columns
+
+    Returns:
+        Number of rows written
+    """
+    rows = 0
+    manifest = None
+    columns = None
+    with open(file_path, 'w', newline='', encoding='utf-8') as out:
+        for chunk in chunks:
+            if columns is None:
+                columns = list(chunk.columns)
+            elif list(chunk.columns) != columns:
+                chunk = chunk.reindex(columns=columns)
+            if chunk.index.name != SOURCE_ROW_COLUMN:
+                chunk = chunk.reset_index(drop=True)
+            chunk.to_csv(out, index=(chunk.index.name == SOURCE_ROW_COLUMN), header=(out.tell() == 0))
+            manifest = merge_dtype_manifests(manifest, build_dtype_manifest(chunk))
+            rows += len(chunk)
+    if manifest is not None:
+        write_dtype_manifest(file_path, manifest)
+    return rows
+
+
+def detect_format(file_path: str) -> str:
+    """
+    Detect the format of a dataset file.
+
+    Files with a .csv extension are always read as CSV; otherwise the magic
+    bytes are checked first and the extension is used as a fallback.
+    Compressed files (e.g. .csv.gz) are identified by their inner extension
+    and only CSV content may be compressed.
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        One of FORMAT_CSV, FORMAT_PARQUET, FORMAT_FEATHER, FORMAT_ARROW_STREAM
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.csv':
+        return FORMAT_CSV
+
+    if detect_compression(file_path) is not None:
+        inner = file_path[:-len(extension)] if extension in COMPRESSION_EXTENSIONS else file_path
+        fmt = DATASET_EXTENSIONS.get(os.path.splitext(inner)[1].lower(), FORMAT_CSV)
+        if fmt != FORMAT_CSV:
+            raise ValueError(f"Compressed {fmt} datasets are not supported; use the format's internal compression")
+        return FORMAT_CSV
+
+    if os.path.isfile(file_path):
+        with open(file_path, 'rb') as f:
+            head = f.read(len(ARROW_FILE_MAGIC))
+        if head.startswith(PARQUET_MAGIC):
+            return FORMAT_PARQUET
+        if head.startswith(ARROW_FILE_MAGIC):
+            return FORMAT_FEATHER
+        if head.startswith(ARROW_STREAM_CONTINUATION):
+            return FORMAT_ARROW_STREAM
+
+    return DATASET_EXTENSIONS.get(extension, FORMAT_CSV)
+
+
+def _require_pyarrow(fmt: str) -> None:
+    """Raise ImportError when a columnar format is read without pyarrow."""
+    if pa is None:
+        raise ImportError(f"pyarrow library is required to read {fmt} datasets. Run: pip install pyarrow")
+
+
+def _arrow_schema(file_path: str, fmt: str):
+    """Read the Arrow schema of a columnar dataset without loading its data."""
+    _require_pyarrow(fmt)
+    if fmt == FORMAT_PARQUET:
+        return pq.read_schema(file_path, memory_map=True)
+    if fmt == FORMAT_FEATHER:
+        return pa.ipc.open_file(pa.memory_map(file_path)).schema
+    return pa.ipc.open_stream(pa.memory_map(file_path)).schema
+
+
+def _read_arrow_table(file_path: str, fmt: str, usecols: Optional[List[str]] = None):
+    """
+    Read a columnar dataset as an Arrow table.
+
+    Files are memory-mapped, so uncompressed Feather/Arrow IPC data is not
+    copied into process memory until it is converted to pandas.
+    """
+    _require_pyarrow(fmt)
+    if fmt == FORMAT_PARQUET:
+        return pq.read_table(file_path, columns=usecols, memory_map=True)
+    if fmt == FORMAT_FEATHER:
+        return pa_feather.read_table(file_path, columns=usecols, memory_map=True)
+
+    table = pa.ipc.open_stream(pa.memory_map(file_path)).read_all()
+    return table.select(usecols) if usecols else table
+
+
+def _arrow_to_pandas(data, engine: Optional[str] = None) -> pd.DataFrame:
+    """Convert an Arrow table or record batch, keeping Arrow dtypes for the pyarrow engine."""
+    if resolve_csv_engine(engine) == CSV_ENGINE_PYARROW:
+        return data.to_pandas(types_mapper=pd.ArrowDtype)
+    return data.to_pandas()
+
+
+def dataset_columns(file_path: str) -> List[str]:
+    """
+    Read the column names of a dataset file without loading its rows.
+
+    Args:
+        file_path: Path to the dataset file
+
+    Returns:
+        List of column names
+    """
+    fmt = detect_format(file_path)
+    if fmt == FORMAT_CSV:
+        return read_csv_header(file_path)
+    return _arrow_schema(file_path, fmt).names
+
+
+def dataset_num_rows(file_path: str) -> int:
+    """
+    Count the rows of a columnar dataset from its metadata.
+
+    Args:
+        file_path: Path to a Parquet, Feather or Arrow IPC file
+
+    Returns:
+        Number of rows
+    """
+    fmt = detect_format(file_path)
+    _require_pyarrow(fmt)
+    if fmt == FORMAT_PARQUET:
+        return pq.ParquetFile(file_path, memory_map=True).metadata.num_rows
+    return _read_arrow_table(file_path, fmt).num_rows
+
+
+def read_dataset(file_path: str, engine: Optional[str] = None,
+                 usecols: Optional[List[str]] = None,
+                 memory_map: Optional[bool] = None) -> pd.DataFrame:
+    """
+    Read a whole dataset file, detecting its format.
+
+    CSV files go through read_csv(); Parquet, Feather and Arrow IPC files are
+    loaded natively (memory-mapped) without any text parsing.
+
+    Args:
+        file_path: Path to the dataset file
+        engine: CSV engine ('c' or 'pyarrow'), defaults to CSV_ENGINE.
+                With 'pyarrow', columnar inputs also keep Arrow-backed dtypes.
+        usecols: Only load these columns (all columns when None)
+        memory_map: Memory-map uncompressed CSV files, defaults to CSV_MEMORY_MAP
+
+    Returns:
+        DataFrame
+    """
+    fmt = detect_format(file_path)
+    if fmt == FORMAT_CSV:
+        return read_csv(file_path, engine, usecols=usecols, memory_map=memory_map)
+    return _arrow_to_pandas(_read_arrow_table(file_path, fmt, usecols), engine)
+
+
+def _iter_arrow_batches(batches: Iterable, engine: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """Convert Arrow record batches to DataFrames indexed by their row position (or source rows)."""
+    start = 0
+    for batch in batches:
+        if batch.num_rows == 0:
+            continue
+        df = _arrow_to_pandas(batch, engine)
+        if df.index.name != SOURCE_ROW_COLUMN:
+            df.index = pd.RangeIndex(start, start + len(df))
+        start += len(df)
+        yield df
+
+
+def iter_dataset_chunks(file_path: str, chunk_rows: int, engine: Optional[str] = None,
+                        memory_map: Optional[bool] = None,
+                        usecols: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Iterate over a dataset file in DataFrame chunks, detecting its format.
+
+    Parquet chunks never span row groups, so they may be smaller than chunk_rows.
+    Unless restored from a SOURCE_ROW_COLUMN, the index holds the row
+    positions in the file.
+
+    Args:
+        file_path: Path to the dataset file
+        chunk_rows: Maximum number of rows per chunk
+        engine: CSV engine ('c' or 'pyarrow'), defaults to CSV_ENGINE
+        memory_map: Memory-map uncompressed CSV files, defaults to CSV_MEMORY_MAP
+        usecols: Only load these columns (all columns when None)
+
+    Returns:
+        Iterator of DataFrames
+    """
+    fmt = detect_format(file_path)
+    if fmt == FORMAT_CSV:
+        return iter_csv_chunks(file_path, chunk_rows, engine, memory_map, usecols)
+    if fmt == FORMAT_PARQUET:
+        _require_pyarrow(fmt)
+        columns = [col for col in _arrow_schema(file_path, fmt).names if col in usecols] if usecols else None
+        batches = pq.ParquetFile(file_path, memory_map=True).iter_batches(batch_size=chunk_rows, columns=columns)
+    else:
+        batches = _read_arrow_table(file_path, fmt, usecols).to_batches(max_chunksize=chunk_rows)
+    return _iter_arrow_batches(batches, engine)
+
+
+def arrow_text_dtype() -> pd.ArrowDtype:
+    """
+    Get the dtype used for Arrow-backed text columns.
+
+    Returns:
+        pandas ArrowDtype wrapping pa.large_string() (64-bit offsets, so a
+        column may hold more than 2 GB of text)
+    """
+    if pa is None:
+        raise ImportError("pyarrow library is required for Arrow-backed strings. Run: pip install pyarrow")
+    return pd.ArrowDtype(pa.large_string())
+
+
+def to_arrow_strings(df: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Convert text columns to Arrow-backed strings.
+
+    Arrow strings are stored in one contiguous buffer per column instead of
+    one Python object per row. Columns holding values that are not strings
+    are left unchanged.
+
+    Args:
+        df: DataFrame to convert (modified in place)
+        columns: Columns to convert (defaults to every object or string column)
+
+    Returns:
+        The DataFrame
+    """
+    dtype = arrow_text_dtype()
+    for col in (columns if columns is not None else df.columns):
+        if col not in df.columns or df[col].dtype == dtype:
+            continue
+        if df[col].dtype == object or isinstance(df[col].dtype, pd.StringDtype):
+            try:
+                df[col] = df[col].astype(dtype)
+            except (TypeError, ValueError, pa.ArrowException):
+                continue
+    return df
+
+
+def count_csv_rows(file_path: str, block_size: int = ARROW_CSV_BLOCK_SIZE) -> int:
+    """
+    Count the data rows of a CSV file with a newline scan.
+
+    The scan never parses fields, so quoted values spanning several lines
+    are counted once per line: the result is an upper bound.
+
+    Args:
+        file_path: Path to the CSV file (compressed files are decompressed on the fly)
+        block_size: Number of bytes read per block
+
+    Returns:
+        Estimated number of data rows (header excluded)
+    """
+    lines = 0
+    last = b'\n'
+    with open_dataset_stream(file_path) as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1  # Last line without trailing newline
+    return max(0, lines - 1)
+
+
+def read_dataset_sample(file_path: str, rows: int) -> pd.DataFrame:
+    """
+    Read the first rows of a dataset file.
+
+    Args:
+        file_path: Path to the dataset file
+        rows: Number of rows to read
+
+    Returns:
+        DataFrame with at most `rows` rows
+    """
+    if detect_format(file_path) == FORMAT_CSV:
+        with _csv_source(file_path) as source:
+            try:
+                return pd.read_csv(source, nrows=rows)
+            except pd.errors.EmptyDataError:
+                return pd.DataFrame()
+    return next(iter_dataset_chunks(file_path, rows), pd.DataFrame())
+
+
+def checkpoint_path(csv_path: str, fmt: Optional[str] = None) -> Optional[str]:
+    """
+    Get the path of the columnar checkpoint of an intermediate CSV file.
+
+    Args:
+        csv_path: Path to the intermediate CSV file (e.g. cleaned/{file_id}.csv)
+        fmt: Checkpoint format, defaults to CHECKPOINT_FORMAT
+
+    Returns:
+        Path to the checkpoint, or None when checkpoints are disabled
+    """
+    extension = CHECKPOINT_EXTENSIONS.get(fmt or CHECKPOINT_FORMAT)
+    if extension is None:
+        return None
+    return f"{os.path.splitext(csv_path)[0]}{extension}"
+
+
+def write_checkpoint(df: pd.DataFrame, file_path: str, compression: Optional[str] = None) -> None:
+    """
+    Write a DataFrame to a columnar checkpoint (Feather or Parquet, by extension).
+
+    Column types are stored in the file, and a SOURCE_ROW_COLUMN index is
+    kept, so read_checkpoint() restores the same frame without parsing.
+
+    Args:
+        df: DataFrame to write
+        file_path: Path to the checkpoint file
+        compression: Codec ('zstd', 'lz4' or 'uncompressed'), defaults to CHECKPOINT_COMPRESSION
+    """
+    fmt = detect_format(file_path)
+    _require_pyarrow(fmt)
+    compression = compression or CHECKPOINT_COMPRESSION
+    table = pa.Table.from_pandas(df, preserve_index=(df.index.name == SOURCE_ROW_COLUMN))
+    if fmt == FORMAT_PARQUET:
+        pq.write_table(table, file_path, compression='none' if compression == 'uncompressed' else compression)
+    else:
+        pa_feather.write_feather(table, file_path, compression=compression)
+
+
+def read_checkpoint(file_path: str, engine: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read a columnar checkpoint written by write_checkpoint().
+
+    The file is memory-mapped; uncompressed Feather data is not copied until
+    it is converted to pandas.
+
+    Args:
+        file_path: Path to the checkpoint file
+        engine: CSV engine ('c' or 'pyarrow'), used to pick the pandas dtypes
+
+    Returns:
+        DataFrame
+    """
+    return _arrow_to_pandas(_read_arrow_table(file_path, detect_format(file_path)), engine)
+
+
+def intermediate_path(csv_path: str) -> Optional[str]:
+    """
+    Find the file holding an intermediate dataset: its checkpoint, else its CSV.
+
+    Args:
+        csv_path: Path to the intermediate CSV file
+
+    Returns:
+        Path to an existing checkpoint or CSV file, or None when neither exists
+    """
+    checkpoint = checkpoint_path(csv_path)
+    if checkpoint is not None and os.path.exists(checkpoint):
+        return checkpoint
+    if os.path.exists(csv_path):
+        return csv_path
+    return None
+
+
+def read_intermediate(csv_path: str, engine: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """
+    Read an intermediate dataset from its checkpoint, falling back to its CSV.
+
+    Args:
+        csv_path: Path to the intermediate CSV file
+        engine: CSV engine ('c' or 'pyarrow'), defaults to CSV_ENGINE
+
+    Returns:
+        DataFrame, or None when neither file exists
+    """
+    path = intermediate_path(csv_path)
+    if path is None:
+        return None
+    if path == csv_path:
+        return read_csv(csv_path, engine)
+    return read_checkpoint(path, engine)
@@ -0,0 +1,111 @@
+"""Hash-based row deduplication with bounded memory."""
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def row_hashes(df: pd.DataFrame, key_columns: Optional[List[str]] = None) -> np.ndarray:
+    """
+    Hash the rows of a DataFrame to 64-bit fingerprints.
+
+    Args:
+        df: DataFrame to hash
+        key_columns: Columns identifying a duplicate (defaults to all columns).
+                     Columns missing from the frame are ignored.
+
+    Returns:
+        uint64 array with one hash per row
+    """
+    columns = [col for col in (key_columns or []) if col in df.columns]
+    if columns:
+        df = df[columns]
+    return pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+
+
+class HashSeenSet:
+    """
+    Set of 64-bit row hashes, used to drop duplicates across chunks.
+
+    Hashes are stored in sorted numpy runs (8 bytes per unique row, whatever
+    the row width) instead of a Python set of ints. A new run is added per
+    call and runs are merged like a binary counter, so there are at most
+    log2(n) runs to search and each hash is merged O(log n) times.
+    """
+
+    def __init__(self):
+        self._runs = []
+
+    def __len__(self) -> int:
+        return sum(len(run) for run in self._runs)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the stored hashes."""
+        return sum(run.nbytes for run in self._runs)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        Check which hashes were already added.
+
+        Args:
+            hashes: uint64 array of hashes
+
+        Returns:
+            Boolean array, True for hashes already in the set
+        """
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self._runs:
+            positions = np.searchsorted(run, hashes)
+            found |= run[np.minimum(positions, len(run) - 1)] == hashes
+        return found
+
+    def add(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        Add hashes and flag the rows to keep.
+
+        Args:
+            hashes: uint64 array of hashes, in row order
+
+        Returns:
+            Boolean array, True for the first occurrence of each hash not seen before
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        unique_hashes, first_positions = np.unique(hashes, return_index=True)
+        new = ~self.contains(unique_hashes)
+        keep = np.zeros(len(hashes), dtype=bool)
+        keep[first_positions[new]] = True
+
+        run = unique_hashes[new]
+        while self._runs and len(self._runs[-1]) <= len(run):
+            # Both runs are sorted and disjoint, so a stable sort is a merge
+            run = np.sort(np.concatenate([self._runs.pop(), run]), kind='stable')
+        if len(run):
+            self._runs.append(run)
+        return keep
+
+    def to_array(self) -> np.ndarray:
+        """
+        Get all stored hashes as one sorted array.
+
+        Returns:
+            Sorted uint64 array of the hashes added so far
+        """
+        if not self._runs:
+            return np.empty(0, dtype=np.uint64)
+        return np.sort(np.concatenate(self._runs), kind='stable')
+
+    @classmethod
+    def from_array(cls, hashes: np.ndarray) -> 'HashSeenSet':
+        """
+        Build a set from stored hashes (e.g. the output of to_array()).
+
+        Args:
+            hashes: uint64 array of hashes
+
+        Returns:
+            HashSeenSet holding the hashes
+        """
+        seen = cls()
+        seen.add(hashes)
+        return seen
@@ -0,0 +1,48 @@
+"""Content fingerprints used to detect identical datasets."""
+import hashlib
+import json
+
+# Number of bytes hashed per read
+FINGERPRINT_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def file_fingerprint(file_path: str, block_size: int = FINGERPRINT_BLOCK_SIZE) -> str:
+    """
+    Compute the content fingerprint of a file with a streaming hash.
+
+    The file is read in fixed-size blocks into a reused buffer, so memory
+    use does not depend on the file size.
+
+    Args:
+        file_path: Path to the file
+        block_size: Number of bytes read per block
+
+    Returns:
+        Fingerprint string ('blake2b:<hex digest>')
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    buffer = bytearray(block_size)
+    view = memoryview(buffer)
+    with open(file_path, 'rb', buffering=0) as f:
+        while True:
+            size = f.readinto(buffer)
+            if not size:
+                break
+            digest.update(view[:size])
+    return f"blake2b:{digest.hexdigest()}"
+
+
+def config_fingerprint(config: dict) -> str:
+    """
+    Compute the fingerprint of a configuration dictionary.
+
+    Keys are sorted so that the fingerprint does not depend on their order.
+
+    Args:
+        config: JSON-serializable configuration (e.g. the AI configuration)
+
+    Returns:
+        Fingerprint string ('blake2b:<hex digest>')
+    """
+    payload = json.dumps(config or {}, sort_keys=True, separators=(',', ':'), default=str)
+    return f"blake2b:{hashlib.blake2b(payload.encode('utf-8'), digest_size=32).hexdigest()}"
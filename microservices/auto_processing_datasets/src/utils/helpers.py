@@ -1,7 +1,10 @@
 """Helper utility functions."""
 import os
+import shutil
 from pathlib import Path
 
+from src.configs.constants import COMPRESSION_EXTENSIONS
+
 
 def ensure_directory_exists(directory_path: str) -> None:
     """
@@ -18,12 +21,37 @@ def get_file_id_from_path(file_path: str) -> str:
     Extract file ID from file path.
     
     Args:
-        file_path: Path to the file (e.g., /path/to/storage/datasets/file_id.csv)
+        file_path: Path to the file (e.g., /path/to/storage/datasets/file_id.csv
+                   or file_id.csv.gz for compressed datasets)
     
     Returns:
-        File ID (filename without extension)
+        File ID (filename without extension nor compression suffix)
     """
     filename = os.path.basename(file_path)
+    stem, extension = os.path.splitext(filename)
+    if extension.lower() in COMPRESSION_EXTENSIONS:
+        filename = stem
     file_id = os.path.splitext(filename)[0]
     return file_id
 
+
+def copy_file(source_path: str, target_path: str) -> None:
+    """
+    Copy a file to a new path atomically.
+    
+    The copy is written to a temporary file in the target directory and
+    renamed over the target, so readers never see a partial file and no
+    other path shares the target's inode (later writes to one task's
+    artifacts cannot change another's).
+    
+    Args:
+        source_path: Existing file
+        target_path: Path to create (replaced if it exists)
+    """
+    temp_path = f"{target_path}.tmp-{os.getpid()}"
+    try:
+        shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, target_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
@@ -0,0 +1,115 @@
+"""Keep-alive HTTP connection pools for LLM endpoints, shared by the worker process."""
+import threading
+from typing import Dict
+from urllib.parse import urlsplit
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+from src.configs.env import LLM_HTTP_POOL_SIZE
+
+# One session per endpoint origin (scheme://host:port), created on first use
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+CONNECTION_METRIC_KEYS = ('requests', 'new_connections', 'reused_connections', 'tls_handshakes')
+
+
+def endpoint_origin(url: str) -> str:
+    """Get the scheme://host[:port] part of a URL, which identifies its connection pool."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def get_session(url: str) -> 'requests.Session':
+    """
+    Get the pooled session for the origin of a URL.
+
+    Sessions live for the whole worker process, so connections (and their TLS
+    sessions) are kept alive and reused across batches and across tasks. Up
+    to LLM_HTTP_POOL_SIZE idle connections are kept per origin, enough for
+    the in-flight limit of a model.
+
+    Args:
+        url: Endpoint URL
+
+    Returns:
+        requests.Session shared by every request to the same origin
+    """
+    if requests is None:
+        raise ImportError("requests library is not installed. Run: pip install requests")
+
+    origin = endpoint_origin(url)
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(origin)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=LLM_HTTP_POOL_SIZE)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _SESSIONS[origin] = session
+        return session
+
+
+def connection_metrics() -> Dict[str, Dict[str, int]]:
+    """
+    Get connection reuse counters of the pooled sessions.
+
+    Counters are cumulative since the session of each origin was created:
+    requests sent, connections opened, requests served on an already open
+    connection, and TLS handshakes (one per connection opened over https).
+
+    Returns:
+        Counters by origin
+    """
+    with _SESSIONS_LOCK:
+        sessions = list(_SESSIONS.items())
+
+    metrics = {}
+    for origin, session in sessions:
+        num_requests = 0
+        num_connections = 0
+        for adapter in set(session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    num_requests += pool.num_requests
+                    num_connections += pool.num_connections
+        metrics[origin] = {
+            'requests': num_requests,
+            'new_connections': num_connections,
+            'reused_connections': max(0, num_requests - num_connections),
+            'tls_handshakes': num_connections if origin.startswith('https://') else 0,
+        }
+    return metrics
+
+
+def connection_metrics_delta(before: Dict[str, Dict[str, int]]) -> Dict[str, int]:
+    """
+    Sum the connection counters of all origins since an earlier snapshot.
+
+    Args:
+        before: Output of connection_metrics() taken earlier
+
+    Returns:
+        Counters (see CONNECTION_METRIC_KEYS) for the requests sent since the snapshot
+    """
+    totals = dict.fromkeys(CONNECTION_METRIC_KEYS, 0)
+    for origin, counters in connection_metrics().items():
+        previous = before.get(origin, {})
+        for key in CONNECTION_METRIC_KEYS:
+            totals[key] += counters[key] - previous.get(key, 0)
+    return totals
+
+
+def close_sessions() -> None:
+    """Close the pooled sessions and their connections (e.g. when the worker process exits)."""
+    with _SESSIONS_LOCK:
+        sessions = list(_SESSIONS.values())
+        _SESSIONS.clear()
+    for session in sessions:
+        session.close()
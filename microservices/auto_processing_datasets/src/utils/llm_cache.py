@@ -0,0 +1,172 @@
+"""Persistent, content-addressed cache of LLM labels (SQLite)."""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from src.configs.constants import LLM_PROMPT_VERSION
+from src.configs.env import LLM_CACHE_MAX_ENTRIES, LLM_CACHE_PATH
+
+# Keys per SQL statement (below SQLite's bound-parameter limit)
+_SQL_BATCH = 500
+
+# Cache of the worker process, opened on first use
+_CACHE = None
+_CACHE_LOCK = threading.Lock()
+
+
+def llm_cache_key(text: str, model_name: str, prompt_version: str = LLM_PROMPT_VERSION) -> bytes:
+    """
+    Hash a cleaned text with the model and prompt that label it.
+
+    Args:
+        text: Cleaned text sent to the LLM
+        model_name: Model name (model.data.model)
+        prompt_version: Version of the LLM prompt
+
+    Returns:
+        16-byte key
+    """
+    payload = f"{prompt_version}\0{model_name}\0{text}".encode('utf-8', 'surrogatepass')
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+class LlmLabelCache:
+    """
+    Labels (sentiment, priority, topic) of texts, keyed by llm_cache_key().
+
+    Entries are evicted least recently used first once the cache holds more
+    than `max_entries` rows. Rows labelled under another prompt version can
+    never be hit again and are deleted when the cache is opened.
+
+    The database is in WAL mode, so the worker processes of a host can share
+    one file.
+    """
+
+    def __init__(self, path: str, max_entries: int = LLM_CACHE_MAX_ENTRIES,
+                 prompt_version: str = LLM_PROMPT_VERSION):
+        self.path = path
+        self.max_entries = max_entries
+        self.prompt_version = prompt_version
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS llm_labels ('
+                'key BLOB PRIMARY KEY, prompt_version TEXT NOT NULL, sentiment TEXT, '
+                'priority INTEGER, topic TEXT, last_used REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS llm_labels_last_used ON llm_labels (last_used)')
+            self._conn.execute('DELETE FROM llm_labels WHERE prompt_version != ?', (prompt_version,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM llm_labels').fetchone()[0]
+
+    def key(self, text: str, model_name: str) -> bytes:
+        """Get the key of a text labelled by a model with this cache's prompt version."""
+        return llm_cache_key(text, model_name, self.prompt_version)
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, tuple]:
+        """
+        Look up labels and mark the entries found as recently used.
+
+        Args:
+            keys: Keys from key()
+
+        Returns:
+            (sentiment, priority, topic) by key, for the keys found
+        """
+        found = {}
+        now = time.time()
+        with self._lock, self._conn:
+            unique_keys = list(dict.fromkeys(keys))
+            for start in range(0, len(unique_keys), _SQL_BATCH):
+                batch = unique_keys[start:start + _SQL_BATCH]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._conn.execute(
+                    f'SELECT key, sentiment, priority, topic FROM llm_labels WHERE key IN ({placeholders})',
+                    batch
+                ).fetchall()
+                for key, sentiment, priority, topic in rows:
+                    found[key] = (sentiment, priority, topic)
+                if rows:
+                    self._conn.execute(
+                        f'UPDATE llm_labels SET last_used = ? WHERE key IN ({placeholders})',
+                        [now] + batch
+                    )
+        return found
+
+    def put_many(self, keys: List[bytes], sentiments: list, priorities: list, topics: list) -> None:
+        """
+        Store labels, then evict the least recently used entries over the size bound.
+
+        Rows whose labels are not plain strings and integers are not stored.
+
+        Args:
+            keys: Keys from key()
+            sentiments: Sentiment of each key
+            priorities: Normalized priority (2/1/0) of each key
+            topics: Topic of each key
+        """
+        now = time.time()
+        rows = [
+            (key, self.prompt_version, sentiment, int(priority), topic, now)
+            for key, sentiment, priority, topic in zip(keys, sentiments, priorities, topics)
+            if isinstance(sentiment, str) and isinstance(topic, str) and isinstance(priority, int)
+        ]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO llm_labels VALUES (?, ?, ?, ?, ?, ?)', rows)
+            excess = self._conn.execute('SELECT COUNT(*) FROM llm_labels').fetchone()[0] - self.max_entries
+            if self.max_entries > 0 and excess > 0:
+                self._conn.execute(
+                    'DELETE FROM llm_labels WHERE key IN '
+                    '(SELECT key FROM llm_labels ORDER BY last_used LIMIT ?)',
+                    (excess,)
+                )
+
+    def clear(self) -> None:
+        """Delete every entry (e.g. after changing the prompt without bumping its version)."""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM llm_labels')
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def get_llm_cache(path: Optional[str] = None) -> LlmLabelCache:
+    """
+    Get the LLM label cache of the worker process.
+
+    Args:
+        path: Database path (defaults to LLM_CACHE_PATH)
+
+    Returns:
+        Cache shared by the tasks of the process
+    """
+    global _CACHE
+    path = path or LLM_CACHE_PATH
+    with _CACHE_LOCK:
+        if _CACHE is None or _CACHE.path != path:
+            _CACHE = LlmLabelCache(path)
+        return _CACHE
+
+
+def close_llm_cache() -> None:
+    """Close the cache of the worker process (e.g. when the process exits)."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is not None:
+            _CACHE.close()
+            _CACHE = None
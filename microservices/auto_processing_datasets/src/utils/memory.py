@@ -0,0 +1,78 @@
+"""Resident set size (RSS) measurements of the current process."""
+import sys
+from typing import Dict
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _status_bytes(field: str) -> int:
+    """Read a kB field of /proc/self/status (Linux), or 0 when unavailable."""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+def peak_rss() -> int:
+    """
+    Get the peak RSS of the process since it started or since reset_peak_rss().
+
+    Returns:
+        Peak RSS in bytes (0 when the platform does not report it)
+    """
+    peak = _status_bytes('VmHWM')
+    if peak or resource is None:
+        return peak
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the peak RSS to the current RSS (Linux only).
+
+    Returns:
+        True when the peak was reset, False when the platform does not support it
+        (peak_rss() then keeps reporting the peak since the process started)
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class StagePeakRss:
+    """
+    Peak RSS of consecutive stages of a computation.
+
+    The peak is reset when the tracker is created and after each recorded
+    stage, so each value is the peak reached during that stage only.
+    """
+
+    def __init__(self):
+        self.peaks: Dict[str, int] = {}
+        reset_peak_rss()
+
+    def record(self, stage: str) -> int:
+        """
+        Record the peak RSS of the stage that just ended.
+
+        Args:
+            stage: Stage name
+
+        Returns:
+            Peak RSS of the stage in bytes
+        """
+        self.peaks[stage] = peak_rss()
+        reset_peak_rss()
+        return self.peaks[stage]
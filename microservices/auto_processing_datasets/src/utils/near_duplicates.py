@@ -0,0 +1,170 @@
+"""Near-duplicate text grouping with MinHash signatures and LSH banding."""
+from typing import List, Tuple
+
+import numpy as np
+
+# Rows whose shingles are hashed per pass (bounds the size of the shingle arrays)
+MINHASH_BLOCK_ROWS = 20000
+
+_MIX_MULTIPLIER_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_MULTIPLIER_2 = np.uint64(0x94D049BB133111EB)
+_SHINGLE_BASE = np.uint64(0x100000001B3)
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer: a cheap, well-distributed 64-bit hash of each value."""
+    values = values ^ (values >> np.uint64(30))
+    values = values * _MIX_MULTIPLIER_1
+    values = values ^ (values >> np.uint64(27))
+    values = values * _MIX_MULTIPLIER_2
+    return values ^ (values >> np.uint64(31))
+
+
+def lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Pick the LSH banding whose similarity threshold is closest to `threshold`.
+
+    With b bands of r rows, two texts become candidates with probability
+    1 - (1 - s^r)^b, which rises sharply around s = (1/b)^(1/r).
+
+    Args:
+        num_perm: Number of MinHash permutations
+        threshold: Target Jaccard similarity
+
+    Returns:
+        Tuple of (number of bands, rows per band)
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+def minhash_signatures(texts: List[str], num_perm: int = 64, shingle_size: int = 5,
+                       seed: int = 0) -> np.ndarray:
+    """
+    Compute MinHash signatures of texts over their character shingles.
+
+    Texts of a block are decoded to one array of code points; the shingle
+    hashes are rolling polynomial hashes over it and each permutation is a
+    seeded affine map of those hashes, reduced to its minimum per text. Texts
+    shorter than `shingle_size` are padded so they have one shingle.
+
+    Args:
+        texts: Texts to sign
+        num_perm: Number of permutations (signature length)
+        shingle_size: Number of characters per shingle
+        seed: Seed of the permutations
+
+    Returns:
+        uint32 array of shape (len(texts), num_perm)
+    """
+    rng = np.random.default_rng(seed)
+    multipliers = rng.integers(0, 2 ** 31, num_perm, dtype=np.uint32) * np.uint32(2) + np.uint32(1)
+    increments = rng.integers(0, 2 ** 32, num_perm, dtype=np.uint32)
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+
+    for start in range(0, len(texts), MINHASH_BLOCK_ROWS):
+        block = [text.ljust(shingle_size, '\0') for text in texts[start:start + MINHASH_BLOCK_ROWS]]
+        lengths = np.fromiter((len(text) for text in block), dtype=np.int64, count=len(block))
+        code_points = np.frombuffer(''.join(block).encode('utf-32-le', 'surrogatepass'),
+                                    dtype=np.uint32).astype(np.uint64)
+        del block
+
+        # Rolling hash of every window of shingle_size code points
+        num_windows = len(code_points) - shingle_size + 1
+        hashes = code_points[:num_windows].copy()
+        for offset in range(1, shingle_size):
+            hashes = hashes * _SHINGLE_BASE + code_points[offset:offset + num_windows]
+        del code_points
+
+        # Keep the windows that do not cross into the next text
+        row_starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        shingle_counts = lengths - shingle_size + 1
+        positions = np.arange(len(hashes)) - np.repeat(row_starts, lengths)[:num_windows]
+        hashes = _mix(hashes[positions < np.repeat(shingle_counts, lengths)[:num_windows]])
+        hashes = (hashes >> np.uint64(32)).astype(np.uint32)
+        shingle_starts = np.concatenate([[0], np.cumsum(shingle_counts)[:-1]])
+
+        # Each permutation is an odd affine map of the 32-bit shingle hashes (a bijection mod 2^32)
+        permuted = np.empty_like(hashes)
+        for perm in range(num_perm):
+            np.multiply(hashes, multipliers[perm], out=permuted)
+            permuted += increments[perm]
+            signatures[start:start + len(lengths), perm] = np.minimum.reduceat(permuted, shingle_starts)
+
+    return signatures
+
+
+def near_duplicate_groups(texts: List[str], threshold: float = 0.8, num_perm: int = 64,
+                          shingle_size: int = 5) -> np.ndarray:
+    """
+    Group texts whose estimated Jaccard similarity reaches a threshold.
+
+    Texts sharing a full LSH band are candidates; a candidate is joined to
+    the first text of its bucket when their signatures agree on at least
+    `threshold` of the permutations. Groups are the connected components of
+    those links, represented by their first text. Since links chain (A~B and
+    B~C do not imply A~C), a text only joins its group when its own
+    signature agrees with the representative's on at least `threshold` of
+    the permutations; otherwise it is its own representative.
+
+    Args:
+        texts: Texts to group
+        threshold: Minimum estimated Jaccard similarity of character shingles
+        num_perm: Number of MinHash permutations
+        shingle_size: Number of characters per shingle
+
+    Returns:
+        int64 array giving, for each text, the position of its group's representative
+    """
+    num_texts = len(texts)
+    representatives = np.arange(num_texts, dtype=np.int64)
+    if num_texts < 2:
+        return representatives
+
+    bands, rows = lsh_bands(num_perm, threshold)
+    signatures = minhash_signatures(texts, bands * rows, shingle_size)
+
+    edges = []
+    for band in range(bands):
+        keys = np.zeros(num_texts, dtype=np.uint64)
+        for column in range(band * rows, (band + 1) * rows):
+            keys = _mix(keys ^ signatures[:, column].astype(np.uint64))
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        bucket_starts = np.flatnonzero(np.concatenate([[True], sorted_keys[1:] != sorted_keys[:-1]]))
+        bucket_sizes = np.diff(np.concatenate([bucket_starts, [num_texts]]))
+        leaders = np.repeat(order[bucket_starts], bucket_sizes)
+        members = order
+        candidates = leaders != members
+        leaders, members = leaders[candidates], members[candidates]
+        if len(members):
+            similarity = (signatures[leaders] == signatures[members]).mean(axis=1)
+            similar = similarity >= threshold
+            edges.append((leaders[similar], members[similar]))
+
+    if not edges:
+        return representatives
+
+    # Connected components: propagate the smallest position along the links
+    left = np.concatenate([edge[0] for edge in edges])
+    right = np.concatenate([edge[1] for edge in edges])
+    while True:
+        previous = representatives.copy()
+        lowest = np.minimum(representatives[left], representatives[right])
+        np.minimum.at(representatives, left, lowest)
+        np.minimum.at(representatives, right, lowest)
+        representatives = representatives[representatives]
+        if np.array_equal(previous, representatives):
+            break
+
+    # Drop the members that are only linked to their representative through others
+    grouped = np.flatnonzero(representatives != np.arange(num_texts))
+    similarity = (signatures[representatives[grouped]] == signatures[grouped]).mean(axis=1)
+    distant = grouped[similarity < threshold]
+    representatives[distant] = distant
+    return representatives
@@ -0,0 +1,122 @@
+"""Fast LLM token estimates and token-aware packing of rows into requests."""
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from src.configs.env import DEFAULT_CONTEXT_TOKENS, LLM_BATCH_TOKEN_BUDGET, MAX_PAGINATE_ROWS_LIMIT
+
+# Rough number of characters per LLM token for French/English social media text
+CHARS_PER_TOKEN = 4
+# Tokens of the prompt around the texts (instructions and output format)
+LLM_PROMPT_TOKENS = 600
+# Tokens per row besides its text: JSON quoting in the request and the three
+# labels of the row in the response, which share the context window
+TOKENS_PER_ROW_OVERHEAD = 16
+
+
+def estimate_tokens(chars: float) -> int:
+    """
+    Estimate the number of LLM tokens for a text length.
+
+    Args:
+        chars: Number of characters
+
+    Returns:
+        Estimated number of tokens
+    """
+    return int(math.ceil(chars / CHARS_PER_TOKEN))
+
+
+def estimate_text_tokens(texts: pd.Series) -> np.ndarray:
+    """
+    Estimate the number of LLM tokens of each text.
+
+    A text costs at least one token per word, and about one token per
+    CHARS_PER_TOKEN characters in long words. Words are counted from the
+    spaces of the cleaned text (whitespace is collapsed by cleaning), with
+    Arrow compute kernels rather than a regex, so this is cheap compared to
+    a real tokenizer.
+
+    Args:
+        texts: Texts (missing values count as empty)
+
+    Returns:
+        int64 array with one estimate per text
+    """
+    texts = pa.array(texts.fillna('').astype(str), type=pa.large_string(), from_pandas=True)
+    chars = pc.utf8_length(texts).to_numpy(zero_copy_only=False).astype(np.int64)
+    words = pc.count_substring(texts, ' ').to_numpy(zero_copy_only=False).astype(np.int64) + (chars > 0)
+    return np.maximum(-(-chars // CHARS_PER_TOKEN), words)
+
+
+def batch_token_budget(model: Optional[dict]) -> int:
+    """
+    Get the token budget of one request to a model.
+
+    The budget is LLM_BATCH_TOKEN_BUDGET and, when the context size of the
+    model is known (contextTokens on the model, or DEFAULT_CONTEXT_TOKENS),
+    what is left of it after the prompt, whichever is smaller.
+
+    Args:
+        model: Model configuration dictionary
+
+    Returns:
+        Tokens per request for the texts and their row overhead (0 = no token budget)
+    """
+    budget = LLM_BATCH_TOKEN_BUDGET
+    context = (model or {}).get('data', {}).get('contextTokens') or DEFAULT_CONTEXT_TOKENS
+    if context:
+        available = max(1, int(context) - LLM_PROMPT_TOKENS)
+        budget = min(budget, available) if budget else available
+    return max(0, budget)
+
+
+def batch_row_cap(model: Optional[dict]) -> int:
+    """
+    Get the hard limit on rows per token-packed request to a model.
+
+    The limit is maxBatchRows on the model, at most MAX_PAGINATE_ROWS_LIMIT
+    (the default). paginateRowsLimit is a fixed batch size, not a limit, so
+    it does not apply to packed batches.
+
+    Args:
+        model: Model configuration dictionary
+
+    Returns:
+        Maximum rows per request
+    """
+    max_rows = (model or {}).get('data', {}).get('maxBatchRows') or MAX_PAGINATE_ROWS_LIMIT
+    return max(1, min(int(max_rows), MAX_PAGINATE_ROWS_LIMIT))
+
+
+def pack_batches(row_tokens: np.ndarray, budget: int, max_rows: int) -> List[Tuple[int, int]]:
+    """
+    Split consecutive rows into batches that fit a token budget.
+
+    Each batch takes as many rows as fit in the budget (counting
+    TOKENS_PER_ROW_OVERHEAD per row), up to max_rows. A row that exceeds the
+    budget on its own is sent alone.
+
+    Args:
+        row_tokens: Estimated tokens of each row's text
+        budget: Tokens per request
+        max_rows: Maximum rows per request
+
+    Returns:
+        (start, end) row bounds of each batch, in row order
+    """
+    cumulative = np.cumsum(np.asarray(row_tokens, dtype=np.int64) + TOKENS_PER_ROW_OVERHEAD)
+    num_rows = len(cumulative)
+    bounds = []
+    start = 0
+    while start < num_rows:
+        used = cumulative[start - 1] if start else 0
+        end = int(np.searchsorted(cumulative, used + budget, side='right'))
+        end = min(max(end, start + 1), start + max_rows, num_rows)
+        bounds.append((start, end))
+        start = end
+    return bounds
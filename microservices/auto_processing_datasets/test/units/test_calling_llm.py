@@ -2,13 +2,15 @@
 import pytest
 import pandas as pd
 import json
+import threading
+import time
 from unittest.mock import Mock, patch, MagicMock
 
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
 
-from src.services.calling_llm import _get_ai_model, _call_llm_api, calling_llm
+from src.services.calling_llm import _get_ai_model, _call_llm_api, calling_llm, calling_llm_chunks
 from src.configs.constants import (
     TASK_STATUS_SENDING_TO_LLM,
     TASK_STATUS_SENDING_TO_LLM_PROGRESS,
@@ -338,6 +340,232 @@ class TestCallingLlm:
         assert any(call[0] == 'test_file_123' and call[1] == TASK_STATUS_SENDING_TO_LLM_DONE 
                   for call in mock_event_emitter.call_args_list)
     
+    @patch('src.services.calling_llm._call_llm_api')
+    @patch('src.services.calling_llm._get_ai_model')
+    def test_calling_llm_copies_labels_to_near_duplicates(self, mock_get_model, mock_call_api,
+                                                          sample_ai_config, mock_event_emitter):
+        """Test that only representatives are sent to the LLM and their labels are inherited."""
+        base = 'la fibre est en panne depuis ce matin dans tout le quartier, merci de corriger'
+        df = pd.DataFrame({
+            'id': [1, 2, 3, 4],
+            'full_text': [base, 'facture incorrecte ce mois-ci', 'RT ' + base, base + ' @free'],
+        })
+        mock_get_model.return_value = {
+            'uid': 'local1',
+            'data': {'model': 'llama3', 'baseUrl': 'http://localhost:11434', 'paginateRowsLimit': 1}
+        }
+        mock_call_api.side_effect = [
+            {'data': {'sentiment': ['negative'], 'priority': ['high'], 'topic': ['network']}},
+            {'data': {'sentiment': ['neutral'], 'priority': ['low'], 'topic': ['billing']}},
+        ]
+        
+        with patch('src.services.calling_llm.NEAR_DUPLICATES_ENABLED', True):
+            result_df, _ = calling_llm('test_file_123', df, sample_ai_config, mock_event_emitter)
+        
+        assert [call[0][1] for call in mock_call_api.call_args_list] == [[base], ['facture incorrecte ce mois-ci']]
+        assert result_df['main_topic'].tolist() == ['network', 'billing', 'network', 'network']
+        assert result_df['priority'].tolist() == [2, 0, 2, 2]
+        assert result_df['label_inherited'].tolist() == [False, False, True, True]
+        
+        progress = [call[0][2] for call in mock_event_emitter.call_args_list
+                    if call[0][1] == TASK_STATUS_SENDING_TO_LLM_PROGRESS]
+        assert [p['rows_processed'] for p in progress] == [2, 4]
+        assert progress[-1]['progress_percentage'] == 100
+        done_payload = mock_event_emitter.call_args_list[-1][0][2]
+        assert done_payload['total_rows'] == 4
+        assert done_payload['llm_rows'] == 2
+    
+    @patch('src.services.calling_llm._call_llm_api')
+    @patch('src.services.calling_llm._get_ai_model')
+    def test_calling_llm_concurrent_batches_keep_row_order(self, mock_get_model, mock_call_api,
+                                                           sample_ai_config, mock_event_emitter):
+        """Test that batches sent concurrently are reassembled in row order within the in-flight limit."""
+        df = pd.DataFrame({'full_text': [f'text {i}' for i in range(12)]})
+        mock_get_model.return_value = {
+            'uid': 'local1',
+            'data': {'model': 'llama3', 'baseUrl': 'http://localhost:11434',
+                     'paginateRowsLimit': 2, 'maxInFlightRequests': 3}
+        }
+        lock = threading.Lock()
+        in_flight = [0, 0]
+        
+        def call_api(model, texts, ai_config):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight[1], in_flight[0])
+            # Later batches answer first
+            time.sleep(0.05 - 0.004 * int(texts[0].split()[1]))
+            with lock:
+                in_flight[0] -= 1
+            return {'data': {'sentiment': ['neutral'] * len(texts), 'priority': ['low'] * len(texts),
+                             'topic': texts}}
+        
+        mock_call_api.side_effect = call_api
+        
+        result_df, model_uid = calling_llm('test_file_123', df, sample_ai_config, mock_event_emitter)
+        
+        assert result_df['main_topic'].tolist() == df['full_text'].tolist()
+        assert model_uid == 'local1'
+        assert 1 < in_flight[1] <= 3
+        
+        progress = [call[0][2] for call in mock_event_emitter.call_args_list
+                    if call[0][1] == TASK_STATUS_SENDING_TO_LLM_PROGRESS]
+        assert [p['batch'] for p in progress] == [1, 2, 3, 4, 5, 6]
+        assert [p['rows_processed'] for p in progress] == [2, 4, 6, 8, 10, 12]
+        assert sorted(p['current_row_index'] for p in progress) == [1, 3, 5, 7, 9, 11]
+        assert progress[-1]['progress_percentage'] == 100
+    
+    @patch('src.services.calling_llm._call_llm_api')
+    @patch('src.services.calling_llm._get_ai_model')
+    def test_calling_llm_fallback_retries_failed_batch(self, mock_get_model, mock_call_api,
+                                                       sample_ai_config, mock_event_emitter):
+        """Test that a failed batch is retried with the fallback model instead of being skipped."""
+        df = pd.DataFrame({'full_text': ['a', 'b', 'c']})
+        models = {
+            'local1': {'uid': 'local1', 'data': {'model': 'llama3', 'baseUrl': 'http://a', 'paginateRowsLimit': 1}},
+            'local2': {'uid': 'local2', 'data': {'model': 'mistral', 'baseUrl': 'http://b'}},
+        }
+        mock_get_model.side_effect = lambda ai_config, tried: next(
+            (model for uid, model in models.items() if uid not in tried), None
+        )
+        
+        def call_api(model, texts, ai_config):
+            if model['uid'] == 'local1' and texts == ['b']:
+                raise Exception('timeout')
+            return {'data': {'sentiment': ['positive'], 'priority': ['high'], 'topic': [model['uid']]}}
+        
+        mock_call_api.side_effect = call_api
+        
+        result_df, model_uid = calling_llm('test_file_123', df, sample_ai_config, mock_event_emitter)
+        
+        assert result_df['main_topic'].tolist() == ['local1', 'local2', 'local2']
+        assert model_uid == 'local2'
+    
+    @patch('src.services.calling_llm._call_llm_api')
+    @patch('src.services.calling_llm._get_ai_model')
+    def test_calling_llm_sends_only_cache_misses(self, mock_get_model, mock_call_api,
+                                                 sample_ai_config, tmp_path):
+        """Test that texts labelled before are served from the LLM cache."""
+        from src.utils.llm_cache import LlmLabelCache
+        cache = LlmLabelCache(str(tmp_path / 'llm_cache.sqlite3'))
+        mock_get_model.return_value = {
+            'uid': 'local1',
+            'data': {'model': 'llama3', 'baseUrl': 'http://localhost:11434', 'paginateRowsLimit': 10}
+        }
+        mock_call_api.side_effect = lambda model, texts, ai_config: {
+            'data': {'sentiment': ['negative'] * len(texts), 'priority': ['high'] * len(texts), 'topic': texts}
+        }
+        
+        with patch('src.services.calling_llm.LLM_CACHE_ENABLED', True), \
+                patch('src.services.calling_llm.get_llm_cache', return_value=cache):
+            calling_llm('file_1', pd.DataFrame({'full_text': ['a', 'b']}), sample_ai_config, Mock())
+            event_emitter = Mock()
+            result_df, _ = calling_llm('file_2', pd.DataFrame({'full_text': ['b', 'c', 'a']}),
+                                       sample_ai_config, event_emitter)
+        
+        assert mock_call_api.call_args_list[-1][0][1] == ['c']
+        assert result_df['main_topic'].tolist() == ['b', 'c', 'a']
+        assert result_df['priority'].tolist() == [2, 2, 2]
+        
+        progress = [call[0][2] for call in event_emitter.call_args_list
+                    if call[0][1] == TASK_STATUS_SENDING_TO_LLM_PROGRESS]
+        assert len(progress) == 1
+        assert progress[0]['cache_hits'] == 2 and progress[0]['cache_misses'] == 1
+        assert progress[0]['rows_processed'] == 3 and progress[0]['current_row_index'] == 2
+        done_payload = event_emitter.call_args_list[-1][0][2]
+        assert done_payload['cache_hits'] == 2 and done_payload['total_batches'] == 1
+    
+    @patch('src.services.calling_llm._call_llm_api')
+    @patch('src.services.calling_llm._get_ai_model')
+    def test_calling_llm_sends_distinct_texts_once(self, mock_get_model, mock_call_api,
+                                                   sample_ai_config, mock_event_emitter):
+        """Test that repeated texts are sent once and their labels copied to every row."""
+        df = pd.DataFrame({'full_text': ['panne', 'facture', 'panne', None, 'facture', None]})
+        mock_get_model.return_value = {
+            'uid': 'local1',
+            'data': {'model': 'llama3', 'baseUrl': 'http://localhost:11434', 'paginateRowsLimit': 10}
+        }
+        mock_call_api.return_value = {
+            'data': {'sentiment': ['negative', 'neutral', 'neutral'], 'priority': ['high', 'low', 'low'],
+                     'topic': ['network', 'billing', 'general']}
+        }
+        
+        result_df, _ = calling_llm('test_file_123', df, sample_ai_config, mock_event_emitter)
+        
+        assert mock_call_api.call_count == 1
+        sent = mock_call_api.call_args[0][1]
+        assert sent[:2] == ['panne', 'facture'] and pd.isna(sent[2])
+        assert result_df['main_topic'].tolist() == ['network', 'billing', 'network', 'general', 'billing', 'general']
+        assert result_df['priority'].tolist() == [2, 0, 2, 0, 0, 0]
+        assert 'label_inherited' not in result_df.columns
+        
+        progress = [call[0][2] for call in mock_event_emitter.call_args_list
+                    if call[0][1] == TASK_STATUS_SENDING_TO_LLM_PROGRESS]
+        assert progress[-1]['rows_processed'] == 6
+        done_payload = mock_event_emitter.call_args_list[-1][0][2]
+        assert done_payload['rows_saved'] == 3
+        assert done_payload['llm_rows'] == 3
+    
+    @patch('src.services.calling_llm._call_llm_api')
+    @patch('src.services.calling_llm._get_ai_model')
+    def test_calling_llm_packs_batches_by_tokens(self, mock_get_model, mock_call_api,
+                                                 sample_ai_config, mock_event_emitter):
+        """Test that short rows are packed by context size into fewer requests than fixed pagination."""
+        from src.utils.tokens import LLM_PROMPT_TOKENS, TOKENS_PER_ROW_OVERHEAD
+        texts = [f'short {i}' for i in range(11)] + ['long ' * 60, 'tail']
+        mock_get_model.return_value = {
+            'uid': 'local1',
+            'data': {'model': 'llama3', 'baseUrl': 'http://localhost:11434', 'paginateRowsLimit': 2,
+                     'contextTokens': LLM_PROMPT_TOKENS + 5 * (2 + TOKENS_PER_ROW_OVERHEAD)}
+        }
+        mock_call_api.side_effect = lambda model, batch, ai_config: {
+            'data': {'sentiment': ['neutral'] * len(batch), 'priority': ['low'] * len(batch), 'topic': batch}
+        }
+        
+        with patch('src.utils.tokens.LLM_BATCH_TOKEN_BUDGET', 0):
+            result_df, _ = calling_llm('test_file_123', pd.DataFrame({'full_text': texts}),
+                                       sample_ai_config, mock_event_emitter, max_batch_rows=2)
+        
+        # Fixed pagination of 2 rows would take 7 requests
+        assert [len(call[0][1]) for call in mock_call_api.call_args_list] == [5, 5, 1, 1, 1]
+        assert result_df['main_topic'].tolist() == texts
+        progress = [call[0][2] for call in mock_event_emitter.call_args_list
+                    if call[0][1] == TASK_STATUS_SENDING_TO_LLM_PROGRESS]
+        assert [p['current_row_index'] for p in progress] == [1, 6, 11, 12, 13]
+        assert progress[-1]['rows_processed'] == 13
+        
+        mock_call_api.reset_mock()
+        mock_get_model.return_value['data']['maxBatchRows'] = 3
+        with patch('src.utils.tokens.LLM_BATCH_TOKEN_BUDGET', 0):
+            calling_llm('test_file_123', pd.DataFrame({'full_text': texts}), sample_ai_config, mock_event_emitter)
+        
+        assert [len(call[0][1]) for call in mock_call_api.call_args_list] == [3, 3, 3, 2, 1, 1]
+    
+    @patch('src.services.calling_llm._call_llm_api')
+    @patch('src.services.calling_llm._get_ai_model')
+    def test_calling_llm_does_not_cache_truncated_responses(self, mock_get_model, mock_call_api,
+                                                            sample_ai_config, tmp_path):
+        """Test that padded labels of a truncated response are not stored in the LLM cache."""
+        from src.utils.llm_cache import LlmLabelCache
+        cache = LlmLabelCache(str(tmp_path / 'llm_cache.sqlite3'))
+        mock_get_model.return_value = {
+            'uid': 'local1',
+            'data': {'model': 'llama3', 'baseUrl': 'http://localhost:11434', 'paginateRowsLimit': 2}
+        }
+        mock_call_api.side_effect = [
+            {'data': {'sentiment': ['negative'], 'priority': ['high'], 'topic': ['network']}},
+            {'data': {'sentiment': ['positive'], 'priority': ['low'], 'topic': ['billing']}},
+        ]
+        
+        with patch('src.services.calling_llm.LLM_CACHE_ENABLED', True), \
+                patch('src.services.calling_llm.get_llm_cache', return_value=cache):
+            result_df, _ = calling_llm('file_1', pd.DataFrame({'full_text': ['a', 'b', 'c']}),
+                                       sample_ai_config, Mock())
+        
+        assert result_df['main_topic'].tolist() == ['network', 'general', 'billing']
+        assert len(cache) == 1
+        assert list(cache.get_many([cache.key('c', 'llama3')]).values()) == [('positive', 0, 'billing')]
+    
     @patch('src.services.calling_llm._get_ai_model')
     def test_calling_llm_no_model_available(self, mock_get_model,
                                             sample_dataframe, sample_ai_config, mock_event_emitter):
@@ -349,3 +577,75 @@ class TestCallingLlm:
         
         assert 'No AI model available' in str(exc_info.value)
 
+
+
+class TestCallingLlmChunks:
+    """Test cases for calling_llm_chunks function."""
+    
+    @pytest.fixture
+    def sample_ai_config(self):
+        """Create sample AI configuration."""
+        return {
+            'preferences': {'mode': 'local', 'default_local_model_id': 'local1'},
+            'local': [{'uid': 'local1', 'data': {'model': 'llama3', 'baseUrl': 'http://localhost:11434'}}]
+        }
+    
+    @patch('src.services.calling_llm._call_llm_api')
+    @patch('src.services.calling_llm._get_ai_model')
+    def test_calling_llm_chunks_rebases_progress(self, mock_get_model, mock_call_api, sample_ai_config):
+        """Test that progress events cover the whole stream, not each chunk."""
+        mock_get_model.return_value = {
+            'uid': 'local1',
+            'data': {'model': 'llama3', 'baseUrl': 'http://localhost:11434', 'paginateRowsLimit': 1}
+        }
+        mock_call_api.return_value = {
+            'data': {'sentiment': ['positive'], 'priority': ['high'], 'topic': ['service']}
+        }
+        chunks = [
+            pd.DataFrame({'full_text': ['a', 'b']}),
+            pd.DataFrame({'full_text': ['c', 'd']}),
+        ]
+        mock_event_emitter = Mock()
+        
+        results = list(calling_llm_chunks('test_file_123', chunks, sample_ai_config,
+                                          mock_event_emitter, total_rows=4))
+        
+        assert [len(chunk) for chunk in results] == [2, 2]
+        assert all('sentiment' in chunk.columns for chunk in results)
+        
+        events = [call[0][1] for call in mock_event_emitter.call_args_list]
+        assert events.count(TASK_STATUS_SENDING_TO_LLM) == 1
+        assert events.count(TASK_STATUS_SENDING_TO_LLM_DONE) == 1
+        
+        progress = [call[0][2] for call in mock_event_emitter.call_args_list
+                    if call[0][1] == TASK_STATUS_SENDING_TO_LLM_PROGRESS]
+        assert [p['rows_processed'] for p in progress] == [1, 2, 3, 4]
+        assert [p['batch'] for p in progress] == [1, 2, 3, 4]
+        assert all(p['total_rows'] == 4 and p['total_batches'] == 4 for p in progress)
+        assert progress[-1]['progress_percentage'] == 100
+    
+    @pytest.mark.parametrize('engine', ['c', 'pyarrow'])
+    @patch('src.services.calling_llm._call_llm_api')
+    @patch('src.services.calling_llm._get_ai_model')
+    def test_calling_llm_chunks_near_duplicates_single_row_chunk(self, mock_get_model, mock_call_api,
+                                                                 sample_ai_config, tmp_path, engine):
+        """Test that a one-row last chunk keeps the label_inherited column of the staged file."""
+        from src.utils.dataset_io import iter_csv_chunks, write_csv_chunks
+        mock_get_model.return_value = {
+            'uid': 'local1',
+            'data': {'model': 'llama3', 'baseUrl': 'http://localhost:11434', 'paginateRowsLimit': 10}
+        }
+        mock_call_api.side_effect = lambda model, batch, ai_config: {
+            'data': {'sentiment': ['neutral'] * len(batch), 'priority': ['low'] * len(batch), 'topic': batch}
+        }
+        texts = [f'message {i}: ' + 'abcdefghij'[i % 10] * (i + 5) for i in range(22)]
+        chunks = [pd.DataFrame({'full_text': texts[start:start + 7]}) for start in range(0, 22, 7)]
+        staged_path = str(tmp_path / 'staged.csv')
+        
+        with patch('src.services.calling_llm.NEAR_DUPLICATES_ENABLED', True):
+            write_csv_chunks(staged_path, calling_llm_chunks('test_file_123', chunks, sample_ai_config, Mock()))
+        
+        results = list(iter_csv_chunks(staged_path, 7, engine))
+        assert [len(chunk) for chunk in results] == [7, 7, 7, 1]
+        assert results[-1]['label_inherited'].tolist() == [False]
+        assert pd.concat(results)['main_topic'].tolist() == texts
@@ -10,10 +10,17 @@ from unittest.mock import Mock, patch, MagicMock
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
 
-from src.services.cleaning import remove_emoji, cleaning
+from src.services.cleaning import (
+    remove_emoji, cleaning, cleaning_chunks, clean_text_column, _iqr_keep_mask,
+    _clean_text_block, _clean_single_text
+)
+from src.utils.dataset_io import SOURCE_ROW_COLUMN, arrow_text_dtype, read_csv, read_checkpoint
+from src.utils.cleaning_rules import get_cleaning_rule_set, HASHTAGS_KEEP, HASHTAGS_REMOVE
 from src.configs.constants import (
     TASK_STATUS_PROCESS_CLEANING,
     TASK_STATUS_PROCESS_CLEANING_DONE,
+    OUTLIER_MODE_SEQUENTIAL,
+    OUTLIER_MODE_SINGLE_PASS,
 )
 
 
@@ -81,6 +88,201 @@ class TestRemoveEmoji:
         assert "Hello world test" in result or "Hello world test" == result.strip()
 
 
+class TestCleanTextColumn:
+    """Test cases for clean_text_column function."""
+    
+    @pytest.fixture
+    def random_texts(self):
+        """Random texts mixing words, mentions, emoji, symbols and unusual whitespace."""
+        rng = np.random.default_rng(0)
+        pieces = ['free', 'réseau', 'ÉTÉ', '中文', '@', '@free', '@_x1', 'x@y', '😀', '🎉', '✂', 'Ⓜ', '🇫🇷',
+                  '#', '$', '%', '&', '*', '...', '!?', '(ok)', '-', '_', '—', "'", '"', '\u00a0', '\u3000',
+                  '\t', '\n', '\x1c', '  ', ' ', '1', '42', 'é', 'ß', '\u0301', '__MENTION_0__',
+                  '@@', '@_']
+        texts = [''.join(rng.choice(pieces, size=rng.integers(0, 25))) for _ in range(2000)]
+        return texts + ['', ' ', '@', '@ ', ' @a', 'a @', '@@bob hi @_', None, float('nan'), 123, 4.5]
+    
+    def test_differential_against_remove_emoji(self, random_texts):
+        """Test that the vectorized kernel matches remove_emoji() row by row."""
+        texts = pd.Series(random_texts, dtype=object)
+        
+        expected = texts.apply(remove_emoji)
+        result = clean_text_column(texts)
+        
+        pd.testing.assert_series_equal(result, expected)
+    
+    def test_differential_with_blocks(self, random_texts):
+        """Test that block boundaries do not change the output."""
+        texts = pd.Series(random_texts, dtype=object)
+        
+        with patch('src.services.cleaning.CLEANING_KERNEL_BLOCK_ROWS', 7):
+            result = clean_text_column(texts)
+        
+        assert result.tolist() == texts.apply(remove_emoji).tolist()
+    
+    def test_parallel_matches_serial(self, random_texts):
+        """Test that cleaning in a process pool reassembles blocks in order."""
+        texts = pd.Series(random_texts, dtype=object)
+        
+        with patch('src.services.cleaning.CLEANING_KERNEL_BLOCK_ROWS', 300), \
+             patch('src.services.cleaning.CLEANING_PARALLEL_MIN_ROWS', 1):
+            result = clean_text_column(texts, workers=2)
+        
+        pd.testing.assert_series_equal(result, texts.apply(remove_emoji))
+    
+    def test_parallel_falls_back_to_serial(self, random_texts):
+        """Test that the column is cleaned in-process when worker processes cannot start."""
+        texts = pd.Series(random_texts, dtype=object)
+        
+        with patch('src.services.cleaning.CLEANING_KERNEL_BLOCK_ROWS', 300), \
+             patch('src.services.cleaning.CLEANING_PARALLEL_MIN_ROWS', 1), \
+             patch('src.services.cleaning.ProcessPoolExecutor',
+                   side_effect=AssertionError('daemonic processes are not allowed to have children')):
+            result = clean_text_column(texts, workers=2)
+        
+        assert result.tolist() == texts.apply(remove_emoji).tolist()
+    
+    def test_memoization_cleans_each_text_once(self):
+        """Test that repeated texts are cleaned once and mapped back to every row."""
+        texts = pd.Series(['RT 😀 @a', None, 'RT 😀 @a', 'other!!', 'RT 😀 @a', 7, '7'], dtype=object)
+        stats = {}
+        
+        with patch('src.services.cleaning._clean_text_block', wraps=_clean_text_block) as kernel:
+            result = clean_text_column(texts, stats=stats)
+        
+        pd.testing.assert_series_equal(result, texts.apply(remove_emoji))
+        assert kernel.call_args[0][0] == ['RT 😀 @a', 'other!!', '7', '7']
+        assert stats == {'texts': 6, 'cleaned_texts': 4}
+    
+    def test_without_memoization(self):
+        """Test that every text is cleaned when memoization is disabled."""
+        texts = pd.Series(['a 😀', 'a 😀', None])
+        stats = {}
+        
+        with patch('src.services.cleaning.CLEANING_MEMOIZE', False):
+            result = clean_text_column(texts, stats=stats)
+        
+        assert result.tolist()[:2] == ['a', 'a']
+        assert stats == {'texts': 2, 'cleaned_texts': 2}
+    
+    def test_text_containing_row_separator(self):
+        """Test that texts containing the kernel's row separator are still cleaned correctly."""
+        texts = pd.Series(['a \u2180 b @', 'c 😀 @d'])
+        assert clean_text_column(texts).tolist() == [remove_emoji(text) for text in texts]
+    
+    def test_matches_remove_emoji(self):
+        """Test that the column is cleaned row by row with remove_emoji."""
+        texts = pd.Series(['Hello 😀 world', None, 'Hi @user!!'], dtype=object)
+        result = clean_text_column(texts)
+        assert result.tolist()[0] == remove_emoji('Hello 😀 world')
+        assert result.tolist()[2] == remove_emoji('Hi @user!!')
+        assert pd.isna(result.iloc[1])
+    
+    def test_strip_urls_rule(self):
+        """Test that URLs are removed when the strip_urls rule is set."""
+        texts = pd.Series(['see https://x.co/a?b=1 now', 'www.example.org', 'no url'])
+        rule_set = get_cleaning_rule_set({'strip_urls': True})
+        
+        assert clean_text_column(texts, rule_set=rule_set).tolist() == ['see now', '', 'no url']
+    
+    @pytest.mark.parametrize('hashtags,expected', [
+        (HASHTAGS_KEEP, 'Hi #topic @user'),
+        (HASHTAGS_REMOVE, 'Hi @user'),
+    ])
+    def test_hashtags_rule(self, hashtags, expected):
+        """Test that hashtags are kept or removed according to the rule."""
+        texts = pd.Series(['Hi #topic 😀 @user'])
+        rule_set = get_cleaning_rule_set({'hashtags': hashtags})
+        
+        assert clean_text_column(texts, rule_set=rule_set).tolist() == [expected]
+    
+    def test_character_and_pattern_rules(self):
+        """Test custom patterns, punctuation, mentions and whitespace rules together."""
+        texts = pd.Series(['Order #123:  ok!  @me', 'RT  done'])
+        rule_set = get_cleaning_rule_set({
+            'remove_patterns': [r'\bRT\b'],
+            'allowed_punctuation': '!',
+            'preserve_mentions': False,
+            'collapse_whitespace': False,
+        })
+        
+        assert clean_text_column(texts, rule_set=rule_set).tolist() == ['Order 123  ok!  me', '  done']
+    
+    def test_rules_in_blocks_match_rows(self, random_texts):
+        """Test that rules applied to joined blocks match rules applied row by row."""
+        rule_set = get_cleaning_rule_set({'strip_urls': True, 'hashtags': HASHTAGS_REMOVE})
+        texts = [text for text in random_texts if isinstance(text, str)]
+        expected = [_clean_single_text(text, rule_set) for text in texts]
+        
+        with patch('src.services.cleaning.CLEANING_KERNEL_BLOCK_ROWS', 7):
+            result = clean_text_column(pd.Series(texts), rule_set=rule_set)
+        
+        assert result.tolist() == expected
+    
+    def test_keeps_arrow_dtype(self):
+        """Test that Arrow-backed input stays Arrow-backed."""
+        texts = pd.Series(['Hello 😀 world', None], dtype=arrow_text_dtype())
+        result = clean_text_column(texts)
+        assert result.dtype == arrow_text_dtype()
+        assert result.isna().tolist() == [False, True]
+
+
+class TestIqrKeepMask:
+    """Test cases for _iqr_keep_mask function."""
+    
+    @pytest.fixture
+    def numeric_df(self):
+        """Numeric columns where filtering 'a' first changes the bounds of 'b'."""
+        return pd.DataFrame({
+            'a': [1, 2, 3, 4, 5, 6, 7, 8, 100],
+            'b': [10, 10, 10, 10, 10, 11, 12, 13, 10],
+        })
+    
+    def test_sequential_uses_rows_kept_by_previous_columns(self, numeric_df):
+        """Test that sequential mode reproduces the per-column filtering loop."""
+        expected = numeric_df
+        for col in numeric_df.columns:
+            Q1, Q3 = expected[col].quantile(0.25), expected[col].quantile(0.75)
+            IQR = Q3 - Q1
+            if IQR > 0:
+                expected = expected[(expected[col] >= Q1 - 1.5 * IQR) & (expected[col] <= Q3 + 1.5 * IQR)]
+        
+        keep = _iqr_keep_mask(numeric_df, OUTLIER_MODE_SEQUENTIAL)
+        
+        assert numeric_df.index[keep].tolist() == expected.index.tolist()
+        assert keep.tolist() == [True] * 8 + [False]
+    
+    def test_single_pass_uses_bounds_of_all_rows(self, numeric_df):
+        """Test that single-pass mode checks every column against bounds computed on all rows."""
+        keep = _iqr_keep_mask(numeric_df, OUTLIER_MODE_SINGLE_PASS)
+        
+        assert keep.tolist() == [True] * 7 + [False, False]
+    
+    def test_single_pass_matches_per_column_bounds(self):
+        """Test the vectorized single pass against per-column bounds on random data."""
+        rng = np.random.default_rng(0)
+        numeric_df = pd.DataFrame({
+            'ints': rng.integers(0, 100, 1000),
+            'floats': rng.standard_cauchy(1000),
+            'constant': np.ones(1000),
+            'with_nan': np.where(rng.random(1000) < 0.1, np.nan, rng.normal(size=1000)),
+        })
+        
+        expected = np.ones(len(numeric_df), dtype=bool)
+        for col in numeric_df.columns:
+            Q1, Q3 = numeric_df[col].quantile(0.25), numeric_df[col].quantile(0.75)
+            IQR = Q3 - Q1
+            if IQR > 0:
+                expected &= ((numeric_df[col] >= Q1 - 1.5 * IQR) & (numeric_df[col] <= Q3 + 1.5 * IQR)).to_numpy()
+        
+        assert (_iqr_keep_mask(numeric_df, OUTLIER_MODE_SINGLE_PASS) == expected).all()
+    
+    def test_unknown_mode(self, numeric_df):
+        """Test that an unknown mode is rejected."""
+        with pytest.raises(ValueError):
+            _iqr_keep_mask(numeric_df, 'unknown')
+
+
 class TestCleaning:
     """Test cases for cleaning function."""
     
@@ -119,6 +321,20 @@ class TestCleaning:
         adapter.update_one = Mock()
         return adapter
     
+    def test_cleaning_keeps_arrow_strings(self, temp_dir, sample_dataframe, mock_event_emitter):
+        """Test that Arrow-backed text stays Arrow-backed through cleaning and re-reads."""
+        df = sample_dataframe.copy()
+        df['full_text'] = df['full_text'].astype(arrow_text_dtype())
+        
+        with patch('src.services.cleaning.STORAGE_CLEANED', temp_dir):
+            result_df = cleaning('test_file_123', df, mock_event_emitter)
+        
+        expected = [remove_emoji(text) for text in sample_dataframe['full_text'].drop_duplicates()]
+        assert result_df['full_text'].dtype == arrow_text_dtype()
+        assert result_df['full_text'].tolist()[:3] == expected[:3]
+        reread = read_csv(os.path.join(temp_dir, 'test_file_123.csv'))
+        assert reread['full_text'].dtype == arrow_text_dtype()
+    
     @patch('src.services.cleaning.STORAGE_CLEANED', new_callable=lambda: '/tmp/test_cleaned')
     def test_cleaning_removes_emojis(self, mock_storage, temp_dir, sample_dataframe, mock_event_emitter):
         """Test that cleaning removes emojis from full_text column."""
@@ -143,6 +359,25 @@ class TestCleaning:
             assert len(result_df) < initial_rows
             assert len(result_df) == initial_rows - 1
     
+    @pytest.mark.parametrize('mode', [OUTLIER_MODE_SEQUENTIAL, OUTLIER_MODE_SINGLE_PASS])
+    def test_cleaning_removes_outliers(self, temp_dir, mock_event_emitter, mode):
+        """Test that outliers are removed and counted in both outlier modes."""
+        df = pd.DataFrame({
+            'id': range(9),
+            'full_text': [f'text {i}' for i in range(9)],
+            'a': [1, 2, 3, 4, 5, 6, 7, 8, 100],
+            'b': [10, 10, 10, 10, 10, 11, 12, 13, 10],
+        })
+        
+        with patch('src.services.cleaning.STORAGE_CLEANED', temp_dir), \
+             patch('src.services.cleaning.OUTLIER_MODE', mode):
+            result_df = cleaning('test_file_123', df, mock_event_emitter)
+        
+        expected_outliers = 1 if mode == OUTLIER_MODE_SEQUENTIAL else 2
+        assert len(result_df) == 9 - expected_outliers
+        done_payload = mock_event_emitter.call_args_list[-1][0][2]
+        assert done_payload['outliers_removed'] == expected_outliers
+    
     @patch('src.services.cleaning.STORAGE_CLEANED', new_callable=lambda: '/tmp/test_cleaned')
     def test_cleaning_emits_events(self, mock_storage, temp_dir, sample_dataframe, mock_event_emitter):
         """Test that cleaning emits correct events."""
@@ -170,6 +405,18 @@ class TestCleaning:
             loaded_df = pd.read_csv(expected_path)
             assert len(loaded_df) == len(result_df)
     
+    def test_cleaning_uses_task_rules(self, temp_dir, mock_event_emitter, mock_db_adapter):
+        """Test that the cleaning rules stored on the task are applied."""
+        df = pd.DataFrame({'full_text': ['read https://x.co #news', 'plain']})
+        mock_db_adapter.find_one.return_value = {
+            'data': {'cleaning_rules': {'strip_urls': True, 'hashtags': HASHTAGS_REMOVE}}
+        }
+        
+        with patch('src.services.cleaning.STORAGE_CLEANED', temp_dir):
+            result_df = cleaning('test_file_123', df, mock_event_emitter, mock_db_adapter)
+        
+        assert result_df['full_text'].tolist() == ['read', 'plain']
+    
     @patch('src.services.cleaning.STORAGE_CLEANED', new_callable=lambda: '/tmp/test_cleaned')
     def test_cleaning_updates_database(self, mock_storage, temp_dir, sample_dataframe, mock_event_emitter, mock_db_adapter):
         """Test that cleaning updates database with file path."""
@@ -203,4 +450,165 @@ class TestCleaning:
         with patch('src.services.cleaning.STORAGE_CLEANED', temp_dir):
             result_df = cleaning('test_file_123', df, mock_event_emitter)
             assert len(result_df) == 0
+    
+    def test_low_memory_mode_matches_default(self, temp_dir, sample_dataframe, mock_event_emitter):
+        """Test that low-memory cleaning gives the same rows and reports peak RSS per stage."""
+        with patch('src.services.cleaning.STORAGE_CLEANED', temp_dir):
+            expected_df = cleaning('default', sample_dataframe.copy(), mock_event_emitter)
+            with patch('src.services.cleaning.CLEANING_MEMORY_BUDGET_BYTES', 1):
+                result_df = cleaning('low_memory', sample_dataframe.copy(), mock_event_emitter)
+        
+        pd.testing.assert_frame_equal(result_df, expected_df)
+        payload = mock_event_emitter.call_args[0][2]
+        assert payload['low_memory'] is True
+        assert list(payload['peak_rss_bytes']) == ['text', 'dedupe', 'outliers', 'save']
+    
+    def test_cleaning_writes_checkpoint(self, temp_dir, sample_dataframe, mock_event_emitter, mock_db_adapter):
+        """Test that the cleaned dataset is checkpointed and the CSV can be skipped."""
+        with patch('src.services.cleaning.STORAGE_CLEANED', temp_dir), \
+                patch('src.services.cleaning.CLEANED_CSV_ENABLED', False):
+            result_df = cleaning('test_file_123', sample_dataframe.copy(), mock_event_emitter, mock_db_adapter)
+        
+        checkpoint = os.path.join(temp_dir, 'test_file_123.feather')
+        assert not os.path.exists(os.path.join(temp_dir, 'test_file_123.csv'))
+        assert mock_event_emitter.call_args[0][2]['cleaned_path'] == checkpoint
+        pd.testing.assert_frame_equal(read_checkpoint(checkpoint), result_df.reset_index(drop=True))
+        assert not mock_db_adapter.update_one.called
+    
+    def test_incremental_cleaning_matches_full_cleaning(self, temp_dir, sample_dataframe, mock_event_emitter):
+        """Test that cleaning an appended version from the previous one matches cleaning it from scratch."""
+        appended = pd.concat([sample_dataframe, pd.DataFrame({
+            'id': [6, 7, 8, 1],
+            'full_text': ['New 🎉 row', 'Test @username message', 'Big value', 'Hello 😀 world'],
+            'user_id': [500, 200, 600, 100],
+            'numeric_col': [22, 20, 5000, 10],
+        })], ignore_index=True)
+        
+        with patch('src.services.cleaning.STORAGE_CLEANED', temp_dir), \
+                patch('src.services.cleaning.CLEANING_INCREMENTAL', True):
+            cleaning('v1', sample_dataframe.copy(), mock_event_emitter)
+            expected_df = cleaning('full', appended.copy(), mock_event_emitter)
+            with patch('src.services.cleaning.clean_text_column', wraps=clean_text_column) as clean_mock:
+                result_df = cleaning('v2', appended.copy(), mock_event_emitter,
+                                     previous_cleaned_path=os.path.join(temp_dir, 'v1.csv'))
+        
+        # Only the three rows not seen in v1 have their text cleaned
+        assert len(clean_mock.call_args[0][0]) == 3
+        assert result_df['id'].tolist() == expected_df['id'].tolist()
+        assert result_df['full_text'].tolist() == expected_df['full_text'].tolist()
+        payload = mock_event_emitter.call_args[0][2]
+        assert payload['reused_rows'] == 5
+        assert payload['duplicates_removed'] == 1
+        assert payload['outliers_removed'] == 2
+        assert os.path.exists(os.path.join(temp_dir, 'v2.csv.index.npz'))
+    
+    def test_incremental_cleaning_ignores_stale_index(self, temp_dir, sample_dataframe, mock_event_emitter,
+                                                      mock_db_adapter):
+        """Test that an index written under other cleaning rules is not reused."""
+        mock_db_adapter.find_one.return_value = {
+            'data': {'previous_file_id': 'v1', 'cleaning_rules': {'preserve_mentions': False}}
+        }
+        
+        with patch('src.services.cleaning.STORAGE_CLEANED', temp_dir), \
+                patch('src.services.cleaning.CLEANING_INCREMENTAL', True):
+            cleaning('v1', sample_dataframe.copy(), mock_event_emitter)
+            result_df = cleaning('v2', sample_dataframe.copy(), mock_event_emitter, mock_db_adapter)
+        
+        assert 'Test username message' in result_df['full_text'].tolist()
+        assert mock_event_emitter.call_args[0][2]['reused_rows'] == 0
+    
+    def test_incremental_cleaning_skips_projected_frames(self, temp_dir, sample_dataframe, mock_event_emitter):
+        """Test that projected rows are not reused, since their source positions change between versions."""
+        shifted = pd.concat([pd.DataFrame({
+            'id': [0], 'full_text': ['Inserted first'], 'user_id': [50], 'numeric_col': [15],
+        }), sample_dataframe], ignore_index=True)
+        shifted.index.name = SOURCE_ROW_COLUMN
+        
+        with patch('src.services.cleaning.STORAGE_CLEANED', temp_dir), \
+                patch('src.services.cleaning.CLEANING_INCREMENTAL', True):
+            cleaning('v1', sample_dataframe.copy(), mock_event_emitter)
+            result_df = cleaning('v2', shifted.copy(), mock_event_emitter,
+                                 previous_cleaned_path=os.path.join(temp_dir, 'v1.csv'))
+        
+        assert mock_event_emitter.call_args[0][2]['reused_rows'] == 0
+        assert dict(zip(result_df['id'], result_df.index)) == {0: 0, 1: 1, 2: 2, 3: 3, 5: 5}
+        assert not os.path.exists(os.path.join(temp_dir, 'v2.csv.index.npz'))
+
 
+
+class TestCleaningChunks:
+    """Test cases for cleaning_chunks function."""
+    
+    @pytest.fixture
+    def temp_dir(self):
+        """Create temporary directory for test files."""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+    
+    @pytest.fixture
+    def sample_dataframe(self):
+        """Create sample DataFrame with duplicates across chunks and an outlier."""
+        return pd.DataFrame({
+            'id': [1, 2, 3, 1, 5, 6],
+            'full_text': [
+                'Hello 😀 world',
+                'Test @username message',
+                'Another test 🎉',
+                'Hello 😀 world',  # Duplicate of row 0, in another chunk
+                'Normal text here',
+                'Last one'
+            ],
+            'user_id': [100, 200, 300, 100, 400, 500],
+            'numeric_col': [10, 20, 30, 10, 1000, 25]  # 1000 is an outlier
+        })
+    
+    def test_cleaning_chunks_matches_cleaning(self, temp_dir, sample_dataframe):
+        """Test that streaming cleaning gives the same rows as in-memory cleaning."""
+        with patch('src.services.cleaning.STORAGE_CLEANED', temp_dir):
+            expected = cleaning('expected', sample_dataframe.copy(), Mock())
+            
+            chunks = [sample_dataframe.iloc[i:i + 2].copy() for i in range(0, 6, 2)]
+            result_chunks, total_rows = cleaning_chunks('test_file_123', chunks, Mock())
+            result = pd.concat(list(result_chunks), ignore_index=True)
+        
+        assert total_rows == len(expected)
+        pd.testing.assert_frame_equal(result, expected.reset_index(drop=True), check_dtype=False)
+    
+    def test_cleaning_chunks_saves_file_and_reports(self, temp_dir, sample_dataframe):
+        """Test that streaming cleaning writes the cleaned file and emits stats."""
+        mock_event_emitter = Mock()
+        with patch('src.services.cleaning.STORAGE_CLEANED', temp_dir):
+            chunks = [sample_dataframe.iloc[i:i + 4].copy() for i in range(0, 6, 4)]
+            cleaning_chunks('test_file_123', chunks, mock_event_emitter)
+        
+        assert os.path.exists(os.path.join(temp_dir, 'test_file_123.csv'))
+        assert not os.path.exists(os.path.join(temp_dir, 'test_file_123.csv.part'))
+        
+        done_payload = mock_event_emitter.call_args_list[-1][0][2]
+        assert done_payload['initial_rows'] == 6
+        assert done_payload['duplicates_removed'] == 1
+        assert done_payload['outliers_removed'] == 1
+        assert done_payload['text_cache_hit_ratio'] == round(1 - 5 / 6, 4)  # Row 3 repeats row 0
+        assert done_payload['final_rows'] == 4
+    
+    def test_cleaning_chunks_dedupes_on_key_columns(self, temp_dir, sample_dataframe):
+        """Test that DEDUPE_KEY_COLUMNS restricts the columns identifying a duplicate."""
+        df = sample_dataframe.copy()
+        df.loc[5, 'full_text'] = 'Test @username message'  # Same text as row 1, different id
+        chunks = [df.iloc[:3].copy(), df.iloc[3:].copy()]
+        
+        with patch('src.services.cleaning.STORAGE_CLEANED', temp_dir), \
+             patch('src.services.cleaning.DEDUPE_KEY_COLUMNS', ['full_text']):
+            cleaned, _ = cleaning_chunks('test_file_123', iter(chunks), Mock())
+            result = pd.concat(list(cleaned), ignore_index=True)
+        
+        assert result['full_text'].tolist().count('Test @username message') == 1
+        assert result['id'].tolist() == [1, 2, 3]
+    
+    def test_cleaning_chunks_handles_empty_stream(self, temp_dir):
+        """Test streaming cleaning with no chunks."""
+        with patch('src.services.cleaning.STORAGE_CLEANED', temp_dir):
+            result_chunks, total_rows = cleaning_chunks('test_file_123', [], Mock())
+            assert list(result_chunks) == []
+            assert total_rows == 0
@@ -0,0 +1,91 @@
+"""Unit tests for cleaning rules."""
+import pytest
+import json
+import os
+import tempfile
+from unittest.mock import Mock
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.utils.cleaning_rules import (
+    DEFAULT_CLEANING_RULES, HASHTAGS_REMOVE, normalize_cleaning_rules, load_cleaning_rules,
+    get_cleaning_rule_set, get_task_cleaning_rule_set
+)
+
+
+class TestNormalizeCleaningRules:
+    """Test cases for normalize_cleaning_rules function."""
+    
+    def test_defaults(self):
+        """Test that missing rules take their default value."""
+        assert normalize_cleaning_rules() == DEFAULT_CLEANING_RULES
+        assert normalize_cleaning_rules({'strip_urls': True})['strip_urls'] is True
+    
+    def test_unknown_rule(self):
+        """Test that unknown rules are rejected."""
+        with pytest.raises(ValueError):
+            normalize_cleaning_rules({'strip_emails': True})
+    
+    def test_invalid_hashtags_rule(self):
+        """Test that an invalid hashtags rule is rejected."""
+        with pytest.raises(ValueError):
+            normalize_cleaning_rules({'hashtags': 'upper'})
+
+
+class TestLoadCleaningRules:
+    """Test cases for load_cleaning_rules function."""
+    
+    def test_empty(self):
+        """Test that an empty setting loads no rules."""
+        assert load_cleaning_rules('') == {}
+    
+    def test_inline_json(self):
+        """Test loading rules from inline JSON."""
+        assert load_cleaning_rules('{"strip_urls": true}') == {'strip_urls': True}
+    
+    def test_json_file(self):
+        """Test loading rules from a JSON file."""
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({'hashtags': HASHTAGS_REMOVE}, f)
+        try:
+            assert load_cleaning_rules(f.name) == {'hashtags': HASHTAGS_REMOVE}
+        finally:
+            os.unlink(f.name)
+
+
+class TestGetCleaningRuleSet:
+    """Test cases for compiled rule sets."""
+    
+    def test_rule_sets_are_cached(self):
+        """Test that equal rules share one compiled rule set."""
+        first = get_cleaning_rule_set({'strip_urls': True})
+        second = get_cleaning_rule_set({'strip_urls': True})
+        
+        assert first is second
+        assert first is not get_cleaning_rule_set()
+        assert first.fingerprint != get_cleaning_rule_set().fingerprint
+    
+    def test_default_rule_set(self):
+        """Test that the default rules are flagged as default and have no pattern."""
+        rule_set = get_cleaning_rule_set()
+        assert rule_set.is_default
+        assert rule_set.pattern is None
+    
+    def test_task_rules(self):
+        """Test that a task's cleaning rules are read from its document."""
+        db_adapter = Mock()
+        db_adapter.find_one.return_value = {'data': {'cleaning_rules': {'strip_urls': True}}}
+        
+        rule_set = get_task_cleaning_rule_set('file_1', db_adapter)
+        
+        assert rule_set is get_cleaning_rule_set({'strip_urls': True})
+        db_adapter.find_one.assert_called_once_with('tasks', {'data.file_id': 'file_1'})
+    
+    def test_task_without_rules(self):
+        """Test that tasks without rules use the global rules."""
+        db_adapter = Mock()
+        db_adapter.find_one.side_effect = Exception('unavailable')
+        
+        assert get_task_cleaning_rule_set('file_1', db_adapter) is get_cleaning_rule_set()
+        assert get_task_cleaning_rule_set('file_1') is get_cleaning_rule_set()
@@ -0,0 +1,301 @@
+"""Unit tests for dataset_io helpers."""
+import pytest
+import pandas as pd
+import os
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.utils.dataset_io import (
+    SOURCE_ROW_COLUMN, read_csv, iter_csv_chunks, write_csv, write_csv_chunks,
+    resolve_csv_engine, infer_projection, merge_passthrough_columns, merge_passthrough_chunks,
+    detect_format,
+    dtype_manifest_path, read_dtype_manifest, merge_dtype_manifests, use_memory_map,
+    arrow_text_dtype, to_arrow_strings, checkpoint_path, write_checkpoint, read_checkpoint,
+    read_intermediate, iter_dataset_chunks
+)
+
+
+@pytest.fixture
+def sample_csv_file(tmp_path):
+    """Create a sample CSV file for testing."""
+    file_path = os.path.join(tmp_path, 'test_file_123.csv')
+    pd.DataFrame({
+        'id': range(10),
+        'full_text': [f'Text {i}' for i in range(10)],
+        'retweet_count': [float(i) for i in range(10)],
+    }).to_csv(file_path, index=False)
+    return file_path
+
+
+class TestReadCsv:
+    """Test cases for read_csv function."""
+    
+    def test_engines_read_same_values(self, sample_csv_file):
+        """Test that both engines return the same data."""
+        c_df = read_csv(sample_csv_file, 'c')
+        arrow_df = read_csv(sample_csv_file, 'pyarrow')
+        
+        pd.testing.assert_frame_equal(c_df, arrow_df, check_dtype=False)
+    
+    def test_pyarrow_engine_uses_arrow_dtypes(self, sample_csv_file):
+        """Test that the pyarrow engine returns Arrow-backed columns."""
+        df = read_csv(sample_csv_file, 'pyarrow')
+        assert all(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+    
+    def test_memory_map_skips_compressed_files(self, sample_csv_file, tmp_path):
+        """Test that only uncompressed files are memory-mapped."""
+        compressed = os.path.join(tmp_path, 'data.csv.gz')
+        pd.DataFrame({'id': [1]}).to_csv(compressed, index=False, compression='gzip')
+        
+        assert use_memory_map(sample_csv_file, True)
+        assert not use_memory_map(compressed, True)
+        assert not use_memory_map(sample_csv_file, False)
+    
+    def test_unknown_engine_raises(self):
+        """Test that an unknown engine is rejected."""
+        with pytest.raises(ValueError):
+            resolve_csv_engine('python')
+
+
+class TestIterCsvChunks:
+    """Test cases for iter_csv_chunks function."""
+    
+    @pytest.mark.parametrize('engine', ['c', 'pyarrow'])
+    def test_chunk_sizes(self, sample_csv_file, engine):
+        """Test that both engines yield chunks of the requested size."""
+        chunks = list(iter_csv_chunks(sample_csv_file, 4, engine))
+        
+        assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+        assert list(chunks[1].index) == [4, 5, 6, 7]
+    
+    def test_empty_file(self, tmp_path):
+        """Test that an empty file yields no chunks."""
+        file_path = os.path.join(tmp_path, 'empty.csv')
+        open(file_path, 'w').close()
+        assert list(iter_csv_chunks(file_path, 4)) == []
+    
+    def test_write_round_trip(self, sample_csv_file, tmp_path):
+        """Test that written chunks read back as the original file."""
+        out_path = os.path.join(tmp_path, 'out.csv')
+        rows = write_csv_chunks(out_path, iter_csv_chunks(sample_csv_file, 3))
+        
+        assert rows == 10
+        pd.testing.assert_frame_equal(pd.read_csv(out_path), pd.read_csv(sample_csv_file))
+
+
+class TestDtypeManifest:
+    """Test cases for the dtype manifest of intermediate CSV files."""
+    
+    @pytest.fixture
+    def typed_df(self):
+        """DataFrame whose dtypes differ from what inference would pick."""
+        return pd.DataFrame({
+            'id': pd.array([1, None, 3], dtype='Int64'),
+            'user_id': ['007', '008', '009'],
+            'retweet_count': [1.0, 2.0, 3.0],
+        })
+    
+    @pytest.mark.parametrize('engine', ['c', 'pyarrow'])
+    def test_round_trip_keeps_dtypes(self, typed_df, tmp_path, engine):
+        """Test that read_csv uses the manifest instead of type inference."""
+        path = os.path.join(tmp_path, 'cleaned.csv')
+        write_csv(typed_df, path)
+        
+        df = read_csv(path, engine)
+        
+        assert read_dtype_manifest(path) == {'id': 'Int64', 'user_id': 'str', 'retweet_count': 'float64'}
+        assert pd.api.types.is_integer_dtype(df['id'])
+        assert df['id'].isna().tolist() == [False, True, False]
+        assert df['user_id'].tolist() == ['007', '008', '009']
+    
+    @pytest.mark.parametrize('engine', ['c', 'pyarrow'])
+    def test_chunks_use_manifest(self, typed_df, tmp_path, engine):
+        """Test that iter_csv_chunks applies the manifest to every chunk."""
+        path = os.path.join(tmp_path, 'cleaned.csv')
+        write_csv(typed_df, path)
+        
+        chunks = list(iter_csv_chunks(path, 2, engine))
+        
+        assert [chunk['user_id'].astype(str).tolist() for chunk in chunks] == [['007', '008'], ['009']]
+        assert all(pd.api.types.is_integer_dtype(chunk['id']) for chunk in chunks)
+    
+    def test_write_csv_chunks_merges_numeric_dtypes(self, tmp_path):
+        """Test that int and float chunks are widened to float64."""
+        path = os.path.join(tmp_path, 'analysed.csv')
+        write_csv_chunks(path, [
+            pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']}),
+            pd.DataFrame({'a': [None, 4.5], 'b': ['z', 'w']}),
+        ])
+        
+        assert read_dtype_manifest(path) == {'a': 'float64', 'b': 'str'}
+    
+    def test_write_csv_chunks_aligns_columns_on_header(self, tmp_path):
+        """Test that chunks with reordered or missing columns follow the first header."""
+        path = os.path.join(tmp_path, 'analysed.csv')
+        write_csv_chunks(path, [
+            pd.DataFrame({'a': [1], 'b': ['x'], 'c': [True]}),
+            pd.DataFrame({'b': ['y'], 'a': [2]}),
+        ])
+        
+        df = pd.read_csv(path)
+        assert list(df.columns) == ['a', 'b', 'c']
+        assert df['b'].tolist() == ['x', 'y']
+        assert df['c'].isna().tolist() == [False, True]
+    
+    def test_merge_drops_conflicting_dtypes(self):
+        """Test that non-numeric conflicts fall back to inference."""
+        merged = merge_dtype_manifests({'a': 'int64', 'b': 'str'}, {'a': 'int64', 'b': 'bool'})
+        assert merged == {'a': 'int64'}
+    
+    def test_stale_manifest_is_ignored(self, typed_df, tmp_path):
+        """Test that a manifest not matching the header is not applied."""
+        path = os.path.join(tmp_path, 'cleaned.csv')
+        write_csv(typed_df, path)
+        pd.DataFrame({'other': ['1']}).to_csv(path, index=False)
+        
+        df = read_csv(path)
+        
+        assert list(df.columns) == ['other']
+        assert os.path.exists(dtype_manifest_path(path))
+
+
+class TestArrowStrings:
+    """Test cases for to_arrow_strings function."""
+    
+    def test_converts_text_columns_only(self):
+        """Test that text columns become Arrow-backed and other columns are kept."""
+        df = pd.DataFrame({
+            'id': [1, 2],
+            'full_text': pd.Series(['a', None], dtype=object),
+            'mixed': pd.Series([{'a': 1}, 'b'], dtype=object),
+        })
+        
+        df = to_arrow_strings(df)
+        
+        assert df['full_text'].dtype == arrow_text_dtype()
+        assert df['full_text'].isna().tolist() == [False, True]
+        assert df['id'].dtype == 'int64'
+        assert df['mixed'].dtype == object
+
+
+class TestProjection:
+    """Test cases for column projection helpers."""
+    
+    @pytest.fixture
+    def wide_csv_file(self, tmp_path):
+        """Create a CSV file with metadata columns the pipeline does not need."""
+        file_path = os.path.join(tmp_path, 'wide.csv')
+        pd.DataFrame({
+            'id': [1, 2, 3, 4],
+            'user_name': ['a', 'b', 'c', 'd'],
+            'full_text': ['t1', 't2', 't3', 't4'],
+            'user_bio': ['x', 'y', 'z', 'w'],
+            'retweet_count': [1, 2, 3, 4],
+        }).to_csv(file_path, index=False)
+        return file_path
+    
+    def test_infer_projection_keeps_required_and_numeric(self, wide_csv_file):
+        """Test that text metadata columns are left out of the projection."""
+        columns = infer_projection(wide_csv_file, ['id', 'full_text'], 100)
+        assert columns == ['id', 'full_text', 'retweet_count']
+    
+    def test_merge_passthrough_columns_by_position(self, wide_csv_file):
+        """Test that skipped columns are joined back on the kept rows."""
+        df = read_csv(wide_csv_file, usecols=['id', 'full_text', 'retweet_count'])
+        df.index.name = SOURCE_ROW_COLUMN
+        df = df.iloc[[0, 2, 3]].copy()
+        df['sentiment'] = ['positive', 'neutral', 'negative']
+        
+        merged = merge_passthrough_columns(df, wide_csv_file)
+        
+        assert list(merged.columns) == ['id', 'user_name', 'full_text', 'user_bio',
+                                        'retweet_count', 'sentiment']
+        assert list(merged['user_name']) == ['a', 'c', 'd']
+        assert list(merged['id']) == [1, 3, 4]
+    
+    @pytest.mark.parametrize('engine', ['c', 'pyarrow'])
+    def test_merge_passthrough_chunks_by_position(self, wide_csv_file, tmp_path, engine):
+        """Test that skipped columns are joined back on the kept rows of a projected stream."""
+        chunks = iter_dataset_chunks(wide_csv_file, 2, engine, usecols=['id', 'full_text'])
+        kept = []
+        for chunk in chunks:
+            chunk.index.name = SOURCE_ROW_COLUMN
+            kept.append(chunk[chunk['id'] != 2])
+        staged = os.path.join(tmp_path, 'staged.csv')
+        write_csv_chunks(staged, kept)
+        
+        merged = pd.concat(merge_passthrough_chunks(iter_csv_chunks(staged, 2, engine), wide_csv_file, engine),
+                           ignore_index=True)
+        
+        assert list(merged.columns) == ['id', 'user_name', 'full_text', 'user_bio', 'retweet_count']
+        assert list(merged['user_name']) == ['a', 'c', 'd']
+        assert list(merged['user_bio']) == ['x', 'z', 'w']
+    
+    def test_write_csv_keeps_source_rows(self, tmp_path):
+        """Test that source row positions survive a CSV round trip."""
+        df = pd.DataFrame({'id': [5, 6]}, index=pd.Index([3, 7], name=SOURCE_ROW_COLUMN))
+        file_path = os.path.join(tmp_path, 'projected.csv')
+        
+        write_csv(df, file_path)
+        
+        assert list(read_csv(file_path).index) == [3, 7]
+
+
+class TestDetectFormat:
+    """Test cases for detect_format function."""
+    
+    def test_detects_by_extension(self):
+        """Test format detection for files that do not exist yet."""
+        assert detect_format('/data/file.csv') == 'csv'
+        assert detect_format('/data/file.parquet') == 'parquet'
+        assert detect_format('/data/file.feather') == 'feather'
+        assert detect_format('/data/file.arrows') == 'arrow_stream'
+    
+    def test_detects_by_magic_bytes(self, tmp_path):
+        """Test that content wins over a missing or misleading extension."""
+        file_path = os.path.join(tmp_path, 'export.bin')
+        pd.DataFrame({'id': [1]}).to_parquet(file_path)
+        assert detect_format(file_path) == 'parquet'
+
+
+class TestCheckpoint:
+    """Test cases for columnar checkpoints."""
+    
+    @pytest.fixture
+    def projected_df(self):
+        """Create a projected DataFrame indexed by source row."""
+        return pd.DataFrame({
+            'id': [5, 6, 7],
+            'full_text': ['a', None, 'c'],
+            'score': [0.5, 1.5, 2.5],
+        }, index=pd.Index([3, 7, 8], name=SOURCE_ROW_COLUMN))
+    
+    def test_checkpoint_path(self):
+        """Test that the checkpoint replaces the CSV extension, or is disabled."""
+        assert checkpoint_path('/data/cleaned/f.csv', 'feather') == '/data/cleaned/f.feather'
+        assert checkpoint_path('/data/cleaned/f.csv', 'parquet') == '/data/cleaned/f.parquet'
+        assert checkpoint_path('/data/cleaned/f.csv', 'none') is None
+    
+    @pytest.mark.parametrize('fmt', ['feather', 'parquet'])
+    def test_round_trip_keeps_dtypes_and_source_rows(self, projected_df, tmp_path, fmt):
+        """Test that a checkpoint restores values, dtypes and source row positions."""
+        file_path = checkpoint_path(os.path.join(tmp_path, 'f.csv'), fmt)
+        
+        write_checkpoint(projected_df, file_path)
+        result = read_checkpoint(file_path)
+        
+        pd.testing.assert_frame_equal(result, projected_df)
+        chunks = list(iter_dataset_chunks(file_path, 2))
+        assert [list(chunk.index) for chunk in chunks] == [[3, 7], [8]]
+    
+    def test_read_intermediate_prefers_checkpoint(self, projected_df, tmp_path):
+        """Test that the checkpoint is read when present, else the CSV."""
+        csv_path = os.path.join(tmp_path, 'f.csv')
+        assert read_intermediate(csv_path) is None
+        
+        write_csv(projected_df.iloc[:1], csv_path)
+        assert len(read_intermediate(csv_path)) == 1
+        
+        write_checkpoint(projected_df, checkpoint_path(csv_path))
+        assert len(read_intermediate(csv_path)) == 3
@@ -0,0 +1,76 @@
+"""Unit tests for dedupe helpers."""
+import pytest
+import pandas as pd
+import numpy as np
+import os
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.utils.dedupe import HashSeenSet, row_hashes
+
+
+class TestRowHashes:
+    """Test cases for row_hashes function."""
+    
+    def test_equal_rows_have_equal_hashes(self):
+        """Test that identical rows hash to the same 64-bit value."""
+        df = pd.DataFrame({'id': [1, 2, 1], 'full_text': ['a', 'b', 'a']})
+        
+        hashes = row_hashes(df)
+        
+        assert hashes.dtype == np.uint64
+        assert hashes[0] == hashes[2]
+        assert hashes[0] != hashes[1]
+    
+    def test_key_columns(self):
+        """Test that only the key columns identify duplicates, ignoring missing ones."""
+        df = pd.DataFrame({'id': [1, 2], 'full_text': ['a', 'a']})
+        
+        assert row_hashes(df, ['full_text', 'missing'])[0] == row_hashes(df, ['full_text'])[1]
+        assert row_hashes(df, ['missing'])[0] != row_hashes(df, ['missing'])[1]
+
+
+class TestHashSeenSet:
+    """Test cases for HashSeenSet class."""
+    
+    def test_add_keeps_first_occurrences_across_calls(self):
+        """Test that duplicates are flagged within and across batches."""
+        seen = HashSeenSet()
+        
+        first = seen.add(np.array([5, 3, 5, 7], dtype=np.uint64))
+        second = seen.add(np.array([7, 1, 1, 3, 9], dtype=np.uint64))
+        
+        assert first.tolist() == [True, True, False, True]
+        assert second.tolist() == [False, True, False, False, True]
+        assert len(seen) == 5
+        assert seen.nbytes == 5 * 8
+    
+    def test_matches_python_set(self):
+        """Test against a Python set over many batches (exercising run merges)."""
+        rng = np.random.default_rng(0)
+        seen = HashSeenSet()
+        expected_seen = set()
+        
+        for _ in range(50):
+            hashes = rng.integers(0, 5000, rng.integers(0, 300), dtype=np.uint64)
+            expected = []
+            for value in hashes.tolist():
+                expected.append(value not in expected_seen)
+                expected_seen.add(value)
+            
+            assert seen.add(hashes).tolist() == expected
+        
+        assert len(seen) == len(expected_seen)
+        assert seen.contains(np.array(sorted(expected_seen), dtype=np.uint64)).all()
+    
+    def test_round_trip_through_array(self):
+        """Test that a set rebuilt from to_array() holds the same hashes."""
+        seen = HashSeenSet()
+        seen.add(np.array([9, 2, 2], dtype=np.uint64))
+        seen.add(np.array([4], dtype=np.uint64))
+        
+        restored = HashSeenSet.from_array(seen.to_array())
+        
+        assert seen.to_array().tolist() == [2, 4, 9]
+        assert restored.add(np.array([4, 5], dtype=np.uint64)).tolist() == [False, True]
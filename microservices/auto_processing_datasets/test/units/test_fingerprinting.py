@@ -0,0 +1,106 @@
+"""Unit tests for fingerprinting service."""
+import pytest
+import os
+from unittest.mock import Mock, patch
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.services.fingerprinting import fingerprinting, pipeline_fingerprint
+from src.utils.fingerprint import file_fingerprint, config_fingerprint
+from src.configs.constants import TASK_STATUS_DONE
+
+
+class TestFingerprint:
+    """Test cases for fingerprint helpers."""
+    
+    def test_file_fingerprint_depends_on_content_only(self, tmp_path):
+        """Test that identical files get the same fingerprint across block sizes."""
+        first = tmp_path / 'a.csv'
+        second = tmp_path / 'b.csv'
+        first.write_bytes(b'id,full_text\n1,hello\n')
+        second.write_bytes(b'id,full_text\n1,hello\n')
+        
+        assert file_fingerprint(str(first)) == file_fingerprint(str(second), block_size=3)
+        
+        second.write_bytes(b'id,full_text\n1,hellO\n')
+        assert file_fingerprint(str(first)) != file_fingerprint(str(second))
+    
+    def test_config_fingerprint_ignores_key_order(self):
+        """Test that key order does not change the configuration fingerprint."""
+        assert config_fingerprint({'a': 1, 'b': [1, 2]}) == config_fingerprint({'b': [1, 2], 'a': 1})
+        assert config_fingerprint({'a': 1}) != config_fingerprint({'a': 2})
+
+
+class TestFingerprinting:
+    """Test cases for fingerprinting function."""
+    
+    @pytest.fixture
+    def analysed_dir(self, tmp_path):
+        """Patch the analysed storage directory."""
+        analysed_dir = tmp_path / 'analysed'
+        analysed_dir.mkdir()
+        with patch('src.services.fingerprinting.STORAGE_ANALYSED', str(analysed_dir)):
+            yield analysed_dir
+    
+    @pytest.fixture
+    def dataset_file(self, tmp_path):
+        """Create a dataset file."""
+        file_path = tmp_path / 'new_file.csv'
+        file_path.write_text('id,full_text\n1,hello\n')
+        return str(file_path)
+    
+    def test_no_previous_task(self, analysed_dir, dataset_file):
+        """Test that fingerprints are stored and the pipeline runs."""
+        db_adapter = Mock()
+        db_adapter.find_one.return_value = None
+        event_emitter = Mock()
+        
+        assert fingerprinting('new_file', dataset_file, {}, event_emitter, db_adapter) is None
+        
+        update = db_adapter.update_one.call_args[0][2]
+        assert update['data.fingerprint'] == file_fingerprint(dataset_file)
+        assert update['data.ai_fingerprint'] == config_fingerprint({})
+        event_emitter.assert_not_called()
+    
+    def test_reuses_analysed_file(self, analysed_dir, dataset_file):
+        """Test that the analysed file of an identical dataset is copied and the task is done."""
+        (analysed_dir / 'old_file.csv').write_text('id,full_text,sentiment\n1,hello,positive\n')
+        db_adapter = Mock()
+        db_adapter.find_one.return_value = {'data': {'file_id': 'old_file', 'status': TASK_STATUS_DONE}}
+        event_emitter = Mock()
+        
+        analysed_path = fingerprinting('new_file', dataset_file, {}, event_emitter, db_adapter)
+        
+        assert analysed_path == str(analysed_dir / 'new_file.csv')
+        assert not os.path.samefile(analysed_path, analysed_dir / 'old_file.csv')
+        assert open(analysed_path).read() == (analysed_dir / 'old_file.csv').read_text()
+        query = db_adapter.find_one.call_args[0][1]
+        assert query['data.status'] == TASK_STATUS_DONE
+        assert query['data.file_id'] == {'$ne': 'new_file'}
+        update = db_adapter.update_one.call_args[0][2]
+        assert update['data.status'] == TASK_STATUS_DONE
+        assert update['data.reused_from'] == 'old_file'
+        event_emitter.assert_called_once_with('new_file', TASK_STATUS_DONE)
+    
+    def test_missing_analysed_file(self, analysed_dir, dataset_file):
+        """Test that the pipeline runs when the previous analysed file is gone."""
+        db_adapter = Mock()
+        db_adapter.find_one.return_value = {'data': {'file_id': 'old_file', 'status': TASK_STATUS_DONE}}
+        
+        assert fingerprinting('new_file', dataset_file, {}, Mock(), db_adapter) is None
+    
+    def test_pipeline_settings_are_matched(self, analysed_dir, dataset_file):
+        """Test that the prompt version and output-changing settings are part of the reuse key."""
+        db_adapter = Mock()
+        db_adapter.find_one.return_value = None
+        
+        fingerprinting('new_file', dataset_file, {}, Mock(), db_adapter)
+        
+        settings_fingerprint = pipeline_fingerprint()
+        assert db_adapter.update_one.call_args[0][2]['data.pipeline_fingerprint'] == settings_fingerprint
+        assert db_adapter.find_one.call_args[0][1]['data.pipeline_fingerprint'] == settings_fingerprint
+        with patch('src.services.fingerprinting.OUTLIER_MODE', 'single_pass'):
+            assert pipeline_fingerprint() != settings_fingerprint
+        with patch('src.services.fingerprinting.LLM_PROMPT_VERSION', 'next'):
+            assert pipeline_fingerprint() != settings_fingerprint
@@ -8,7 +8,7 @@ from pathlib import Path
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
 
-from src.utils.helpers import ensure_directory_exists, get_file_id_from_path
+from src.utils.helpers import ensure_directory_exists, get_file_id_from_path, copy_file
 
 
 class TestEnsureDirectoryExists:
@@ -99,4 +99,37 @@ class TestGetFileIdFromPath:
         file_path = 'file_123.csv'
         file_id = get_file_id_from_path(file_path)
         assert file_id == 'file_123'
+    
+    def test_strips_compression_suffix(self):
+        """Test extracting file ID from a compressed dataset path."""
+        assert get_file_id_from_path('/storage/datasets/file_123.csv.gz') == 'file_123'
+        assert get_file_id_from_path('/storage/datasets/file_123.csv.zst') == 'file_123'
+
 
+class TestCopyFile:
+    """Test cases for copy_file function."""
+    
+    def test_copies_over_target(self, tmp_path):
+        """Test that the target is replaced by an independent copy of the source."""
+        source = tmp_path / 'source.csv'
+        source.write_text('id\n1\n')
+        target = tmp_path / 'target.csv'
+        target.write_text('stale')
+        
+        copy_file(str(source), str(target))
+        
+        assert target.read_text() == 'id\n1\n'
+        assert not os.path.samefile(source, target)
+        assert sorted(path.name for path in tmp_path.iterdir()) == ['source.csv', 'target.csv']
+    
+    def test_later_writes_do_not_change_source(self, tmp_path):
+        """Test that rewriting the copy in place leaves the source untouched."""
+        source = tmp_path / 'source.csv'
+        source.write_text('id\n1\n')
+        target = tmp_path / 'target.csv'
+        
+        copy_file(str(source), str(target))
+        with open(target, 'w') as f:
+            f.write('id\n2\n')
+        
+        assert source.read_text() == 'id\n1\n'
@@ -0,0 +1,86 @@
+"""Unit tests for the pooled LLM HTTP sessions."""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.utils.http_pool import (
+    close_sessions,
+    connection_metrics,
+    connection_metrics_delta,
+    endpoint_origin,
+    get_session,
+)
+
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible endpoint answering every request on a keep-alive connection."""
+    protocol_version = 'HTTP/1.1'
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        body = json.dumps({'choices': [{'message': {'content': '{"data": {}}'}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpPool:
+    """Test cases for the pooled sessions and their connection metrics."""
+    
+    @pytest.fixture
+    def server_url(self):
+        """Start a local keep-alive HTTP server."""
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _ChatHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        close_sessions()
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        close_sessions()
+        server.shutdown()
+        server.server_close()
+    
+    def test_endpoint_origin(self):
+        """Test that paths are dropped from the pool key."""
+        assert endpoint_origin('https://API.example.com/v1/chat/completions') == 'https://api.example.com'
+        assert endpoint_origin('http://localhost:11434/v1') == 'http://localhost:11434'
+    
+    def test_sessions_are_shared_per_origin(self, server_url):
+        """Test that endpoints of the same origin share one session."""
+        session = get_session(f"{server_url}/v1/chat/completions")
+        
+        assert get_session(f"{server_url}/other") is session
+        assert get_session('http://127.0.0.2:1/v1') is not session
+    
+    def test_connections_are_reused(self, server_url):
+        """Test that sequential requests reuse one keep-alive connection."""
+        endpoint = f"{server_url}/v1/chat/completions"
+        before = connection_metrics()
+        
+        for _ in range(3):
+            response = get_session(endpoint).post(endpoint, json={'model': 'llama3'}, timeout=5)
+            assert response.status_code == 200
+        
+        metrics = connection_metrics()[endpoint_origin(endpoint)]
+        assert metrics == {'requests': 3, 'new_connections': 1, 'reused_connections': 2, 'tls_handshakes': 0}
+        assert connection_metrics_delta(before) == metrics
+        assert connection_metrics_delta(connection_metrics())['requests'] == 0
+    
+    def test_close_sessions(self, server_url):
+        """Test that closed sessions are replaced on next use."""
+        session = get_session(server_url)
+        
+        close_sessions()
+        
+        assert connection_metrics() == {}
+        assert get_session(server_url) is not session
@@ -0,0 +1,86 @@
+"""Unit tests for the persistent LLM label cache."""
+import time
+
+import pytest
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.utils.llm_cache import LlmLabelCache, llm_cache_key
+
+
+class TestLlmLabelCache:
+    """Test cases for LlmLabelCache."""
+    
+    @pytest.fixture
+    def cache_path(self, tmp_path):
+        """Path of a fresh cache database."""
+        return str(tmp_path / 'cache' / 'llm_cache.sqlite3')
+    
+    def test_key_depends_on_text_model_and_prompt(self):
+        """Test that the key changes with the text, the model and the prompt version."""
+        key = llm_cache_key('panne fibre', 'llama3', '1')
+        
+        assert key == llm_cache_key('panne fibre', 'llama3', '1')
+        assert len(key) == 16
+        assert key != llm_cache_key('panne fibre!', 'llama3', '1')
+        assert key != llm_cache_key('panne fibre', 'mistral', '1')
+        assert key != llm_cache_key('panne fibre', 'llama3', '2')
+    
+    def test_put_and_get(self, cache_path):
+        """Test that stored labels are found again after reopening the cache."""
+        cache = LlmLabelCache(cache_path)
+        keys = [cache.key('a', 'llama3'), cache.key('b', 'llama3')]
+        cache.put_many(keys, ['negative', 'positive'], [2, 0], ['network', 'billing'])
+        cache.close()
+        
+        cache = LlmLabelCache(cache_path)
+        found = cache.get_many(keys + [cache.key('c', 'llama3')])
+        
+        assert found == {keys[0]: ('negative', 2, 'network'), keys[1]: ('positive', 0, 'billing')}
+    
+    def test_invalid_labels_are_not_stored(self, cache_path):
+        """Test that labels which are not plain strings are skipped."""
+        cache = LlmLabelCache(cache_path)
+        key = cache.key('a', 'llama3')
+        
+        cache.put_many([key], [{'value': 'negative'}], [1], ['network'])
+        
+        assert len(cache) == 0
+    
+    def test_evicts_least_recently_used(self, cache_path):
+        """Test that the least recently used entries are evicted over the size bound."""
+        cache = LlmLabelCache(cache_path, max_entries=2)
+        first, second, third = (cache.key(text, 'llama3') for text in 'abc')
+        cache.put_many([first], ['neutral'], [1], ['a'])
+        time.sleep(0.01)
+        cache.put_many([second], ['neutral'], [1], ['b'])
+        time.sleep(0.01)
+        cache.get_many([first])
+        time.sleep(0.01)
+        
+        cache.put_many([third], ['neutral'], [1], ['c'])
+        
+        assert len(cache) == 2
+        assert set(cache.get_many([first, second, third])) == {first, third}
+    
+    def test_prompt_version_change_invalidates_entries(self, cache_path):
+        """Test that entries of a previous prompt version are dropped."""
+        cache = LlmLabelCache(cache_path, prompt_version='1')
+        cache.put_many([cache.key('a', 'llama3')], ['neutral'], [1], ['a'])
+        cache.close()
+        
+        cache = LlmLabelCache(cache_path, prompt_version='2')
+        
+        assert len(cache) == 0
+        assert cache.get_many([cache.key('a', 'llama3')]) == {}
+    
+    def test_clear(self, cache_path):
+        """Test that clear() empties the cache."""
+        cache = LlmLabelCache(cache_path)
+        cache.put_many([cache.key('a', 'llama3')], ['neutral'], [1], ['a'])
+        
+        cache.clear()
+        
+        assert len(cache) == 0
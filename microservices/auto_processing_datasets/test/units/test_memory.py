@@ -0,0 +1,45 @@
+"""Unit tests for memory helpers."""
+import pytest
+import numpy as np
+import os
+from unittest.mock import patch
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.utils.memory import StagePeakRss, peak_rss, reset_peak_rss
+
+
+class TestStagePeakRss:
+    """Test cases for StagePeakRss class."""
+    
+    def test_records_each_stage(self):
+        """Test that every stage gets a positive peak."""
+        stage_rss = StagePeakRss()
+        stage_rss.record('first')
+        stage_rss.record('second')
+        
+        assert list(stage_rss.peaks) == ['first', 'second']
+        assert all(peak > 0 for peak in stage_rss.peaks.values())
+    
+    def test_peak_is_reset_between_stages(self):
+        """Test that a large allocation only counts in the stage that made it."""
+        if not reset_peak_rss():
+            pytest.skip('Peak RSS cannot be reset on this platform')
+        stage_rss = StagePeakRss()
+        
+        block = np.ones(32 * 2 ** 20 // 8)
+        del block
+        stage_rss.record('allocate')
+        stage_rss.record('idle')
+        
+        assert stage_rss.peaks['allocate'] - stage_rss.peaks['idle'] >= 16 * 2 ** 20
+        assert peak_rss() > 0
+    
+    def test_peak_rss_without_resource_module(self):
+        """Test that platforms without the resource module (Windows) report 0."""
+        with patch('src.utils.memory.resource', None), patch('src.utils.memory._status_bytes', return_value=0):
+            stage_rss = StagePeakRss()
+            
+            assert peak_rss() == 0
+            assert stage_rss.record('stage') == 0
@@ -0,0 +1,96 @@
+"""Unit tests for near-duplicate helpers."""
+import pytest
+import numpy as np
+import os
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.utils.near_duplicates import lsh_bands, minhash_signatures, near_duplicate_groups
+
+
+def shingle_jaccard(a: str, b: str, size: int = 5) -> float:
+    """Exact Jaccard similarity of the character shingles of two texts."""
+    shingles_a = {a[i:i + size] for i in range(len(a) - size + 1)}
+    shingles_b = {b[i:i + size] for i in range(len(b) - size + 1)}
+    return len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+
+
+class TestLshBands:
+    """Test cases for lsh_bands function."""
+    
+    def test_bands_fit_signature(self):
+        """Test that the banding uses at most num_perm permutations and matches the threshold."""
+        bands, rows = lsh_bands(64, 0.8)
+        
+        assert bands * rows <= 64
+        assert abs((1 / bands) ** (1 / rows) - 0.8) < 0.05
+
+
+class TestMinhashSignatures:
+    """Test cases for minhash_signatures function."""
+    
+    def test_identical_texts_have_identical_signatures(self):
+        """Test that signatures only depend on the text, whatever its block."""
+        texts = ['la fibre est en panne', 'autre chose', 'la fibre est en panne', '', 'ab']
+        
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setattr('src.utils.near_duplicates.MINHASH_BLOCK_ROWS', 2)
+            signatures = minhash_signatures(texts, num_perm=32)
+        
+        assert signatures.shape == (5, 32)
+        assert (signatures[0] == signatures[2]).all()
+        assert (signatures == minhash_signatures(texts, num_perm=32)).all()
+    
+    def test_agreement_estimates_jaccard(self):
+        """Test that the share of equal signature entries estimates shingle Jaccard similarity."""
+        a = 'le reseau mobile ne fonctionne plus depuis ce matin dans tout le quartier'
+        b = 'le reseau mobile ne fonctionne plus depuis hier soir dans tout le quartier merci'
+        
+        signatures = minhash_signatures([a, b], num_perm=256)
+        
+        assert abs((signatures[0] == signatures[1]).mean() - shingle_jaccard(a, b)) < 0.1
+
+
+class TestNearDuplicateGroups:
+    """Test cases for near_duplicate_groups function."""
+    
+    def test_groups_similar_texts_under_first_occurrence(self):
+        """Test that near-duplicates point to the first text of their group."""
+        base = 'la fibre est en panne depuis ce matin dans tout le quartier, merci de corriger'
+        texts = [
+            'facture incorrecte ce mois-ci',
+            base,
+            base + ' @free',
+            'RT ' + base,
+            'rien a voir avec le reste du message',
+            'facture incorrecte ce mois-ci',
+        ]
+        
+        representatives = near_duplicate_groups(texts, threshold=0.8)
+        
+        assert representatives.tolist() == [0, 1, 1, 1, 4, 0]
+    
+    def test_chained_texts_need_similarity_with_representative(self):
+        """Test that A~B and B~C do not group C under A when A and C are dissimilar."""
+        segments = ['the network keeps dropping every evening ', 'support told me to restart the router ',
+                    'which did not fix anything at all so far ', 'now billing charged me twice this month ',
+                    'and nobody answers the phone anymore ok ']
+        texts = [''.join(segments[0:3]), ''.join(segments[1:4]), ''.join(segments[2:5])]
+        
+        representatives = near_duplicate_groups(texts, threshold=0.4)
+        
+        assert representatives.tolist() == [0, 0, 2]
+    
+    def test_distinct_texts_are_their_own_representatives(self):
+        """Test that unrelated texts are not grouped."""
+        rng = np.random.default_rng(0)
+        alphabet = np.array(list('abcdefghijklmnopqrstuvwxyz '))
+        texts = [''.join(rng.choice(alphabet, size=60)) for _ in range(200)]
+        
+        assert near_duplicate_groups(texts).tolist() == list(range(200))
+    
+    def test_small_inputs(self):
+        """Test empty and single-text inputs."""
+        assert near_duplicate_groups([]).tolist() == []
+        assert near_duplicate_groups(['only one']).tolist() == [0]
@@ -0,0 +1,104 @@
+"""Unit tests for profiling service."""
+import pytest
+import pandas as pd
+import os
+import tempfile
+import shutil
+from unittest.mock import Mock, patch
+
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.services.profiling import profiling, estimate_tokens
+from src.utils.tokens import TOKENS_PER_ROW_OVERHEAD
+from src.utils.dataset_io import count_csv_rows
+from src.configs.constants import EXECUTION_MODE_IN_MEMORY, EXECUTION_MODE_STREAMING
+
+
+class TestProfiling:
+    """Test cases for profiling function."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Create temporary directory for test files."""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def sample_csv_file(self, temp_dir):
+        """Create a sample CSV file with 100 rows of 40-character texts."""
+        file_path = os.path.join(temp_dir, 'test_file_123.csv')
+        df = pd.DataFrame({
+            'id': range(100),
+            'user_id': range(100, 200),
+            'full_text': ['x' * 40] * 100,
+        })
+        df.to_csv(file_path, index=False)
+        return file_path
+
+    @pytest.fixture
+    def mock_event_emitter(self):
+        """Create a mock event emitter."""
+        return Mock()
+
+    @pytest.fixture
+    def ai_config(self):
+        """AI configuration with a single model limited to 20 rows per request."""
+        return {
+            'preferences': {'mode': 'local'},
+            'local': [{'uid': 'model1', 'data': {'paginateRowsLimit': 20}}],
+        }
+
+    def test_profiling_estimates_dataset(self, sample_csv_file, mock_event_emitter, ai_config):
+        """Test that rows, text length and batches are estimated."""
+        profile = profiling(sample_csv_file, mock_event_emitter, ai_config)
+
+        assert profile['format'] == 'csv'
+        assert profile['estimated_rows'] == 100
+        assert profile['avg_text_chars'] == 40.0
+        assert profile['avg_text_tokens'] == estimate_tokens(40)
+        assert profile['llm_batch_rows'] == 20
+        assert profile['estimated_batches'] == 5
+        assert profile['execution_mode'] == EXECUTION_MODE_IN_MEMORY
+        mock_event_emitter.assert_not_called()
+
+    def test_profiling_records_profile_on_task(self, sample_csv_file, mock_event_emitter, ai_config):
+        """Test that the profile is stored on the task document."""
+        db_adapter = Mock()
+
+        profile = profiling(sample_csv_file, mock_event_emitter, ai_config, db_adapter)
+
+        db_adapter.update_one.assert_called_once()
+        args = db_adapter.update_one.call_args[0]
+        assert args[1] == {'data.file_id': 'test_file_123'}
+        assert args[2]['data.profile'] == profile
+
+    def test_profiling_token_budget_caps_batch_size(self, sample_csv_file, mock_event_emitter, ai_config):
+        """Test that the LLM batch size fits the token budget and the model's hard row cap."""
+        with patch('src.utils.tokens.LLM_BATCH_TOKEN_BUDGET', 500):
+            profile = profiling(sample_csv_file, mock_event_emitter, ai_config)
+
+        assert profile['llm_batch_rows'] == 500 // (estimate_tokens(40) + TOKENS_PER_ROW_OVERHEAD)
+        assert profile['llm_token_budget'] == 500
+
+        ai_config['local'][0]['data']['maxBatchRows'] = 50
+        with patch('src.utils.tokens.LLM_BATCH_TOKEN_BUDGET', 100000):
+            profile = profiling(sample_csv_file, mock_event_emitter, ai_config)
+
+        assert profile['llm_batch_rows'] == 50
+
+    def test_profiling_switches_to_streaming_over_budget(self, sample_csv_file, mock_event_emitter, ai_config):
+        """Test that datasets larger than the memory budget are streamed."""
+        with patch('src.services.profiling.STREAMING_MEMORY_BUDGET_BYTES', 1):
+            profile = profiling(sample_csv_file, mock_event_emitter, ai_config)
+
+        assert profile['execution_mode'] == EXECUTION_MODE_STREAMING
+
+    def test_count_csv_rows_without_trailing_newline(self, temp_dir):
+        """Test that the last row is counted without a trailing newline."""
+        file_path = os.path.join(temp_dir, 'rows.csv')
+        with open(file_path, 'w') as f:
+            f.write('id,full_text\n1,a\n2,b')
+
+        assert count_csv_rows(file_path, block_size=4) == 2
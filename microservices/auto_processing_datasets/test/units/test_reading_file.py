@@ -1,6 +1,7 @@
 """Unit tests for reading_file service."""
 import pytest
 import pandas as pd
+import pyarrow as pa
 import os
 import tempfile
 import shutil
@@ -9,7 +10,7 @@ from unittest.mock import Mock, patch
 import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
 
-from src.services.reading_file import reading_file
+from src.services.reading_file import reading_file, reading_file_chunks
 from src.configs.constants import (
     TASK_STATUS_READING_DATASET,
     TASK_STATUS_READING_DATASET_DONE,
@@ -101,4 +102,161 @@ class TestReadingFile:
         file_path = '/some/path/to/file_abc.csv'
         file_id, _ = reading_file(file_path, mock_event_emitter)
         assert file_id == 'file_abc'
+    
+    def test_reading_file_with_projection(self, sample_csv_file, mock_event_emitter):
+        """Test that a projection only loads the requested columns."""
+        _, df = reading_file(sample_csv_file, mock_event_emitter, columns=['id', 'full_text'])
+        
+        assert list(df.columns) == ['id', 'full_text']
+        assert df.index.name == '_source_row'
+        metadata = mock_event_emitter.call_args_list[-1][0][2]
+        assert metadata['columns'] == 2
+        assert metadata['source_columns'] == 3
+    
+    @pytest.mark.parametrize('extension', ['parquet', 'feather', 'arrows'])
+    def test_reading_file_columnar_formats(self, temp_dir, mock_event_emitter, extension):
+        """Test reading Parquet, Feather and Arrow IPC stream datasets."""
+        expected = pd.DataFrame({
+            'id': [1, 2, 3],
+            'full_text': ['Text 1', 'Text 2', 'Text 3'],
+            'user_id': [100, 200, 300]
+        })
+        file_path = os.path.join(temp_dir, f'test_file_123.{extension}')
+        if extension == 'parquet':
+            expected.to_parquet(file_path, index=False)
+        elif extension == 'feather':
+            expected.to_feather(file_path)
+        else:
+            table = pa.Table.from_pandas(expected, preserve_index=False)
+            with pa.ipc.new_stream(file_path, table.schema) as writer:
+                writer.write_table(table)
+        
+        file_id, df = reading_file(file_path, mock_event_emitter)
+        
+        assert file_id == 'test_file_123'
+        pd.testing.assert_frame_equal(df, expected)
+        metadata = mock_event_emitter.call_args_list[-1][0][2]
+        assert metadata == {'rows': 3, 'columns': 3}
+    
+    @pytest.mark.parametrize('codec,extension', [('gzip', 'gz'), ('bz2', 'bz2'), ('zstd', 'zst')])
+    def test_reading_file_compressed(self, temp_dir, mock_event_emitter, codec, extension):
+        """Test reading gzip, bz2 and zstd compressed CSV datasets."""
+        expected = pd.DataFrame({'id': [1, 2, 3], 'full_text': ['Text 1', 'Text 2', 'Text 3']})
+        file_path = os.path.join(temp_dir, f'test_file_123.csv.{extension}')
+        with pa.CompressedOutputStream(file_path, codec) as out:
+            out.write(expected.to_csv(index=False).encode('utf-8'))
+        
+        file_id, df = reading_file(file_path, mock_event_emitter)
+        
+        assert file_id == 'test_file_123'
+        pd.testing.assert_frame_equal(df, expected)
+    
+    def test_reading_file_arrow_strings(self, sample_csv_file, mock_event_emitter):
+        """Test that text columns are Arrow-backed when ARROW_STRINGS_ENABLED is set."""
+        with patch('src.services.reading_file.ARROW_STRINGS_ENABLED', True):
+            _, df = reading_file(sample_csv_file, mock_event_emitter)
+        
+        assert isinstance(df['full_text'].dtype, pd.ArrowDtype)
+        assert df['full_text'].tolist() == ['Text 1', 'Text 2', 'Text 3']
+    
+    @pytest.mark.parametrize('engine', ['c', 'pyarrow'])
+    def test_reading_file_memory_mapped(self, sample_csv_file, mock_event_emitter, engine):
+        """Test that memory-mapped reads return the same data as buffered reads."""
+        _, expected = reading_file(sample_csv_file, mock_event_emitter, engine=engine)
+        _, df = reading_file(sample_csv_file, mock_event_emitter, engine=engine, memory_map=True)
+        
+        pd.testing.assert_frame_equal(df, expected)
 
+
+class TestReadingFileChunks:
+    """Test cases for reading_file_chunks function."""
+    
+    @pytest.fixture
+    def temp_dir(self):
+        """Create temporary directory for test files."""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+    
+    @pytest.fixture
+    def large_csv_file(self, temp_dir):
+        """Create a CSV file with enough rows to be split in chunks."""
+        file_path = os.path.join(temp_dir, 'test_file_456.csv')
+        df = pd.DataFrame({
+            'id': range(10),
+            'full_text': [f'Text {i}' for i in range(10)],
+            'user_id': range(100, 110)
+        })
+        df.to_csv(file_path, index=False)
+        return file_path
+    
+    def test_reading_file_chunks_row_budget(self, large_csv_file):
+        """Test that chunks respect the row budget."""
+        file_id, chunks = reading_file_chunks(large_csv_file, Mock(), chunk_rows=4)
+        sizes = [len(chunk) for chunk in chunks]
+        
+        assert file_id == 'test_file_456'
+        assert sizes == [4, 4, 2]
+    
+    def test_reading_file_chunks_byte_budget(self, large_csv_file):
+        """Test that a byte budget is converted to a row budget."""
+        row_bytes = len('0,Text 0,100\n')
+        _, chunks = reading_file_chunks(large_csv_file, Mock(), chunk_bytes=row_bytes * 3)
+        sizes = [len(chunk) for chunk in chunks]
+        
+        assert sum(sizes) == 10
+        assert max(sizes) == 3
+    
+    def test_reading_file_chunks_emits_events(self, large_csv_file):
+        """Test that reading_file_chunks emits start and done events."""
+        mock_event_emitter = Mock()
+        reading_file_chunks(large_csv_file, mock_event_emitter, chunk_rows=4)
+        
+        events = [call[0][1] for call in mock_event_emitter.call_args_list]
+        assert events == [TASK_STATUS_READING_DATASET, TASK_STATUS_READING_DATASET_DONE]
+        assert mock_event_emitter.call_args_list[1][0][2]['chunk_rows'] == 4
+    
+    def test_reading_file_chunks_parquet(self, temp_dir):
+        """Test streaming a Parquet dataset."""
+        file_path = os.path.join(temp_dir, 'test_file_789.parquet')
+        pd.DataFrame({'id': range(10), 'full_text': [f'Text {i}' for i in range(10)]}).to_parquet(file_path)
+        
+        _, chunks = reading_file_chunks(file_path, Mock(), chunk_rows=4)
+        chunks = list(chunks)
+        
+        assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+        assert list(chunks[2]['id']) == [8, 9]
+    
+    @pytest.mark.parametrize('engine', ['c', 'pyarrow'])
+    def test_reading_file_chunks_compressed(self, temp_dir, engine):
+        """Test streaming a compressed CSV dataset with both engines."""
+        file_path = os.path.join(temp_dir, 'test_file_789.csv.zst')
+        with pa.CompressedOutputStream(file_path, 'zstd') as out:
+            out.write(pd.DataFrame({'id': range(10)}).to_csv(index=False).encode('utf-8'))
+        
+        file_id, chunks = reading_file_chunks(file_path, Mock(), chunk_rows=4, engine=engine)
+        
+        assert file_id == 'test_file_789'
+        assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    
+    @pytest.mark.parametrize('engine', ['c', 'pyarrow'])
+    def test_reading_file_chunks_memory_mapped(self, large_csv_file, engine):
+        """Test streaming a memory-mapped CSV dataset with both engines."""
+        _, chunks = reading_file_chunks(large_csv_file, Mock(), chunk_rows=4, engine=engine, memory_map=True)
+        chunks = list(chunks)
+        
+        assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+        assert list(chunks[2]['id']) == [8, 9]
+    
+    @pytest.mark.parametrize('engine', ['c', 'pyarrow'])
+    def test_reading_file_chunks_with_projection(self, large_csv_file, engine):
+        """Test that projected chunks only load the requested columns and keep source rows."""
+        mock_event_emitter = Mock()
+        _, chunks = reading_file_chunks(large_csv_file, mock_event_emitter, chunk_rows=4,
+                                        engine=engine, columns=['id', 'full_text'])
+        chunks = list(chunks)
+        
+        assert [list(chunk.columns) for chunk in chunks] == [['id', 'full_text']] * 3
+        assert chunks[2].index.name == '_source_row'
+        assert list(chunks[2].index) == [8, 9]
+        assert mock_event_emitter.call_args_list[-1][0][2]['source_columns'] == 3
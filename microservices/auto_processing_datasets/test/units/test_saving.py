@@ -124,3 +124,34 @@ class TestSaving:
             assert os.path.exists(file_path)
             assert mock_event_emitter.called
 
+    
+    @patch('src.services.saving.STORAGE_ANALYSED', new_callable=lambda: '/tmp/test_analysed')
+    def test_saving_accepts_chunks(self, mock_storage, temp_dir, sample_dataframe, mock_event_emitter):
+        """Test saving a dataset streamed as DataFrame chunks."""
+        chunks = (sample_dataframe.iloc[i:i + 2] for i in range(0, len(sample_dataframe), 2))
+        
+        with patch('src.services.saving.STORAGE_ANALYSED', temp_dir):
+            file_path = saving('test_file_123', chunks, mock_event_emitter)
+            
+            loaded_df = pd.read_csv(file_path)
+            pd.testing.assert_frame_equal(loaded_df, sample_dataframe)
+    
+    def test_saving_joins_passthrough_columns(self, temp_dir, mock_event_emitter):
+        """Test that a projected DataFrame is saved with all source columns."""
+        source_path = os.path.join(temp_dir, 'source.csv')
+        pd.DataFrame({
+            'id': [1, 2, 3],
+            'user_bio': ['a', 'b', 'c'],
+            'full_text': ['Text 1', 'Text 2', 'Text 3'],
+        }).to_csv(source_path, index=False)
+        df = pd.DataFrame(
+            {'id': [1, 3], 'full_text': ['Text 1', 'Text 3'], 'sentiment': ['positive', 'neutral']},
+            index=pd.Index([0, 2], name='_source_row')
+        )
+        
+        with patch('src.services.saving.STORAGE_ANALYSED', temp_dir):
+            file_path = saving('test_file_123', df, mock_event_emitter, source_path=source_path)
+        
+        loaded_df = pd.read_csv(file_path)
+        assert list(loaded_df.columns) == ['id', 'user_bio', 'full_text', 'sentiment']
+        assert list(loaded_df['user_bio']) == ['a', 'c']
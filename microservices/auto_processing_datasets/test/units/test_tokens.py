@@ -0,0 +1,87 @@
+"""Unit tests for token estimates and token-aware batch packing."""
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
+
+from src.utils.tokens import (
+    LLM_PROMPT_TOKENS,
+    TOKENS_PER_ROW_OVERHEAD,
+    batch_row_cap,
+    batch_token_budget,
+    estimate_text_tokens,
+    pack_batches,
+)
+
+
+class TestEstimateTextTokens:
+    """Test cases for estimate_text_tokens."""
+    
+    def test_counts_words_and_long_words(self):
+        """Test that short words cost a token each and long texts one per 4 characters."""
+        texts = pd.Series(['a b c d e', 'x' * 40, None, ''])
+        
+        assert estimate_text_tokens(texts).tolist() == [5, 10, 0, 0]
+
+
+class TestBatchTokenBudget:
+    """Test cases for batch_token_budget."""
+    
+    def test_no_budget_by_default(self):
+        """Test that batches are not packed when no budget or context size is known."""
+        with patch('src.utils.tokens.LLM_BATCH_TOKEN_BUDGET', 0), \
+                patch('src.utils.tokens.DEFAULT_CONTEXT_TOKENS', 0):
+            assert batch_token_budget({'data': {}}) == 0
+    
+    def test_model_context_leaves_room_for_prompt(self):
+        """Test that the model's context size minus the prompt is the budget."""
+        with patch('src.utils.tokens.LLM_BATCH_TOKEN_BUDGET', 0):
+            assert batch_token_budget({'data': {'contextTokens': 4096}}) == 4096 - LLM_PROMPT_TOKENS
+    
+    def test_smallest_budget_wins(self):
+        """Test that the global budget and the context size both apply."""
+        with patch('src.utils.tokens.LLM_BATCH_TOKEN_BUDGET', 1000):
+            assert batch_token_budget({'data': {'contextTokens': 4096}}) == 1000
+            assert batch_token_budget({'data': {'contextTokens': 1024}}) == 1024 - LLM_PROMPT_TOKENS
+
+
+class TestBatchRowCap:
+    """Test cases for batch_row_cap."""
+    
+    def test_model_max_rows_within_global_limit(self):
+        """Test that maxBatchRows applies up to MAX_PAGINATE_ROWS_LIMIT, and paginateRowsLimit does not."""
+        with patch('src.utils.tokens.MAX_PAGINATE_ROWS_LIMIT', 1000):
+            assert batch_row_cap({'data': {'paginateRowsLimit': 20}}) == 1000
+            assert batch_row_cap({'data': {'maxBatchRows': 50}}) == 50
+            assert batch_row_cap({'data': {'maxBatchRows': 5000}}) == 1000
+
+
+class TestPackBatches:
+    """Test cases for pack_batches."""
+    
+    def test_packs_rows_up_to_budget(self):
+        """Test that consecutive rows are packed until the budget is reached."""
+        row_cost = 10 + TOKENS_PER_ROW_OVERHEAD
+        
+        bounds = pack_batches(np.full(10, 10), budget=3 * row_cost, max_rows=100)
+        
+        assert bounds == [(0, 3), (3, 6), (6, 9), (9, 10)]
+    
+    def test_long_rows_get_smaller_batches(self):
+        """Test that long texts are packed fewer per request and oversized ones alone."""
+        bounds = pack_batches(np.array([10, 10, 500, 10, 10, 10]), budget=100, max_rows=100)
+        
+        assert bounds == [(0, 2), (2, 3), (3, 6)]
+    
+    def test_row_limit(self):
+        """Test that batches never exceed the row limit."""
+        bounds = pack_batches(np.ones(5, dtype=np.int64), budget=10 ** 6, max_rows=2)
+        
+        assert bounds == [(0, 2), (2, 4), (4, 5)]
+    
+    def test_empty(self):
+        """Test that no rows give no batches."""
+        assert pack_batches(np.empty(0, dtype=np.int64), budget=100, max_rows=10) == []